@@ -17,6 +17,8 @@ from models.workout import Workout, WorkoutExercise
 from models.food import Food
 from models.meallog import MealLog
 from models.goal import Goal
+from models.dailynutrition import DailyNutritionTotal
+from models.exercisestats import ExerciseStats, ExerciseDailyVolume
 from database.database import Base, SQLALCHEMY_DATABASE_URL
 
 # Cargar variables de entorno
@@ -0,0 +1,36 @@
+"""add user/date indexes
+
+Revision ID: c3a1d8e5f2b4
+Revises: 7f6b9f55f97b
+Create Date: 2026-10-18 10:12:31.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a1d8e5f2b4'
+down_revision: Union[str, None] = '7f6b9f55f97b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_meal_logs_user_id_date', 'meal_logs', ['user_id', 'date'], unique=False, postgresql_include=['food_id', 'quantity'])
+    op.create_index('ix_workouts_user_id_date', 'workouts', ['user_id', 'date'], unique=False, postgresql_include=['name', 'duration'])
+    op.create_index('ix_body_metrics_user_id_date', 'body_metrics', ['user_id', 'date'], unique=False, postgresql_include=['weight'])
+    op.create_index('ix_goals_user_id_completed_target_date', 'goals', ['user_id', 'completed', 'target_date'], unique=False)
+    op.create_index('ix_goals_user_id_completed_completed_date', 'goals', ['user_id', 'completed', 'completed_date'], unique=False)
+    op.create_index('ix_workout_exercises_workout_id', 'workout_exercises', ['workout_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_workout_exercises_workout_id', table_name='workout_exercises')
+    op.drop_index('ix_goals_user_id_completed_completed_date', table_name='goals')
+    op.drop_index('ix_goals_user_id_completed_target_date', table_name='goals')
+    op.drop_index('ix_body_metrics_user_id_date', table_name='body_metrics')
+    op.drop_index('ix_workouts_user_id_date', table_name='workouts')
+    op.drop_index('ix_meal_logs_user_id_date', table_name='meal_logs')
@@ -0,0 +1,63 @@
+"""add food name search index
+
+Revision ID: d94e2b7a6c10
+Revises: c3a1d8e5f2b4
+Create Date: 2026-10-18 11:02:47.118230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd94e2b7a6c10'
+down_revision: Union[str, None] = 'c3a1d8e5f2b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Copia congelada de models.food.SQLITE_FTS_DDL tal como era en esta revisión
+# (más el 'rebuild' que indexa los alimentos ya existentes). Una migración no
+# importa los modelos: si el modelo cambia, hace falta una migración nueva.
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS foods_fts USING fts5("
+    "name, content='foods', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS foods_fts_ai AFTER INSERT ON foods BEGIN "
+    "INSERT INTO foods_fts(rowid, name) VALUES (new.id, new.name); END",
+    "CREATE TRIGGER IF NOT EXISTS foods_fts_ad AFTER DELETE ON foods BEGIN "
+    "INSERT INTO foods_fts(foods_fts, rowid, name) VALUES ('delete', old.id, old.name); END",
+    "CREATE TRIGGER IF NOT EXISTS foods_fts_au AFTER UPDATE OF name ON foods BEGIN "
+    "INSERT INTO foods_fts(foods_fts, rowid, name) VALUES ('delete', old.id, old.name); "
+    "INSERT INTO foods_fts(rowid, name) VALUES (new.id, new.name); END",
+    "INSERT INTO foods_fts(foods_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.execute('CREATE EXTENSION IF NOT EXISTS unaccent')
+        # unaccent() no es IMMUTABLE; el envoltorio permite usarlo en un índice
+        op.execute(
+            "CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text AS "
+            "$$ SELECT public.unaccent('public.unaccent', $1) $$ "
+            "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT"
+        )
+        op.execute('CREATE INDEX ix_foods_name_trgm ON foods USING gin (f_unaccent(lower(name)) gin_trgm_ops)')
+    elif dialect == 'sqlite':
+        for statement in SQLITE_FTS_DDL:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_foods_name_trgm')
+        op.execute('DROP FUNCTION IF EXISTS f_unaccent(text)')
+    elif dialect == 'sqlite':
+        for trigger in ('foods_fts_ai', 'foods_fts_ad', 'foods_fts_au'):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS foods_fts')
@@ -0,0 +1,37 @@
+"""create daily nutrition totals
+
+Revision ID: e5b03c9d41a7
+Revises: d94e2b7a6c10
+Create Date: 2026-10-18 11:40:05.527914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b03c9d41a7'
+down_revision: Union[str, None] = 'd94e2b7a6c10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('daily_nutrition_totals',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('kcal', sa.Float(), nullable=False),
+    sa.Column('protein', sa.Float(), nullable=False),
+    sa.Column('carbs', sa.Float(), nullable=False),
+    sa.Column('fat', sa.Float(), nullable=False),
+    sa.Column('meal_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+    # Los datos existentes se cargan con: python -m controllers.nutrition_totals rebuild
+
+
+def downgrade() -> None:
+    op.drop_table('daily_nutrition_totals')
@@ -0,0 +1,49 @@
+"""create exercise stats
+
+Revision ID: f27c8a1e9b35
+Revises: e5b03c9d41a7
+Create Date: 2026-10-18 12:15:52.903411
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f27c8a1e9b35'
+down_revision: Union[str, None] = 'e5b03c9d41a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('exercise_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('exercise_id', sa.Integer(), nullable=False),
+    sa.Column('pr_weight', sa.Float(), nullable=False),
+    sa.Column('best_set_volume', sa.Float(), nullable=False),
+    sa.Column('last_performed', sa.Date(), nullable=False),
+    sa.Column('lifetime_volume', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['exercise_id'], ['exercises.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'exercise_id')
+    )
+    op.create_table('exercise_daily_volume',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('exercise_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('volume', sa.Float(), nullable=False),
+    sa.Column('max_weight', sa.Float(), nullable=False),
+    sa.Column('best_set_volume', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['exercise_id'], ['exercises.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'exercise_id', 'day')
+    )
+    # Los datos existentes se cargan con: python -m controllers.training_stats rebuild
+
+
+def downgrade() -> None:
+    op.drop_table('exercise_daily_volume')
+    op.drop_table('exercise_stats')
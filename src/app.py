@@ -1,5 +1,6 @@
 import streamlit as st
 from dotenv import load_dotenv
+import importlib
 import os
 import sys
 from pathlib import Path
@@ -9,13 +10,8 @@ file_path = Path(__file__).resolve()
 src_dir = file_path.parent
 sys.path.append(str(src_dir))
 
-from login import login_page
-from register import register_page
-from training import training_page
-from metrics import metrics_page
-from nutrition import nutrition_page
-from dashboard import dashboard_page
-from goals import goals_page
+from database.database import close_session, SQL_DEBUG_PANEL
+from database.instrumentation import begin_rerun, end_rerun
 
 # Cargar variables de entorno
 load_dotenv()
@@ -28,62 +24,72 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Página -> (módulo, función). Los módulos se importan al abrir la página por
+# primera vez: el login no carga pandas, plotly ni las páginas de la app.
+AUTH_PAGES = {
+    "Iniciar Sesión": ("login", "login_page"),
+    "Registrarse": ("register", "register_page"),
+}
+
+PAGES = {
+    "Dashboard": ("dashboard", "dashboard_page"),
+    "Entrenamiento": ("training", "training_page"),
+    "Nutrición": ("nutrition", "nutrition_page"),
+    "Métricas Corporales": ("metrics", "metrics_page"),
+    "Metas": ("goals", "goals_page"),
+    "Perfil": ("profile", "profile_page"),
+    "Recuperar Contraseña": ("login", "recover_password_page"),
+    "Configuración": ("settings", "settings_page"),
+}
+
+def load_page(pages: dict, name: str):
+    module, function = pages[name]
+    return getattr(importlib.import_module(module), function)
+
 # Inicializar el estado de la sesión
 if "page" not in st.session_state:
     st.session_state.page = "login"
 
-# Mostrar solo login y registro si no hay usuario autenticado
-if "user_id" not in st.session_state or st.session_state.user_id is None:
-    st.sidebar.title("Acceso")
-    opcion = st.sidebar.radio(
-        "Selecciona una opción",
-        ["Iniciar Sesión", "Registrarse"]
+def main():
+    # Mostrar solo login y registro si no hay usuario autenticado
+    if "user_id" not in st.session_state or st.session_state.user_id is None:
+        st.sidebar.title("Acceso")
+        opcion = st.sidebar.radio(
+            "Selecciona una opción",
+            list(AUTH_PAGES)
+        )
+        begin_rerun(opcion)
+        load_page(AUTH_PAGES, opcion)()
+        st.stop()
+
+    # Usuario autenticado: mostrar la app completa
+    st.title("Sistema de Seguimiento de Entrenamiento y Nutrición")
+
+    # Sidebar con navegación
+    st.sidebar.title("Navegación")
+    page = st.sidebar.radio(
+        "Ir a",
+        ["Dashboard", "Entrenamiento", "Nutrición", "Métricas Corporales", "Metas", "Perfil", "Configuración"]
     )
-    if opcion == "Iniciar Sesión":
-        login_page()
-    else:
-        register_page()
-    st.stop()
-
-# Usuario autenticado: mostrar la app completa
-st.title("Sistema de Seguimiento de Entrenamiento y Nutrición")
-
-# Sidebar con navegación
-st.sidebar.title("Navegación")
-page = st.sidebar.radio(
-    "Ir a",
-    ["Dashboard", "Entrenamiento", "Nutrición", "Métricas Corporales", "Metas", "Perfil", "Configuración"]
-)
 
-# Botón de cerrar sesión
-if st.sidebar.button("Cerrar Sesión"):
-    st.session_state.clear()
-    st.rerun()
-
-# Contenido principal basado en la página seleccionada
-if page == "Dashboard":
-    dashboard_page()
-    
-elif page == "Entrenamiento":
-    training_page()
-    
-elif page == "Nutrición":
-    nutrition_page()
-    
-elif page == "Métricas Corporales":
-    metrics_page()
-    
-elif page == "Metas":
-    goals_page()
-    
-elif page == "Perfil":
-    from profile import profile_page
-    profile_page()
-    
-elif page == "Recuperar Contraseña":
-    from login import recover_password_page
-    recover_password_page()
-    
-elif page == "Configuración":
-    st.header("Configuración")
-    st.write("Configura tus preferencias") 
\ No newline at end of file
+    # Las consultas de este rerun se atribuyen a la página seleccionada
+    begin_rerun(page)
+
+    # Botón de cerrar sesión
+    if st.sidebar.button("Cerrar Sesión"):
+        st.session_state.clear()
+        st.rerun()
+
+    # Contenido principal basado en la página seleccionada
+    load_page(PAGES, page)()
+
+    if SQL_DEBUG_PANEL:
+        from views.debug_panel import sql_debug_panel
+        sql_debug_panel()
+
+try:
+    main()
+finally:
+    # Liberar la sesión del rerun, también si la página llamó a st.stop() o st.rerun()
+    end_rerun()
+    close_session()
@@ -0,0 +1,136 @@
+import threading
+from collections import Counter
+from types import MappingProxyType
+from typing import Callable, Mapping, NamedTuple, Optional, Tuple
+from sqlalchemy import select
+from database.database import get_session
+from models.exercise import Exercise, MuscleGroup
+from models.food import Food
+
+# Catálogos de alimentos y ejercicios compartidos por todo el proceso. Se leen
+# en cada rerun y cambian muy poco, así que se guarda una instantánea inmutable
+# que solo se recarga cuando la versión del catálogo cambia (cada alta,
+# edición o baja).
+
+class FoodItem(NamedTuple):
+    id: int
+    name: str
+    calories: float
+    protein: Optional[float]
+    carbs: Optional[float]
+    fat: Optional[float]
+
+class ExerciseItem(NamedTuple):
+    id: int
+    name: str
+    muscle_group: MuscleGroup
+    description: Optional[str]
+
+def _unique_labels(items, suffix: Callable) -> Mapping[int, str]:
+    # El nombre basta como etiqueta salvo que esté repetido
+    counts = Counter(item.name for item in items)
+    return MappingProxyType({
+        item.id: item.name if counts[item.name] == 1 else f"{item.name} ({suffix(item)})"
+        for item in items
+    })
+
+class FoodCatalog:
+    __slots__ = ("version", "items", "by_id", "labels")
+
+    def __init__(self, version: int, items: Tuple[FoodItem, ...]):
+        self.version = version
+        self.items = items
+        self.by_id: Mapping[int, FoodItem] = MappingProxyType({f.id: f for f in items})
+        self.labels = _unique_labels(items, lambda f: f"#{f.id}")
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def get(self, food_id: int) -> Optional[FoodItem]:
+        return self.by_id.get(food_id)
+
+class ExerciseCatalog:
+    __slots__ = ("version", "items", "by_id", "labels", "ids_by_label", "by_group")
+
+    def __init__(self, version: int, items: Tuple[ExerciseItem, ...]):
+        self.version = version
+        self.items = items
+        self.by_id: Mapping[int, ExerciseItem] = MappingProxyType({e.id: e for e in items})
+        self.labels = _unique_labels(items, lambda e: f"{e.muscle_group.value} #{e.id}")
+        self.ids_by_label: Mapping[str, int] = MappingProxyType({label: id for id, label in self.labels.items()})
+        # Ids de ejercicios por grupo muscular, en el mismo orden que items
+        groups = {group: [] for group in MuscleGroup}
+        for e in items:
+            groups[e.muscle_group].append(e.id)
+        self.by_group: Mapping[MuscleGroup, Tuple[int, ...]] = MappingProxyType(
+            {group: tuple(ids) for group, ids in groups.items()}
+        )
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def get(self, exercise_id: int) -> Optional[ExerciseItem]:
+        return self.by_id.get(exercise_id)
+
+    def ids(self, muscle_group: Optional[MuscleGroup] = None) -> Tuple[int, ...]:
+        if muscle_group is None:
+            return tuple(self.by_id)
+        return self.by_group[muscle_group]
+
+class _VersionedSnapshot:
+    def __init__(self, load: Callable):
+        self._load = load
+        self._lock = threading.Lock()
+        self._version = 0
+        self._snapshot = None
+
+    def get(self, db=None):
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == self._version:
+            return snapshot
+        with self._lock:
+            if self._snapshot is None or self._snapshot.version != self._version:
+                # Si otra escritura sube la versión durante la carga, la instantánea
+                # queda con la versión anterior y se recarga en la siguiente lectura
+                version = self._version
+                self._snapshot = self._load(db or get_session(), version)
+            return self._snapshot
+
+    def bump(self):
+        with self._lock:
+            self._version += 1
+
+def _load_foods(db, version: int) -> FoodCatalog:
+    rows = db.execute(
+        select(Food.id, Food.name, Food.calories, Food.protein, Food.carbs, Food.fat).order_by(Food.name, Food.id)
+    ).all()
+    return FoodCatalog(version, tuple(FoodItem(*row) for row in rows))
+
+def _load_exercises(db, version: int) -> ExerciseCatalog:
+    rows = db.execute(
+        select(Exercise.id, Exercise.name, Exercise.muscle_group, Exercise.description).order_by(Exercise.name, Exercise.id)
+    ).all()
+    return ExerciseCatalog(version, tuple(ExerciseItem(*row) for row in rows))
+
+_foods = _VersionedSnapshot(_load_foods)
+_exercises = _VersionedSnapshot(_load_exercises)
+
+def get_food_catalog(db=None) -> FoodCatalog:
+    return _foods.get(db)
+
+def bump_food_catalog_version():
+    # Llamar después de confirmar (commit) cualquier cambio en la tabla foods
+    _foods.bump()
+
+def get_exercise_catalog(db=None) -> ExerciseCatalog:
+    return _exercises.get(db)
+
+def bump_exercise_catalog_version():
+    # Llamar después de confirmar (commit) cualquier cambio en la tabla exercises
+    _exercises.bump()
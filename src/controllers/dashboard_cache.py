@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from types import MappingProxyType
+from typing import Dict, Mapping, NamedTuple, Optional
+from controllers.repositories import MealRepository, MetricRepository, TrendRepository, WorkoutRepository
+from controllers.trends import TrendSummary
+from controllers.widget_loader import WidgetResult, load_widgets
+from database.database import get_setting
+
+# Instantánea por usuario de los datos del dashboard (peso actual, calorías de
+# hoy, entrenamientos recientes, serie y tendencias de peso). Volver al dashboard no
+# consulta la base mientras la instantánea siga vigente: caduca con el TTL, al
+# cambiar de día o cuando una escritura del usuario la invalida. La caché es
+# del proceso, con un máximo de entradas y desalojo LRU. El resumen de
+# tendencias tiene su propia caché porque también lo usa la página de metas.
+
+DASHBOARD_CACHE_TTL_SECONDS = float(get_setting("DASHBOARD_CACHE_TTL_SECONDS", 300))
+DASHBOARD_CACHE_MAX_ENTRIES = int(get_setting("DASHBOARD_CACHE_MAX_ENTRIES", 1000))
+
+class DashboardSnapshot(NamedTuple):
+    day: date
+    expires_at: float
+    widgets: Mapping[str, WidgetResult]
+
+class DashboardCache:
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, DashboardSnapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Sube con cada invalidación: una carga que empezó antes no se guarda
+        self._epoch = 0
+
+    def epoch(self) -> int:
+        return self._epoch
+
+    def get(self, user_id: int, day: date) -> Optional[DashboardSnapshot]:
+        with self._lock:
+            snapshot = self._entries.get(user_id)
+            if snapshot is None:
+                return None
+            if snapshot.day != day or snapshot.expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return snapshot
+
+    def put(self, user_id: int, day: date, widgets: Dict[str, WidgetResult], epoch: int) -> bool:
+        if self.max_entries <= 0 or self.ttl <= 0:
+            return False
+        with self._lock:
+            if epoch != self._epoch:
+                return False
+            self._entries[user_id] = DashboardSnapshot(day, time.monotonic() + self.ttl, MappingProxyType(widgets))
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def invalidate(self, user_id: Optional[int] = None):
+        # None = todos los usuarios (p. ej. al cambiar los valores de un alimento)
+        with self._lock:
+            self._epoch += 1
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+_cache = DashboardCache(DASHBOARD_CACHE_MAX_ENTRIES, DASHBOARD_CACHE_TTL_SECONDS)
+_trends = DashboardCache(DASHBOARD_CACHE_MAX_ENTRIES, DASHBOARD_CACHE_TTL_SECONDS)
+
+def invalidate_dashboard(user_id: Optional[int] = None):
+    # Llamar después de confirmar (commit) cualquier escritura que el dashboard muestre
+    _cache.invalidate(user_id)
+    _trends.invalidate(user_id)
+
+def load_trends(db, user_id: int, day: date) -> Mapping[str, Optional[TrendSummary]]:
+    # Último valor, media 7 días, tendencia y cambio semanal de peso, calorías y volumen
+    snapshot = _trends.get(user_id, day)
+    if snapshot is not None:
+        return snapshot.widgets["trends"].value
+    epoch = _trends.epoch()
+    trends = MappingProxyType(TrendRepository(db).latest(user_id))
+    _trends.put(user_id, day, {"trends": WidgetResult(trends)}, epoch)
+    return trends
+
+def load_dashboard(db, user_id: int, day: date) -> Mapping[str, WidgetResult]:
+    snapshot = _cache.get(user_id, day)
+    if snapshot is not None:
+        return snapshot.widgets
+    epoch = _cache.epoch()
+    widgets = load_widgets(db, {
+        "metric": lambda s: MetricRepository(s).latest(user_id),
+        "totals": lambda s: MealRepository(s).day_totals(user_id, day),
+        "workouts": lambda s: WorkoutRepository(s).recent(user_id, limit=5),
+        "weights": lambda s: TrendRepository(s).series(user_id, "weight"),
+        "trends": lambda s: load_trends(s, user_id, day),
+    })
+    # Un widget degradado no se guarda: la próxima visita lo vuelve a intentar
+    if all(result.error is None for result in widgets.values()):
+        _cache.put(user_id, day, widgets, epoch)
+    return widgets
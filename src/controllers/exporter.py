@@ -0,0 +1,159 @@
+import argparse
+import csv
+import io
+import json
+import os
+import zipfile
+from typing import BinaryIO, Iterator, List, Sequence, Union
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, select
+from database.database import get_setting
+from models.bodymetric import BodyMetric
+from models.exercise import Exercise
+from models.food import Food
+from models.goal import Goal
+from models.meallog import MealLog
+from models.user import User
+from models.workout import Workout, WorkoutExercise
+
+# Exportación de los datos de un usuario (derecho de acceso/portabilidad).
+# Cada tabla se lee con un cursor del lado del servidor (yield_per) y se
+# escribe por lotes directamente en un miembro del zip, así la memoria usada
+# no depende del tamaño del historial.
+
+EXPORT_BATCH_SIZE = int(get_setting("EXPORT_BATCH_SIZE", 1000))
+
+FORMATS = ("csv", "jsonl", "parquet")
+
+def _user_tables(user_id: int):
+    # (nombre del archivo, consulta); nunca se exporta la contraseña
+    return [
+        ("user", select(
+            User.id, User.email, User.username, User.full_name, User.height,
+            User.initial_weight, User.goal, User.created_at, User.updated_at,
+        ).where(User.id == user_id)),
+        ("workouts", select(
+            Workout.id, Workout.date, Workout.name, Workout.duration, Workout.notes,
+        ).where(Workout.user_id == user_id).order_by(Workout.date, Workout.id)),
+        ("workout_exercises", select(
+            WorkoutExercise.id, WorkoutExercise.workout_id, Exercise.name.label("exercise"),
+            WorkoutExercise.sets, WorkoutExercise.reps, WorkoutExercise.weight, WorkoutExercise.notes,
+        ).join(Workout, WorkoutExercise.workout_id == Workout.id)
+         .join(Exercise, WorkoutExercise.exercise_id == Exercise.id)
+         .where(Workout.user_id == user_id).order_by(Workout.date, WorkoutExercise.id)),
+        ("meal_logs", select(
+            MealLog.id, MealLog.date, Food.name.label("food"), MealLog.quantity,
+        ).join(Food, MealLog.food_id == Food.id)
+         .where(MealLog.user_id == user_id).order_by(MealLog.date, MealLog.id)),
+        ("body_metrics", select(
+            BodyMetric.id, BodyMetric.date, BodyMetric.weight, BodyMetric.height, BodyMetric.bmi,
+        ).where(BodyMetric.user_id == user_id).order_by(BodyMetric.date, BodyMetric.id)),
+        ("goals", select(
+            Goal.id, Goal.title, Goal.description, Goal.category, Goal.target_value, Goal.target_unit,
+            Goal.start_date, Goal.target_date, Goal.completed, Goal.completed_date,
+        ).where(Goal.user_id == user_id).order_by(Goal.start_date, Goal.id)),
+    ]
+
+def _stream(db, stmt, batch_size: int) -> Iterator[Sequence]:
+    # yield_per activa stream_results: psycopg2 usa un cursor con nombre
+    result = db.execute(stmt.execution_options(yield_per=batch_size))
+    yield from result.partitions()
+
+def _write_csv(member: BinaryIO, columns: List[str], batches):
+    text = io.TextIOWrapper(member, encoding="utf-8", newline="")
+    writer = csv.writer(text)
+    writer.writerow(columns)
+    for batch in batches:
+        writer.writerows(batch)
+    text.flush()
+    text.detach()
+
+def _write_jsonl(member: BinaryIO, columns: List[str], batches):
+    text = io.TextIOWrapper(member, encoding="utf-8", newline="\n")
+    for batch in batches:
+        text.writelines(
+            json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=str) + "\n" for row in batch
+        )
+    text.flush()
+    text.detach()
+
+def _arrow_type(pa, sql_type):
+    if isinstance(sql_type, Boolean):
+        return pa.bool_()
+    if isinstance(sql_type, Integer):
+        return pa.int64()
+    if isinstance(sql_type, Float):
+        return pa.float64()
+    if isinstance(sql_type, DateTime):
+        return pa.timestamp("us", tz="UTC") if sql_type.timezone else pa.timestamp("us")
+    if isinstance(sql_type, Date):
+        return pa.date32()
+    return pa.string()
+
+def _write_parquet(member: BinaryIO, stmt, batches):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    # Esquema a partir de los tipos de las columnas, no de los datos: un lote
+    # con todos los valores nulos no cambia el tipo de la columna
+    schema = pa.schema([(c.name, _arrow_type(pa, c.type)) for c in stmt.selected_columns])
+    strings = [i for i, field in enumerate(schema) if pa.types.is_string(field.type)]
+    writer = pq.ParquetWriter(member, schema)
+    try:
+        for batch in batches:
+            columns = [list(values) for values in zip(*batch)]
+            for i in strings:
+                # Enums y otros tipos de texto se guardan como su valor
+                columns[i] = [None if v is None else getattr(v, "value", v) for v in columns[i]]
+            writer.write_batch(pa.record_batch(columns, schema=schema))
+    finally:
+        writer.close()
+
+def export_user(db, user_id: int, target: Union[str, BinaryIO], fmt: str = "csv",
+                batch_size: int = EXPORT_BATCH_SIZE):
+    # target: ruta o archivo binario donde se escribe el zip
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato no soportado: {fmt}")
+    with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, stmt in _user_tables(user_id):
+            batches = _stream(db, stmt, batch_size)
+            with archive.open(f"{name}.{fmt}", "w", force_zip64=True) as member:
+                if fmt == "parquet":
+                    _write_parquet(member, stmt, batches)
+                else:
+                    columns = [c.name for c in stmt.selected_columns]
+                    (_write_csv if fmt == "csv" else _write_jsonl)(member, columns, batches)
+
+def export_all(db, directory: str, fmt: str = "csv", batch_size: int = EXPORT_BATCH_SIZE) -> int:
+    # Un zip por usuario en el directorio indicado
+    os.makedirs(directory, exist_ok=True)
+    user_ids = db.scalars(select(User.id).order_by(User.id)).all()
+    for user_id in user_ids:
+        export_user(db, user_id, os.path.join(directory, f"user_{user_id}.zip"), fmt, batch_size)
+        # Cerrar la transacción de lectura entre usuarios
+        db.rollback()
+    return len(user_ids)
+
+def main():
+    parser = argparse.ArgumentParser(description="Exportación de datos de usuario")
+    who = parser.add_mutually_exclusive_group(required=True)
+    who.add_argument("--user", type=int, help="Exportar un usuario")
+    who.add_argument("--all", action="store_true", help="Exportar todos los usuarios")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--output", default="exports", help="Directorio de salida")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE)
+    args = parser.parse_args()
+    from database.database import SessionLocal
+    db = SessionLocal()
+    try:
+        if args.all:
+            count = export_all(db, args.output, args.format, args.batch_size)
+            print(f"{count} usuarios exportados en {args.output}")
+        else:
+            os.makedirs(args.output, exist_ok=True)
+            path = os.path.join(args.output, f"user_{args.user}.zip")
+            export_user(db, args.user, path, args.format, args.batch_size)
+            print(f"Exportación guardada en {path}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import re
+import unicodedata
+from typing import List
+from sqlalchemy import column, false, func, inspect, select, table
+from controllers.catalog import FoodItem
+from models.food import Food
+
+# Búsqueda de alimentos por nombre, con ranking e insensible a tildes.
+# PostgreSQL: índice GIN pg_trgm sobre f_unaccent(lower(name)).
+# SQLite: tabla FTS5 foods_fts (remove_diacritics). Otros motores: ILIKE.
+
+SEARCH_LIMIT = 20
+
+_FOOD_COLUMNS = (Food.id, Food.name, Food.calories, Food.protein, Food.carbs, Food.fat)
+
+def normalize(term: str) -> str:
+    # "Plátano" -> "platano"
+    decomposed = unicodedata.normalize("NFKD", term.strip().lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+# Tabla FTS5 de SQLite; la columna oculta con su nombre recibe MATCH
+_fts = table("foods_fts", column("rowid"), column("rank"), column("foods_fts"))
+
+def search_foods(db, term: str, limit: int = SEARCH_LIMIT) -> List[FoodItem]:
+    # Selector de alimentos: los más parecidos primero, como mucho `limit`
+    query = normalize(term or "")
+    if not query:
+        return []
+    dialect = db.get_bind().dialect.name
+    stmt = select(*_FOOD_COLUMNS)
+    if dialect == "postgresql":
+        name = func.f_unaccent(func.lower(Food.name))
+        stmt = stmt.where(_postgresql_match(query)).order_by(func.word_similarity(query, name).desc(), Food.name)
+    elif dialect == "sqlite" and _has_sqlite_fts(db):
+        stmt = (
+            stmt.join(_fts, _fts.c.rowid == Food.id)
+            .where(_sqlite_match(query)).order_by(_fts.c.rank, Food.name)
+        )
+    else:
+        stmt = stmt.where(_fallback_match(term)).order_by(Food.name)
+    return [FoodItem(*row) for row in db.execute(stmt.limit(limit)).all()]
+
+def matching_food_ids(db, term: str):
+    # Subconsulta con los ids de todos los alimentos que encuentra el selector,
+    # sin ranking ni límite (filtro del historial); usa el mismo índice
+    query = normalize(term or "")
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return select(Food.id).where(_postgresql_match(query))
+    if dialect == "sqlite" and _has_sqlite_fts(db):
+        return select(_fts.c.rowid).where(_sqlite_match(query))
+    return select(Food.id).where(_fallback_match(term or ""))
+
+def _postgresql_match(query: str):
+    name = func.f_unaccent(func.lower(Food.name))
+    # Coincidencia por subcadena o por similitud de palabras (errores de tipeo);
+    # ambos operadores usan el índice trigram
+    return name.contains(query, autoescape=True) | name.bool_op("%>")(query)
+
+def _sqlite_match(query: str):
+    tokens = re.findall(r"\w+", query)
+    if not tokens:
+        return false()
+    # Cada palabra como prefijo: "plat" encuentra "Plátano"
+    return _fts.c.foods_fts.op("MATCH")(" ".join(f'"{token}"*' for token in tokens))
+
+def _fallback_match(term: str):
+    return Food.name.ilike(f"%{term.strip()}%")
+
+_sqlite_fts = {}
+
+def _has_sqlite_fts(db) -> bool:
+    # Bases SQLite creadas antes de la migración no tienen foods_fts
+    bind = db.get_bind()
+    key = str(bind.url)
+    if key not in _sqlite_fts:
+        _sqlite_fts[key] = inspect(bind).has_table("foods_fts")
+    return _sqlite_fts[key]
@@ -0,0 +1,311 @@
+import argparse
+import csv
+import io
+import json
+from datetime import datetime
+from itertools import groupby
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO
+from sqlalchemy import insert
+from controllers.catalog import get_exercise_catalog, get_food_catalog
+from controllers.food_search import normalize
+from controllers.nutrition_totals import rebuild_daily_totals
+from controllers.training_stats import rebuild_exercise_stats
+from database.database import get_setting
+from models.bodymetric import BodyMetric
+from models.meallog import MealLog
+from models.workout import Workout, WorkoutExercise
+
+# Importación masiva de comidas, entrenamientos y métricas corporales desde
+# exportaciones CSV/JSON de otras aplicaciones. Los nombres de alimentos y
+# ejercicios se resuelven con un mapa en memoria, las filas se cargan por
+# bloques (COPY en PostgreSQL, executemany en otros motores) y cada bloque es
+# una transacción. Las filas inválidas se devuelven en un informe de rechazos.
+
+IMPORT_CHUNK_SIZE = int(get_setting("IMPORT_CHUNK_SIZE", 5000))
+
+KINDS = ("meals", "workouts", "metrics")
+
+# Nombres de columna aceptados para cada campo (sin tildes y en minúsculas)
+COLUMNS = {
+    "meals": {
+        "date": ("date", "fecha"),
+        "food": ("food", "alimento", "food_name"),
+        "quantity": ("quantity", "cantidad", "grams", "gramos"),
+    },
+    "workouts": {
+        "date": ("date", "fecha"),
+        "name": ("name", "workout", "entrenamiento", "nombre"),
+        "duration": ("duration", "duracion"),
+        "exercise": ("exercise", "ejercicio"),
+        "sets": ("sets", "series"),
+        "reps": ("reps", "repeticiones"),
+        "weight": ("weight", "peso"),
+        "notes": ("notes", "notas"),
+    },
+    "metrics": {
+        "date": ("date", "fecha"),
+        "weight": ("weight", "peso"),
+        "height": ("height", "altura"),
+    },
+}
+
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%Y-%m-%d %H:%M", "%d/%m/%Y %H:%M")
+
+class Rejected(NamedTuple):
+    line: int
+    reason: str
+    row: dict
+
+class ImportResult(NamedTuple):
+    imported: int
+    rejected: List[Rejected]
+
+class RowError(ValueError):
+    pass
+
+def read_records(stream: TextIO, fmt: str) -> Iterator[dict]:
+    # fmt: "csv", "json" (lista de objetos) o "jsonl" (un objeto por línea)
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+    elif fmt == "json":
+        yield from json.load(stream)
+    elif fmt == "jsonl":
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        raise ValueError(f"Formato no soportado: {fmt}")
+
+def detect_format(filename: str) -> str:
+    extension = filename.rsplit(".", 1)[-1].lower()
+    return {"csv": "csv", "json": "json", "jsonl": "jsonl", "ndjson": "jsonl"}.get(extension, "csv")
+
+def _field_map(kind: str, headers: Iterable[str]) -> Dict[str, str]:
+    # campo -> nombre de la columna en el archivo
+    by_name = {normalize(h): h for h in headers}
+    fields = {}
+    for field, aliases in COLUMNS[kind].items():
+        for alias in aliases:
+            if alias in by_name:
+                fields[field] = by_name[alias]
+                break
+    return fields
+
+def parse_date(value) -> datetime:
+    value = str(value or "").strip()
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    raise RowError(f"Fecha inválida: {value!r}")
+
+def _number(value, label: str, cast=float, required=True, positive=True):
+    if value is None or str(value).strip() == "":
+        if required:
+            raise RowError(f"Falta {label}")
+        return None
+    try:
+        number = cast(str(value).strip().replace(",", "."))
+    except ValueError:
+        raise RowError(f"{label.capitalize()} inválido: {value!r}")
+    if positive and number <= 0:
+        raise RowError(f"{label.capitalize()} debe ser mayor que cero")
+    return number
+
+def _name_map(catalog) -> Dict[str, int]:
+    # Nombre normalizado -> id; ante nombres repetidos gana el primero del catálogo
+    names = {}
+    for item in catalog:
+        names.setdefault(normalize(item.name), item.id)
+    return names
+
+def _resolve(names: Dict[str, int], value, label: str) -> int:
+    item_id = names.get(normalize(str(value or "")))
+    if item_id is None:
+        raise RowError(f"{label} desconocido: {value!r}")
+    return item_id
+
+def _meal_row(user_id, record, fields, foods):
+    return {
+        "user_id": user_id,
+        "food_id": _resolve(foods, record.get(fields.get("food")), "Alimento"),
+        "date": parse_date(record.get(fields.get("date"))),
+        "quantity": _number(record.get(fields.get("quantity")), "cantidad"),
+    }
+
+def _metric_row(user_id, record, fields):
+    weight = _number(record.get(fields.get("weight")), "peso")
+    height = _number(record.get(fields.get("height")), "altura")
+    return {
+        "user_id": user_id,
+        "date": parse_date(record.get(fields.get("date"))),
+        "weight": weight,
+        "height": height,
+        "bmi": round(weight / ((height / 100) ** 2), 2),
+    }
+
+def _set_row(record, fields, exercises):
+    notes = record.get(fields.get("notes")) if "notes" in fields else None
+    return {
+        "date": parse_date(record.get(fields.get("date"))),
+        "name": str(record.get(fields.get("name")) or "Entrenamiento importado").strip(),
+        "duration": _number(record.get(fields.get("duration")), "duración", int, required=False),
+        "exercise_id": _resolve(exercises, record.get(fields.get("exercise")), "Ejercicio"),
+        "sets": _number(record.get(fields.get("sets")), "series", int),
+        "reps": _number(record.get(fields.get("reps")), "repeticiones", int),
+        "weight": _number(record.get(fields.get("weight")), "peso", required=False, positive=False),
+        "notes": str(notes).strip() if notes else None,
+    }
+
+def _copy(db, table, columns: List[str], rows: List[dict]):
+    # COPY ... FROM STDIN sobre la conexión (y transacción) de la sesión
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["" if row[c] is None else row[c] for c in columns])
+    buffer.seek(0)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+    finally:
+        cursor.close()
+
+def _bulk_insert(db, model, rows: List[dict]):
+    if db.get_bind().dialect.name == "postgresql":
+        _copy(db, model.__table__, list(rows[0]), rows)
+    else:
+        db.execute(insert(model), rows)
+
+def _insert_workouts(db, user_id: int, sets: List[dict]):
+    # Las series consecutivas con la misma fecha y nombre forman un entrenamiento
+    workouts = [
+        (key, list(group)) for key, group in groupby(sets, key=lambda s: (s["date"], s["name"]))
+    ]
+    ids = db.scalars(
+        insert(Workout).returning(Workout.id, sort_by_parameter_order=True),
+        [
+            {"user_id": user_id, "date": date, "name": name, "duration": group[0]["duration"]}
+            for (date, name), group in workouts
+        ],
+    ).all()
+    _bulk_insert(db, WorkoutExercise, [
+        {
+            "workout_id": workout_id,
+            "exercise_id": s["exercise_id"],
+            "sets": s["sets"],
+            "reps": s["reps"],
+            "weight": s["weight"],
+            "notes": s["notes"],
+        }
+        for workout_id, (_, group) in zip(ids, workouts)
+        for s in group
+    ])
+
+def _chunks(items: Iterable, size: int, key=None) -> Iterator[list]:
+    # Con key, un bloque no se corta entre elementos con la misma clave
+    chunk = []
+    for item in items:
+        if len(chunk) >= size and (key is None or key(item) != key(chunk[-1])):
+            yield chunk
+            chunk = []
+        chunk.append(item)
+    if chunk:
+        yield chunk
+
+def import_records(db, user_id: int, kind: str, records: Iterable[dict],
+                   chunk_size: int = IMPORT_CHUNK_SIZE) -> ImportResult:
+    if kind not in KINDS:
+        raise ValueError(f"Tipo de importación no soportado: {kind}")
+    rejected: List[Rejected] = []
+    imported = 0
+    fields = None
+    foods = _name_map(get_food_catalog(db)) if kind == "meals" else None
+    exercises = _name_map(get_exercise_catalog(db)) if kind == "workouts" else None
+
+    def parse(numbered):
+        nonlocal fields
+        for line, record in numbered:
+            if fields is None:
+                fields = _field_map(kind, record.keys())
+            try:
+                if kind == "meals":
+                    yield line, record, _meal_row(user_id, record, fields, foods)
+                elif kind == "metrics":
+                    yield line, record, _metric_row(user_id, record, fields)
+                else:
+                    yield line, record, _set_row(record, fields, exercises)
+            except RowError as e:
+                rejected.append(Rejected(line, str(e), record))
+
+    # Línea 1 = cabecera en CSV; en JSON es la posición del objeto
+    same_workout = (lambda item: (item[2]["date"], item[2]["name"])) if kind == "workouts" else None
+    for chunk in _chunks(parse(enumerate(records, start=2)), chunk_size, same_workout):
+        rows = [row for _, _, row in chunk]
+        try:
+            if kind == "meals":
+                _bulk_insert(db, MealLog, rows)
+            elif kind == "metrics":
+                _bulk_insert(db, BodyMetric, rows)
+            else:
+                _insert_workouts(db, user_id, rows)
+            db.commit()
+            imported += len(rows)
+        except Exception as e:
+            db.rollback()
+            rejected.extend(Rejected(line, f"Error al guardar el bloque: {e}", record) for line, record, _ in chunk)
+
+    # Los agregados se recalculan una vez para el usuario, no por bloque
+    if imported and kind == "meals":
+        rebuild_daily_totals(db, user_id)
+        db.commit()
+    elif imported and kind == "workouts":
+        rebuild_exercise_stats(db, user_id)
+        db.commit()
+    return ImportResult(imported, rejected)
+
+def import_file(db, user_id: int, kind: str, stream: TextIO, fmt: str,
+                chunk_size: int = IMPORT_CHUNK_SIZE) -> ImportResult:
+    return import_records(db, user_id, kind, read_records(stream, fmt), chunk_size)
+
+def write_rejects(stream: TextIO, rejected: List[Rejected]):
+    writer = csv.writer(stream)
+    writer.writerow(["linea", "motivo", "fila"])
+    for r in rejected:
+        writer.writerow([r.line, r.reason, json.dumps(r.row, ensure_ascii=False, default=str)])
+
+def main():
+    parser = argparse.ArgumentParser(description="Importación masiva de comidas, entrenamientos y métricas")
+    parser.add_argument("kind", choices=KINDS)
+    parser.add_argument("path", help="Archivo CSV, JSON o JSONL")
+    parser.add_argument("--user", type=int, required=True, help="Usuario destino")
+    parser.add_argument("--format", choices=["csv", "json", "jsonl"], help="Por defecto según la extensión")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    parser.add_argument("--rejects", help="Guardar las filas rechazadas en este CSV")
+    args = parser.parse_args()
+    import models.user  # Workout.user se resuelve por nombre
+    from database.database import SessionLocal
+    db = SessionLocal()
+    try:
+        with open(args.path, encoding="utf-8-sig", newline="") as stream:
+            result = import_file(db, args.user, args.kind, stream, args.format or detect_format(args.path), args.chunk_size)
+    finally:
+        db.close()
+    print(f"{result.imported} filas importadas, {len(result.rejected)} rechazadas.")
+    if result.rejected and args.rejects:
+        with open(args.rejects, "w", encoding="utf-8", newline="") as stream:
+            write_rejects(stream, result.rejected)
+        print(f"Rechazos guardados en {args.rejects}")
+    elif result.rejected:
+        for r in result.rejected[:20]:
+            print(f"Línea {r.line}: {r.reason}")
+    raise SystemExit(1 if result.rejected else 0)
+
+if __name__ == "__main__":
+    main()
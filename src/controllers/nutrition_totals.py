@@ -0,0 +1,156 @@
+import argparse
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+import pandas as pd
+from sqlalchemy import and_, delete, func, or_, select, true, tuple_
+from models.dailynutrition import DailyNutritionTotal
+from models.food import Food
+from models.meallog import MealLog
+from controllers.rollups import lock_users, upsert_from_select
+
+# Mantenimiento de daily_nutrition_totals. Cada escritura de comidas o de
+# valores nutricionales recalcula solo los (usuario, día) afectados, dentro
+# de la misma transacción; quien llama hace el commit. Las escrituras
+# concurrentes del mismo usuario se serializan (ver controllers/rollups.py).
+
+TOTAL_COLUMNS = ["user_id", "day", "kcal", "protein", "carbs", "fat", "meal_count"]
+
+def meal_day(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+def _aggregate(meals_filter):
+    day = func.date(MealLog.date)
+    factor = MealLog.quantity / 100
+    return (
+        select(
+            MealLog.user_id,
+            day,
+            func.sum(Food.calories * factor),
+            func.sum(func.coalesce(Food.protein, 0) * factor),
+            func.sum(func.coalesce(Food.carbs, 0) * factor),
+            func.sum(func.coalesce(Food.fat, 0) * factor),
+            func.count(MealLog.id),
+        )
+        .join(Food, MealLog.food_id == Food.id)
+        .where(meals_filter)
+        .group_by(MealLog.user_id, day)
+    )
+
+def _recompute(db, totals_filter, meals_filter):
+    # Días del filtro que ya no tienen comidas; el resto se inserta o actualiza
+    db.execute(delete(DailyNutritionTotal).where(
+        totals_filter,
+        tuple_(DailyNutritionTotal.user_id, DailyNutritionTotal.day).not_in(
+            select(MealLog.user_id, func.date(MealLog.date)).where(meals_filter)
+        ),
+    ))
+    upsert_from_select(db, DailyNutritionTotal.__table__, TOTAL_COLUMNS, _aggregate(meals_filter), ["user_id", "day"])
+
+def refresh_daily_totals(db, keys: Iterable[Tuple[int, date]]):
+    # keys: pares (user_id, día) tocados por un alta, edición o baja de comidas
+    keys = {(user_id, meal_day(day)) for user_id, day in keys}
+    if not keys:
+        return
+    db.flush()
+    lock_users(db, sorted({user_id for user_id, _ in keys}))
+    _recompute(
+        db,
+        or_(*(and_(DailyNutritionTotal.user_id == u, DailyNutritionTotal.day == d) for u, d in keys)),
+        # Rango por día para aprovechar el índice (user_id, date)
+        or_(*(
+            and_(MealLog.user_id == u, MealLog.date >= d, MealLog.date < d + timedelta(days=1))
+            for u, d in keys
+        )),
+    )
+
+def refresh_food_totals(db, food_ids: Iterable[int]):
+    # Tras editar calorías o macros de alimentos: días que incluyen esos alimentos
+    food_ids = list(food_ids)
+    if not food_ids:
+        return
+    db.flush()
+    affected = (
+        select(MealLog.user_id, func.date(MealLog.date))
+        .where(MealLog.food_id.in_(food_ids))
+        .distinct()
+    )
+    lock_users(db, select(MealLog.user_id).where(MealLog.food_id.in_(food_ids)).distinct())
+    _recompute(
+        db,
+        tuple_(DailyNutritionTotal.user_id, DailyNutritionTotal.day).in_(affected),
+        tuple_(MealLog.user_id, func.date(MealLog.date)).in_(affected),
+    )
+
+def rebuild_daily_totals(db, user_id: Optional[int] = None):
+    db.flush()
+    if user_id is None:
+        _recompute(db, true(), true())
+    else:
+        lock_users(db, [user_id])
+        _recompute(db, DailyNutritionTotal.user_id == user_id, MealLog.user_id == user_id)
+
+def check_daily_totals(db, user_id: Optional[int] = None, tolerance: float = 0.01) -> List[tuple]:
+    # Compara la tabla con un recálculo desde meal_logs; devuelve las diferencias
+    meals_filter = true() if user_id is None else MealLog.user_id == user_id
+    totals_filter = true() if user_id is None else DailyNutritionTotal.user_id == user_id
+    expected = {
+        (u, str(d)): row for u, d, *row in db.execute(_aggregate(meals_filter)).all()
+    }
+    stored = {
+        (t.user_id, str(t.day)): [t.kcal, t.protein, t.carbs, t.fat, t.meal_count]
+        for t in db.scalars(select(DailyNutritionTotal).where(totals_filter))
+    }
+    mismatches = []
+    for key in sorted(expected.keys() | stored.keys()):
+        exp, got = expected.get(key), stored.get(key)
+        if exp is None or got is None or any(abs(a - b) > tolerance for a, b in zip(exp, got)):
+            mismatches.append((key, exp, got))
+    return mismatches
+
+def get_day_totals(db, user_id: int, day: date) -> Optional[DailyNutritionTotal]:
+    return db.get(DailyNutritionTotal, (user_id, day))
+
+def load_daily_totals(db, user_id: int, start_date=None, end_date=None) -> pd.DataFrame:
+    stmt = (
+        select(
+            DailyNutritionTotal.day.label("Fecha"),
+            DailyNutritionTotal.kcal.label("Calorías"),
+            DailyNutritionTotal.protein.label("Proteína"),
+            DailyNutritionTotal.carbs.label("Carbohidratos"),
+            DailyNutritionTotal.fat.label("Grasas"),
+        )
+        .where(DailyNutritionTotal.user_id == user_id)
+        .order_by(DailyNutritionTotal.day)
+    )
+    if start_date:
+        stmt = stmt.where(DailyNutritionTotal.day >= meal_day(start_date))
+    if end_date:
+        stmt = stmt.where(DailyNutritionTotal.day <= meal_day(end_date))
+    result = db.execute(stmt)
+    df = pd.DataFrame(result.all(), columns=list(result.keys()))
+    df["Fecha"] = df["Fecha"].astype(str)
+    return df.set_index("Fecha").round(2)
+
+def main():
+    parser = argparse.ArgumentParser(description="Mantenimiento de daily_nutrition_totals")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--user", type=int, help="Limitar a un usuario")
+    args = parser.parse_args()
+    from database.database import SessionLocal
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            rebuild_daily_totals(db, args.user)
+            db.commit()
+            print("Totales diarios reconstruidos.")
+        else:
+            mismatches = check_daily_totals(db, args.user)
+            for key, expected, stored in mismatches:
+                print(f"{key}: esperado={expected} guardado={stored}")
+            print(f"{len(mismatches)} diferencias.")
+            raise SystemExit(1 if mismatches else 0)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import functools
+import threading
+from contextlib import contextmanager
+from sqlalchemy import event
+
+# Presupuesto de consultas por método de repositorio. El decorador solo declara
+# el máximo de sentencias SQL; con enforce_query_budgets() activo (en las
+# pruebas) cada llamada se cuenta y un exceso lanza QueryBudgetExceeded.
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+_enforcing = threading.local()
+
+@contextmanager
+def enforce_query_budgets():
+    previous = getattr(_enforcing, "active", False)
+    _enforcing.active = True
+    try:
+        yield
+    finally:
+        _enforcing.active = previous
+
+def query_budget(limit: int):
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not getattr(_enforcing, "active", False):
+                return method(self, *args, **kwargs)
+            engine = self.db.get_bind()
+            count = 0
+
+            def counter(*_):
+                nonlocal count
+                count += 1
+
+            event.listen(engine, "before_cursor_execute", counter)
+            try:
+                result = method(self, *args, **kwargs)
+            finally:
+                event.remove(engine, "before_cursor_execute", counter)
+            if count > limit:
+                raise QueryBudgetExceeded(
+                    f"{type(self).__name__}.{method.__name__}: {count} consultas (presupuesto {limit})"
+                )
+            return result
+
+        wrapper.query_budget = limit
+        return wrapper
+    return decorator
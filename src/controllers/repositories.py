@@ -0,0 +1,328 @@
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+from sqlalchemy import delete, func, insert, select, update
+from controllers.catalog import ExerciseCatalog, FoodCatalog, get_exercise_catalog, get_food_catalog
+from controllers.food_search import matching_food_ids
+from controllers.nutrition_totals import get_day_totals, load_daily_totals
+from controllers.query_budget import query_budget
+from controllers.training_stats import load_progress
+from controllers.trends import TrendSummary, latest_trends, trend_series
+from database.routing import replica_read
+from models.bodymetric import BodyMetric
+from models.exercise import Exercise
+from models.food import Food
+from models.goal import Goal
+from models.meallog import MealLog
+from models.user import User
+from models.workout import Workout, WorkoutExercise
+from utils.pagination import keyset_page
+
+# Acceso a datos por agregado. Las páginas reciben DTOs inmutables (o
+# DataFrames para tablas y gráficos) en lugar de objetos ORM vivos, y cada
+# método público declara cuántas consultas puede hacer (ver query_budget).
+# Los métodos de escritura no hacen commit: quien llama cierra la transacción.
+# Los historiales y series de gráficos (@replica_read) pueden leerse de una
+# réplica; los catálogos no, porque se recargan justo después de un cambio.
+
+@dataclass(frozen=True, slots=True)
+class UserDTO:
+    id: int
+    username: str
+    email: str
+    full_name: Optional[str]
+    height: Optional[float]
+    initial_weight: Optional[float]
+
+@dataclass(frozen=True, slots=True)
+class MetricDTO:
+    id: int
+    date: datetime
+    weight: float
+    height: float
+    bmi: Optional[float]
+
+@dataclass(frozen=True, slots=True)
+class DayTotalsDTO:
+    day: date
+    kcal: float
+    protein: float
+    carbs: float
+    fat: float
+    meal_count: int
+
+@dataclass(frozen=True, slots=True)
+class WorkoutSummaryDTO:
+    id: int
+    date: datetime
+    name: str
+    duration: Optional[int]
+
+@dataclass(frozen=True, slots=True)
+class SetDTO:
+    exercise: str
+    sets: int
+    reps: int
+    weight: Optional[float]
+
+@dataclass(frozen=True, slots=True)
+class WorkoutDTO:
+    id: int
+    date: datetime
+    name: str
+    duration: Optional[int]
+    notes: Optional[str]
+    sets: Tuple[SetDTO, ...]
+
+@dataclass(frozen=True, slots=True)
+class GoalDTO:
+    id: int
+    title: str
+    description: Optional[str]
+    category: Optional[str]
+    target_value: Optional[float]
+    target_unit: Optional[str]
+    start_date: date
+    target_date: Optional[date]
+    completed: bool
+    completed_date: Optional[date]
+
+_USER_COLUMNS = (User.id, User.username, User.email, User.full_name, User.height, User.initial_weight)
+_METRIC_COLUMNS = (BodyMetric.id, BodyMetric.date, BodyMetric.weight, BodyMetric.height, BodyMetric.bmi)
+_GOAL_COLUMNS = (
+    Goal.id, Goal.title, Goal.description, Goal.category, Goal.target_value, Goal.target_unit,
+    Goal.start_date, Goal.target_date, Goal.completed, Goal.completed_date,
+)
+
+class Repository:
+    __slots__ = ("db",)
+
+    def __init__(self, db):
+        self.db = db
+
+class UserRepository(Repository):
+    __slots__ = ()
+
+    @query_budget(1)
+    def get(self, user_id: int) -> Optional[UserDTO]:
+        row = self.db.execute(select(*_USER_COLUMNS).where(User.id == user_id)).first()
+        return UserDTO(*row) if row else None
+
+    @query_budget(1)
+    def email_taken(self, email: str, exclude_user_id: Optional[int] = None) -> bool:
+        stmt = select(User.id).where(User.email == email)
+        if exclude_user_id is not None:
+            stmt = stmt.where(User.id != exclude_user_id)
+        return self.db.scalar(stmt.limit(1)) is not None
+
+    @query_budget(1)
+    def password_hash(self, user_id: int) -> Optional[str]:
+        return self.db.scalar(select(User.hashed_password).where(User.id == user_id))
+
+    @query_budget(1)
+    def update_profile(self, user_id: int, full_name: str, email: str):
+        self.db.execute(update(User).where(User.id == user_id).values(full_name=full_name, email=email))
+
+    @query_budget(1)
+    def set_password_hash(self, user_id: int, hashed_password: str):
+        self.db.execute(update(User).where(User.id == user_id).values(hashed_password=hashed_password))
+
+class MetricRepository(Repository):
+    __slots__ = ()
+
+    @query_budget(1)
+    def latest(self, user_id: int) -> Optional[MetricDTO]:
+        row = self.db.execute(
+            select(*_METRIC_COLUMNS).where(BodyMetric.user_id == user_id)
+            .order_by(BodyMetric.date.desc(), BodyMetric.id.desc()).limit(1)
+        ).first()
+        return MetricDTO(*row) if row else None
+
+    @replica_read
+    @query_budget(1)
+    def history(self, user_id: int, start_date=None, end_date=None, cursor=None) -> Tuple[List[MetricDTO], Optional[tuple]]:
+        query = self.db.query(*_METRIC_COLUMNS).filter(BodyMetric.user_id == user_id)
+        if start_date:
+            query = query.filter(BodyMetric.date >= start_date)
+        if end_date:
+            query = query.filter(BodyMetric.date <= end_date)
+        rows, next_cursor = keyset_page(query, BodyMetric.date, BodyMetric.id, cursor)
+        return [MetricDTO(*row) for row in rows], next_cursor
+
+    @replica_read
+    @query_budget(1)
+    def weight_series(self, user_id: int, start_date=None, end_date=None) -> pd.DataFrame:
+        # Solo las columnas del gráfico, en orden cronológico
+        stmt = select(BodyMetric.date, BodyMetric.weight, BodyMetric.bmi).where(BodyMetric.user_id == user_id)
+        if start_date:
+            stmt = stmt.where(BodyMetric.date >= start_date)
+        if end_date:
+            stmt = stmt.where(BodyMetric.date <= end_date)
+        df = pd.DataFrame(self.db.execute(stmt.order_by(BodyMetric.date)).all(), columns=["Fecha", "Peso (kg)", "IMC"])
+        df["Fecha"] = pd.to_datetime(df["Fecha"]).dt.strftime("%Y-%m-%d")
+        return df
+
+class MealRepository(Repository):
+    __slots__ = ()
+
+    @query_budget(1)
+    def day_totals(self, user_id: int, day: date) -> Optional[DayTotalsDTO]:
+        totals = get_day_totals(self.db, user_id, day)
+        if totals is None:
+            return None
+        return DayTotalsDTO(totals.day, totals.kcal, totals.protein, totals.carbs, totals.fat, totals.meal_count)
+
+    @replica_read
+    @query_budget(1)
+    def daily_totals(self, user_id: int, start_date=None, end_date=None) -> pd.DataFrame:
+        return load_daily_totals(self.db, user_id, start_date, end_date)
+
+    @replica_read
+    # +1 la primera vez que se busca en una base SQLite: comprobar si existe foods_fts
+    @query_budget(2)
+    def history(self, user_id: int, start_date=None, end_date=None, food_search: Optional[str] = None) -> pd.DataFrame:
+        # Comidas unidas a su alimento; calorías y macros por fila calculados en SQL
+        factor = MealLog.quantity / 100
+        stmt = (
+            select(
+                func.date(MealLog.date).label("Fecha"),
+                Food.name.label("Alimento"),
+                MealLog.quantity.label("Cantidad (g)"),
+                (Food.calories * factor).label("Calorías"),
+                (func.coalesce(Food.protein, 0) * factor).label("Proteína"),
+                (func.coalesce(Food.carbs, 0) * factor).label("Carbohidratos"),
+                (func.coalesce(Food.fat, 0) * factor).label("Grasas"),
+            )
+            .join(Food, MealLog.food_id == Food.id)
+            .where(MealLog.user_id == user_id)
+            .order_by(MealLog.date.desc())
+        )
+        if start_date:
+            stmt = stmt.where(MealLog.date >= start_date)
+        if end_date:
+            stmt = stmt.where(MealLog.date <= end_date)
+        if food_search:
+            # Los mismos alimentos que encuentra el selector (mismo índice), sin límite
+            stmt = stmt.where(MealLog.food_id.in_(matching_food_ids(self.db, food_search)))
+        result = self.db.execute(stmt)
+        df = pd.DataFrame(result.all(), columns=list(result.keys()))
+        # PostgreSQL devuelve date y SQLite texto: normalizar a 'YYYY-MM-DD'
+        df["Fecha"] = df["Fecha"].astype(str)
+        nutrients = ["Calorías", "Proteína", "Carbohidratos", "Grasas"]
+        df[nutrients] = df[nutrients].astype(float).round(2)
+        return df
+
+class WorkoutRepository(Repository):
+    __slots__ = ()
+
+    @query_budget(1)
+    def recent(self, user_id: int, limit: int = 5) -> List[WorkoutSummaryDTO]:
+        rows = self.db.execute(
+            select(Workout.id, Workout.date, Workout.name, Workout.duration)
+            .where(Workout.user_id == user_id).order_by(Workout.date.desc(), Workout.id.desc()).limit(limit)
+        ).all()
+        return [WorkoutSummaryDTO(*row) for row in rows]
+
+    @query_budget(1)
+    def count_since(self, user_id: int, since: date) -> int:
+        return self.db.scalar(
+            select(func.count(Workout.id)).where(Workout.user_id == user_id, Workout.date >= since)
+        )
+
+    @replica_read
+    @query_budget(1)
+    def progress(self, user_id: int) -> pd.DataFrame:
+        return load_progress(self.db, user_id)
+
+    @replica_read
+    @query_budget(2)
+    def history(self, user_id: int, start_date=None, end_date=None, search=None, cursor=None) -> Tuple[List[WorkoutDTO], Optional[tuple]]:
+        query = self.db.query(Workout.id, Workout.date, Workout.name, Workout.duration, Workout.notes).filter(
+            Workout.user_id == user_id
+        )
+        if start_date:
+            query = query.filter(Workout.date >= start_date)
+        if end_date:
+            query = query.filter(Workout.date <= end_date)
+        if search:
+            query = query.filter(Workout.name.ilike(f"%{search}%"))
+        rows, next_cursor = keyset_page(query, Workout.date, Workout.id, cursor)
+        # Series de toda la página en una sola consulta adicional (sin N+1)
+        sets = {}
+        if rows:
+            result = self.db.execute(
+                select(WorkoutExercise.workout_id, Exercise.name, WorkoutExercise.sets, WorkoutExercise.reps, WorkoutExercise.weight)
+                .join(Exercise, WorkoutExercise.exercise_id == Exercise.id)
+                .where(WorkoutExercise.workout_id.in_([row.id for row in rows]))
+                .order_by(WorkoutExercise.id)
+            )
+            for workout_id, *values in result:
+                sets.setdefault(workout_id, []).append(SetDTO(*values))
+        return [WorkoutDTO(*row, tuple(sets.get(row.id, ()))) for row in rows], next_cursor
+
+class TrendRepository(Repository):
+    __slots__ = ()
+
+    @replica_read
+    @query_budget(1)
+    def series(self, user_id: int, series: str, start_date=None, end_date=None) -> pd.DataFrame:
+        # series: "weight", "kcal" o "volume"; valor diario, media 7 días, tendencia y cambio semanal
+        return trend_series(self.db, user_id, series, start_date, end_date)
+
+    @replica_read
+    @query_budget(1)
+    def latest(self, user_id: int) -> Dict[str, Optional[TrendSummary]]:
+        return latest_trends(self.db, user_id)
+
+class GoalRepository(Repository):
+    __slots__ = ()
+
+    @query_budget(1)
+    def get(self, user_id: int, goal_id: int) -> Optional[GoalDTO]:
+        row = self.db.execute(select(*_GOAL_COLUMNS).where(Goal.id == goal_id, Goal.user_id == user_id)).first()
+        return GoalDTO(*row) if row else None
+
+    @query_budget(1)
+    def active(self, user_id: int) -> List[GoalDTO]:
+        rows = self.db.execute(
+            select(*_GOAL_COLUMNS).where(Goal.user_id == user_id, Goal.completed == False).order_by(Goal.target_date)
+        ).all()
+        return [GoalDTO(*row) for row in rows]
+
+    @query_budget(1)
+    def completed(self, user_id: int) -> List[GoalDTO]:
+        rows = self.db.execute(
+            select(*_GOAL_COLUMNS).where(Goal.user_id == user_id, Goal.completed == True)
+            .order_by(Goal.completed_date.desc())
+        ).all()
+        return [GoalDTO(*row) for row in rows]
+
+    @query_budget(1)
+    def create(self, user_id: int, **values):
+        self.db.execute(insert(Goal).values(user_id=user_id, completed=False, **values))
+
+    @query_budget(1)
+    def update(self, user_id: int, goal_id: int, **values):
+        self.db.execute(update(Goal).where(Goal.id == goal_id, Goal.user_id == user_id).values(**values))
+
+    @query_budget(1)
+    def complete(self, user_id: int, goal_id: int, day: date):
+        self.update(user_id, goal_id, completed=True, completed_date=day)
+
+    @query_budget(1)
+    def delete(self, user_id: int, goal_id: int):
+        self.db.execute(delete(Goal).where(Goal.id == goal_id, Goal.user_id == user_id))
+
+class CatalogRepository(Repository):
+    __slots__ = ()
+
+    # Instantáneas versionadas del proceso: a lo sumo una consulta al recargar
+
+    @query_budget(1)
+    def foods(self) -> FoodCatalog:
+        return get_food_catalog(self.db)
+
+    @query_budget(1)
+    def exercises(self) -> ExerciseCatalog:
+        return get_exercise_catalog(self.db)
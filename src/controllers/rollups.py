@@ -0,0 +1,27 @@
+from typing import List
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from models.user import User
+
+# Utilidades compartidas por las tablas de agregados (daily_nutrition_totals,
+# exercise_daily_volume, exercise_stats). Dos escrituras concurrentes del mismo
+# usuario (dos pestañas, o el importador y la página) recalculan las mismas
+# claves: se serializan bloqueando la fila del usuario y las filas se escriben
+# con INSERT ... ON CONFLICT DO UPDATE, nunca con DELETE + INSERT.
+
+def lock_users(db, user_ids):
+    # SELECT ... FOR UPDATE sobre users, en orden de id para no crear interbloqueos.
+    # Tras obtener el bloqueo, las sentencias siguientes (READ COMMITTED) ven
+    # las escrituras ya confirmadas por la otra transacción. SQLite bloquea
+    # la base entera al escribir y omite FOR UPDATE.
+    db.execute(select(User.id).where(User.id.in_(user_ids)).order_by(User.id).with_for_update())
+
+def upsert_from_select(db, table, columns: List[str], rows, keys: List[str]):
+    # INSERT ... SELECT que actualiza las filas cuya clave ya existe
+    # (ON CONFLICT: PostgreSQL y SQLite, los motores que usa la app)
+    module = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    stmt = module.insert(table).from_select(columns, rows)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=keys,
+        set_={column: stmt.excluded[column] for column in columns if column not in keys},
+    ))
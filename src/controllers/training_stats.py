@@ -0,0 +1,182 @@
+import argparse
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+import pandas as pd
+from sqlalchemy import and_, delete, func, or_, select, true, tuple_
+from models.exercise import Exercise
+from models.exercisestats import ExerciseDailyVolume, ExerciseStats
+from models.workout import Workout, WorkoutExercise
+from controllers.rollups import lock_users, upsert_from_select
+
+# Mantenimiento de exercise_daily_volume y exercise_stats. Cada escritura de
+# entrenamientos recalcula solo los (usuario, ejercicio, día) afectados y las
+# estadísticas de esos (usuario, ejercicio), dentro de la misma transacción;
+# quien llama hace el commit. Las escrituras concurrentes del mismo usuario se
+# serializan (ver controllers/rollups.py).
+
+DAILY_COLUMNS = ["user_id", "exercise_id", "day", "volume", "max_weight", "best_set_volume"]
+STATS_COLUMNS = ["user_id", "exercise_id", "pr_weight", "best_set_volume", "last_performed", "lifetime_volume"]
+
+def workout_day(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+def workout_keys(workout: Workout) -> set:
+    # Claves (user_id, exercise_id, día) a las que contribuye un entrenamiento
+    day = workout_day(workout.date)
+    return {(workout.user_id, we.exercise_id, day) for we in workout.exercises}
+
+def _daily_aggregate(sets_filter):
+    day = func.date(Workout.date)
+    weight = func.coalesce(WorkoutExercise.weight, 0)
+    return (
+        select(
+            Workout.user_id,
+            WorkoutExercise.exercise_id,
+            day,
+            func.sum(weight * WorkoutExercise.reps * WorkoutExercise.sets),
+            func.max(weight),
+            func.max(weight * WorkoutExercise.reps),
+        )
+        .join(Workout, WorkoutExercise.workout_id == Workout.id)
+        .where(sets_filter)
+        .group_by(Workout.user_id, WorkoutExercise.exercise_id, day)
+    )
+
+def _stats_aggregate(daily_filter):
+    return (
+        select(
+            ExerciseDailyVolume.user_id,
+            ExerciseDailyVolume.exercise_id,
+            func.max(ExerciseDailyVolume.max_weight),
+            func.max(ExerciseDailyVolume.best_set_volume),
+            func.max(ExerciseDailyVolume.day),
+            func.sum(ExerciseDailyVolume.volume),
+        )
+        .where(daily_filter)
+        .group_by(ExerciseDailyVolume.user_id, ExerciseDailyVolume.exercise_id)
+    )
+
+def _recompute_daily(db, daily_filter, sets_filter):
+    # Días del filtro que ya no tienen series; el resto se inserta o actualiza
+    db.execute(delete(ExerciseDailyVolume).where(
+        daily_filter,
+        tuple_(ExerciseDailyVolume.user_id, ExerciseDailyVolume.exercise_id, ExerciseDailyVolume.day).not_in(
+            select(Workout.user_id, WorkoutExercise.exercise_id, func.date(Workout.date))
+            .join(Workout, WorkoutExercise.workout_id == Workout.id)
+            .where(sets_filter)
+        ),
+    ))
+    upsert_from_select(db, ExerciseDailyVolume.__table__, DAILY_COLUMNS, _daily_aggregate(sets_filter),
+                       ["user_id", "exercise_id", "day"])
+
+def _recompute_stats(db, pairs_filter):
+    db.execute(delete(ExerciseStats).where(
+        pairs_filter(ExerciseStats),
+        tuple_(ExerciseStats.user_id, ExerciseStats.exercise_id).not_in(
+            select(ExerciseDailyVolume.user_id, ExerciseDailyVolume.exercise_id).where(pairs_filter(ExerciseDailyVolume))
+        ),
+    ))
+    upsert_from_select(db, ExerciseStats.__table__, STATS_COLUMNS, _stats_aggregate(pairs_filter(ExerciseDailyVolume)),
+                       ["user_id", "exercise_id"])
+
+def refresh_exercise_stats(db, keys: Iterable[Tuple[int, int, date]]):
+    # keys: (user_id, exercise_id, día) tocados por un alta, edición o baja
+    keys = {(u, e, workout_day(d)) for u, e, d in keys}
+    if not keys:
+        return
+    db.flush()
+    lock_users(db, sorted({u for u, _, _ in keys}))
+    _recompute_daily(
+        db,
+        or_(*(
+            and_(ExerciseDailyVolume.user_id == u, ExerciseDailyVolume.exercise_id == e, ExerciseDailyVolume.day == d)
+            for u, e, d in keys
+        )),
+        or_(*(
+            # Rango por día para aprovechar el índice (user_id, date)
+            and_(Workout.user_id == u, WorkoutExercise.exercise_id == e,
+                 Workout.date >= d, Workout.date < d + timedelta(days=1))
+            for u, e, d in keys
+        )),
+    )
+    pairs = {(u, e) for u, e, _ in keys}
+    _recompute_stats(db, lambda table: tuple_(table.user_id, table.exercise_id).in_(list(pairs)))
+
+def rebuild_exercise_stats(db, user_id: Optional[int] = None):
+    db.flush()
+    if user_id is None:
+        _recompute_daily(db, true(), true())
+        _recompute_stats(db, lambda table: true())
+    else:
+        lock_users(db, [user_id])
+        _recompute_daily(db, ExerciseDailyVolume.user_id == user_id, Workout.user_id == user_id)
+        _recompute_stats(db, lambda table: table.user_id == user_id)
+
+def check_exercise_stats(db, user_id: Optional[int] = None, tolerance: float = 0.01) -> List[tuple]:
+    # Compara exercise_daily_volume con un recálculo desde workout_exercises
+    sets_filter = true() if user_id is None else Workout.user_id == user_id
+    daily_filter = true() if user_id is None else ExerciseDailyVolume.user_id == user_id
+    expected = {(u, e, str(d)): row for u, e, d, *row in db.execute(_daily_aggregate(sets_filter)).all()}
+    stored = {
+        (r.user_id, r.exercise_id, str(r.day)): [r.volume, r.max_weight, r.best_set_volume]
+        for r in db.scalars(select(ExerciseDailyVolume).where(daily_filter))
+    }
+    mismatches = []
+    for key in sorted(expected.keys() | stored.keys()):
+        exp, got = expected.get(key), stored.get(key)
+        if exp is None or got is None or any(abs(a - b) > tolerance for a, b in zip(exp, got)):
+            mismatches.append((key, exp, got))
+    return mismatches
+
+def get_exercise_stats(db, user_id: int, exercise_ids: Iterable[int]) -> Dict[int, ExerciseStats]:
+    exercise_ids = list(exercise_ids)
+    if not exercise_ids:
+        return {}
+    stats = db.scalars(
+        select(ExerciseStats).where(ExerciseStats.user_id == user_id, ExerciseStats.exercise_id.in_(exercise_ids))
+    )
+    return {s.exercise_id: s for s in stats}
+
+def load_progress(db, user_id: int) -> pd.DataFrame:
+    # Volumen y peso máximo por día y ejercicio desde el agregado diario
+    stmt = (
+        select(
+            ExerciseDailyVolume.day.label("Fecha"),
+            Exercise.name.label("Ejercicio"),
+            func.sum(ExerciseDailyVolume.volume).label("Volumen"),
+            func.max(ExerciseDailyVolume.max_weight).label("Peso"),
+        )
+        .join(Exercise, ExerciseDailyVolume.exercise_id == Exercise.id)
+        .where(ExerciseDailyVolume.user_id == user_id)
+        .group_by(ExerciseDailyVolume.day, Exercise.name)
+        .order_by(ExerciseDailyVolume.day)
+    )
+    result = db.execute(stmt)
+    df = pd.DataFrame(result.all(), columns=list(result.keys()))
+    df["Fecha"] = df["Fecha"].astype(str)
+    return df
+
+def main():
+    parser = argparse.ArgumentParser(description="Mantenimiento de exercise_daily_volume y exercise_stats")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--user", type=int, help="Limitar a un usuario")
+    args = parser.parse_args()
+    import models.user  # Workout.user se resuelve por nombre
+    from database.database import SessionLocal
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            rebuild_exercise_stats(db, args.user)
+            db.commit()
+            print("Estadísticas de ejercicios reconstruidas.")
+        else:
+            mismatches = check_exercise_stats(db, args.user)
+            for key, expected, stored in mismatches:
+                print(f"{key}: esperado={expected} guardado={stored}")
+            print(f"{len(mismatches)} diferencias.")
+            raise SystemExit(1 if mismatches else 0)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+import math
+from datetime import date
+from typing import Dict, NamedTuple, Optional
+import pandas as pd
+from sqlalchemy import Date, Float, case, cast, func, literal, select, union_all
+from database.database import get_setting
+from models.bodymetric import BodyMetric
+from models.exercisestats import ExerciseDailyVolume
+from models.dailynutrition import DailyNutritionTotal
+
+# Tendencias por día de peso, calorías y volumen de entrenamiento:
+# - media móvil de ROLLING_DAYS días naturales (no de registros),
+# - peso de tendencia: media exponencial con factor TREND_ALPHA por día,
+# - cambio semanal: pendiente de la recta de mínimos cuadrados de los últimos
+#   RATE_DAYS días, multiplicada por 7.
+# En PostgreSQL se calculan en la base con funciones de ventana y a Python solo
+# llegan las filas pedidas; en otros motores (SQLite) se leen los valores
+# diarios y se calculan con pandas. Ambos caminos dan los mismos números.
+
+ROLLING_DAYS = 7
+RATE_DAYS = int(get_setting("TREND_RATE_DAYS", 28))
+TREND_ALPHA = float(get_setting("TREND_ALPHA", 0.1))
+
+# Tendencia en SQL: los días con peso relativo menor que TREND_EPSILON quedan
+# fuera de la ventana, y dentro de un bloque los pesos varían como mucho en
+# un factor BLOCK_SPREAD (ver _windowed)
+TREND_EPSILON = 1e-17
+BLOCK_SPREAD = 1e-4
+
+LABELS = {"weight": "Peso (kg)", "kcal": "Calorías", "volume": "Volumen"}
+TREND_COLUMNS = ["Media 7 días", "Tendencia", "Cambio semanal"]
+
+class TrendSummary(NamedTuple):
+    day: date
+    value: float
+    mean_7d: float
+    trend: float
+    weekly_rate: Optional[float]
+
+def _daily(series: str, user_id: int):
+    # (day, value): un valor por día con datos
+    if series == "weight":
+        day = func.date(BodyMetric.date, type_=Date)
+        return (
+            select(day.label("day"), func.avg(BodyMetric.weight).label("value"))
+            .where(BodyMetric.user_id == user_id).group_by(day)
+        )
+    if series == "kcal":
+        return select(
+            DailyNutritionTotal.day.label("day"), DailyNutritionTotal.kcal.label("value")
+        ).where(DailyNutritionTotal.user_id == user_id)
+    if series == "volume":
+        return (
+            select(ExerciseDailyVolume.day.label("day"), func.sum(ExerciseDailyVolume.volume).label("value"))
+            .where(ExerciseDailyVolume.user_id == user_id).group_by(ExerciseDailyVolume.day)
+        )
+    raise ValueError(f"serie desconocida: {series}")
+
+def _day_number(dialect: str, day):
+    # Días desde 1970-01-01, para que las ventanas RANGE cuenten días naturales
+    if dialect == "postgresql":
+        return day - literal(date(1970, 1, 1), Date)
+    return func.julianday(day) - 2440587.5
+
+def _trend_blocks():
+    # (días de ventana, días por bloque, bloques distintos dentro de la ventana)
+    decay = math.log(1 - TREND_ALPHA)
+    horizon = max(1, math.ceil(math.log(TREND_EPSILON) / decay))
+    block = max(1, math.floor(math.log(BLOCK_SPREAD) / decay))
+    return horizon, block, math.ceil(horizon / block) + 1
+
+def _windowed(dialect: str, series: str, user_id: int):
+    daily = _daily(series, user_id).subquery()
+    day_number = _day_number(dialect, daily.c.day)
+    numbered = select(
+        daily.c.day,
+        cast(daily.c.value, Float).label("value"),
+        # Entero en PostgreSQL: las ventanas RANGE se ordenan por day_number
+        day_number.label("day_number"),
+        cast(day_number, Float).label("x"),
+        func.min(cast(day_number, Float)).over().label("first_x"),
+    ).subquery()
+    n = numbered.c
+    rolling = dict(order_by=n.day_number, range_=(-(ROLLING_DAYS - 1), 0))
+    rate = dict(order_by=n.day_number, range_=(-(RATE_DAYS - 1), 0))
+    # Media exponencial con pesos (1 - alfa)^(días hasta la fila). El agregado
+    # de una ventana no puede usar la x de la fila, y anclar el exponente al
+    # último día lo desborda por abajo en historiales largos (PostgreSQL da
+    # error). En su lugar:
+    # - la ventana abarca `horizon` días; los anteriores pesan < TREND_EPSILON,
+    # - cada día se pondera hasta el final de su bloque de `block` días, así
+    #   que el exponente nunca pasa de `block`,
+    # - los bloques de la ventana caen en clases distintas (bloque mod
+    #   `classes`), cada una con su suma, que se reescala con
+    #   (1 - alfa)^(block * bloques hasta el de la fila).
+    # Una suma por clase solo mezcla pesos de un mismo bloque: SQLite calcula
+    # las ventanas deslizantes restando las filas que salen, y restar pesos
+    # ~1 dejaría un error mayor que los pesos ~TREND_EPSILON que quedan.
+    horizon, block, classes = _trend_blocks()
+    offset = n.x - n.first_x
+    number = func.floor(offset / block)
+    decay = func.power(1 - TREND_ALPHA, (number + 1) * block - offset)
+    klass = number - classes * func.floor(number / classes)
+    trend_window = dict(order_by=n.day_number, range_=(-(horizon - 1), 0))
+
+    def decayed_sum(weighted):
+        return sum(
+            func.sum(case((klass == k, weighted), else_=0)).over(**trend_window)
+            * func.power(1 - TREND_ALPHA, block * case((klass >= k, klass - k), else_=klass - k + classes))
+            for k in range(classes)
+        )
+
+    mean_x = func.avg(n.x).over(**rate)
+    slope = (
+        (func.avg(n.x * n.value).over(**rate) - mean_x * func.avg(n.value).over(**rate))
+        / func.nullif(func.avg(n.x * n.x).over(**rate) - mean_x * mean_x, 0)
+    )
+    return select(
+        n.day,
+        n.value,
+        func.avg(n.value).over(**rolling).label("mean_7d"),
+        (decayed_sum(n.value * decay) / decayed_sum(decay)).label("trend"),
+        (slope * 7).label("weekly_rate"),
+    ).subquery()
+
+def _smooth(daily: pd.DataFrame) -> pd.DataFrame:
+    # Camino pandas, vectorizado; daily: columnas day y value en orden de día
+    values = daily.set_index(pd.to_datetime(daily["day"]))["value"].astype(float)
+    x = pd.Series((values.index - values.index[0]).days.astype(float), index=values.index)
+    window = f"{RATE_DAYS}D"
+    mean_x = x.rolling(window).mean()
+    variance = (x * x).rolling(window).mean() - mean_x * mean_x
+    covariance = (x * values).rolling(window).mean() - mean_x * values.rolling(window).mean()
+    halflife = pd.Timedelta(days=math.log(0.5) / math.log(1 - TREND_ALPHA))
+    return pd.DataFrame({
+        "day": daily["day"].to_numpy(),
+        "value": values.to_numpy(),
+        "mean_7d": values.rolling(f"{ROLLING_DAYS}D").mean().to_numpy(),
+        "trend": values.ewm(halflife=halflife, times=values.index).mean().to_numpy(),
+        "weekly_rate": (covariance / variance.where(variance != 0) * 7).to_numpy(),
+    })
+
+def _frame(rows, series: str) -> pd.DataFrame:
+    df = pd.DataFrame(rows, columns=["day", "value", "mean_7d", "trend", "weekly_rate"])
+    df.insert(0, "Fecha", df.pop("day").astype(str))
+    df.columns = ["Fecha", LABELS[series], *TREND_COLUMNS]
+    return df.set_index("Fecha").astype(float).round(2)
+
+def trend_series(db, user_id: int, series: str, start_date=None, end_date=None, in_database: Optional[bool] = None) -> pd.DataFrame:
+    # Índice 'YYYY-MM-DD'; las ventanas usan todo el historial aunque se pida un rango
+    dialect = db.get_bind().dialect.name
+    if in_database is None:
+        in_database = dialect == "postgresql"
+    if in_database:
+        trends = _windowed(dialect, series, user_id)
+        stmt = select(trends).order_by(trends.c.day)
+        if start_date:
+            stmt = stmt.where(trends.c.day >= start_date)
+        if end_date:
+            stmt = stmt.where(trends.c.day <= end_date)
+        return _frame(db.execute(stmt).all(), series)
+    daily = _daily(series, user_id).subquery()
+    rows = pd.DataFrame(db.execute(select(daily).order_by(daily.c.day)).all(), columns=["day", "value"])
+    if rows.empty:
+        return _frame([], series)
+    df = _smooth(rows)
+    days = pd.to_datetime(df["day"])
+    if start_date:
+        df = df[days >= pd.Timestamp(start_date)]
+    if end_date:
+        df = df[days <= pd.Timestamp(end_date)]
+    return _frame(df.to_numpy().tolist(), series)
+
+def latest_trends(db, user_id: int, in_database: Optional[bool] = None) -> Dict[str, Optional[TrendSummary]]:
+    # Último día de cada serie, en una sola consulta
+    dialect = db.get_bind().dialect.name
+    if in_database is None:
+        in_database = dialect == "postgresql"
+    result = dict.fromkeys(LABELS)
+    if in_database:
+        parts = []
+        for series in LABELS:
+            trends = _windowed(dialect, series, user_id)
+            last = select(trends).order_by(trends.c.day.desc()).limit(1).subquery()
+            parts.append(select(literal(series).label("series"), last))
+        for series, *row in db.execute(union_all(*parts)).all():
+            result[series] = _summary(row)
+        return result
+    daily = union_all(*(
+        select(literal(series).label("series"), _daily(series, user_id).subquery()) for series in LABELS
+    )).subquery()
+    rows = pd.DataFrame(db.execute(select(daily)).all(), columns=["series", "day", "value"])
+    for series, group in rows.groupby("series"):
+        result[series] = _summary(_last(group.sort_values("day")))
+    return result
+
+def _last(daily: pd.DataFrame) -> list:
+    # Solo la última fila de _smooth, con numpy sobre todo el historial
+    y = daily["value"].to_numpy(dtype=float)
+    x = (pd.to_datetime(daily["day"]) - pd.Timestamp(daily["day"].iloc[-1])).dt.days.to_numpy(dtype=float)
+    decay = (1 - TREND_ALPHA) ** -x
+    recent = x > -RATE_DAYS
+    xr, yr = x[recent], y[recent]
+    variance = (xr * xr).mean() - xr.mean() ** 2
+    slope = ((xr * yr).mean() - xr.mean() * yr.mean()) / variance if variance else None
+    return [
+        daily["day"].iloc[-1],
+        y[-1],
+        y[x > -ROLLING_DAYS].mean(),
+        decay @ y / decay.sum(),
+        slope * 7 if slope is not None else None,
+    ]
+
+def _summary(row) -> TrendSummary:
+    day, *values = row
+    # PostgreSQL devuelve date y SQLite texto
+    day = date.fromisoformat(str(day)[:10])
+    value, mean_7d, trend, weekly_rate = (None if v is None or pd.isna(v) else round(float(v), 2) for v in values)
+    return TrendSummary(day, value, mean_7d, trend, weekly_rate)
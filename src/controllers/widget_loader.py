@@ -0,0 +1,82 @@
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, NamedTuple, Optional
+from database.database import SessionLocal, get_setting
+from database.instrumentation import current_stats, rerun_context
+from database.routing import RoutingSession
+
+# Carga concurrente de los datos de varios widgets (p. ej. el dashboard): cada
+# cargador corre en un hilo con su propia sesión, así la página espera un solo
+# viaje de ida y vuelta a la base en lugar de uno por widget. Un widget que no
+# responde a tiempo se degrada solo, sin bloquear a los demás.
+#
+# El pool es del proceso y lo comparten todas las sesiones. El plazo de cada
+# widget cuenta desde que su tarea empieza, no desde que se encola; si ni
+# siquiera empieza dentro de ese mismo plazo (pool saturado) se cancela, así
+# el trabajo encolado no se acumula. Espera máxima: el doble del plazo.
+
+WIDGET_WORKERS = int(get_setting("WIDGET_WORKERS", 16))
+WIDGET_TIMEOUT_SECONDS = float(get_setting("WIDGET_TIMEOUT_SECONDS", 3))
+
+logger = logging.getLogger("fit_tracking.widgets")
+
+_pool = ThreadPoolExecutor(max_workers=WIDGET_WORKERS, thread_name_prefix="widgets")
+
+class WidgetResult(NamedTuple):
+    value: Any
+    error: Optional[str] = None
+
+def _run(name: str, started: Dict[str, float], loader: Callable, stats, primary_until: float):
+    # Sin st.*: los hilos del pool no tienen contexto de Streamlit
+    started[name] = time.monotonic()
+    with rerun_context(stats), SessionLocal() as db:
+        db.primary_until = primary_until
+        return loader(db)
+
+def load_widgets(db, loaders: Dict[str, Callable], timeouts: Optional[Dict[str, float]] = None) -> Dict[str, WidgetResult]:
+    # loaders: nombre -> función que recibe una sesión y devuelve DTOs/DataFrames.
+    # Las sesiones de los hilos heredan el read-your-writes de la del rerun (db).
+    primary_until = 0.0
+    if isinstance(db, RoutingSession):
+        primary_until = float("inf") if db.wrote else db.primary_until
+    stats = current_stats()
+    limits = {name: (timeouts or {}).get(name, WIDGET_TIMEOUT_SECONDS) for name in loaders}
+    started: Dict[str, float] = {}
+    submitted = time.monotonic()
+    pending = {
+        name: _pool.submit(_run, name, started, loader, stats, primary_until) for name, loader in loaders.items()
+    }
+    results = {}
+    while pending:
+        for name in [name for name, future in pending.items() if future.done()]:
+            results[name] = _result(name, pending.pop(name))
+        now = time.monotonic()
+        expired = [name for name in pending if started.get(name, submitted) + limits[name] <= now]
+        for name in expired:
+            future = pending[name]
+            if future.cancel():
+                logger.warning("Widget %s cancelado: sin hilos libres tras %.1f s", name, limits[name])
+                results[name] = WidgetResult(None, "sin hilos libres")
+            elif future.done():
+                results[name] = _result(name, future)
+            elif started.setdefault(name, now) + limits[name] > now:
+                # Empezó justo al vencer el plazo de cola (quizá _run aún no ha
+                # anotado el inicio): su plazo cuenta desde que empezó
+                continue
+            else:
+                # La consulta sigue en su hilo y cierra su sesión al terminar
+                logger.warning("Widget %s sin respuesta tras %.1f s", name, limits[name])
+                results[name] = WidgetResult(None, "tiempo de espera agotado")
+            del pending[name]
+        if pending:
+            deadline = min(started.get(name, submitted) + limits[name] for name in pending)
+            wait(pending.values(), timeout=max(0.0, deadline - now), return_when=FIRST_COMPLETED)
+    return {name: results[name] for name in loaders}
+
+def _result(name: str, future) -> WidgetResult:
+    try:
+        return WidgetResult(future.result())
+    except Exception as e:
+        logger.exception("Error al cargar el widget %s", name)
+        return WidgetResult(None, str(e))
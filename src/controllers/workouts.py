@@ -0,0 +1,41 @@
+from datetime import date
+from typing import Dict, List, NamedTuple, Optional
+import pandas as pd
+from sqlalchemy import insert
+from controllers.training_stats import refresh_exercise_stats
+from models.workout import Workout, WorkoutExercise
+
+# Alta de un entrenamiento completo: el entrenamiento con INSERT ... RETURNING
+# y todas sus series en un único INSERT de varias filas, dentro de la misma
+# transacción que el recálculo de estadísticas; quien llama hace el commit.
+
+class SetRow(NamedTuple):
+    exercise_id: int
+    reps: int
+    weight: float
+
+def sets_from_editor(sets_df: pd.DataFrame, ids_by_label: Dict[str, int]) -> List[SetRow]:
+    # Filas del st.data_editor: sin ejercicio o repeticiones se ignoran y un
+    # peso vacío llega como NaN (que es verdadero), así que se pasa a 0 aquí
+    sets_df = sets_df.dropna(subset=["Ejercicio", "Repeticiones"])
+    weights = sets_df["Peso (kg)"].astype(float).fillna(0.0)
+    return [
+        SetRow(ids_by_label[label], int(reps), float(weight))
+        for label, reps, weight in zip(sets_df["Ejercicio"], sets_df["Repeticiones"], weights)
+    ]
+
+def create_workout(db, user_id: int, name: str, workout_date: date, duration: Optional[int],
+                   notes: Optional[str], sets: List[SetRow]) -> int:
+    workout_id = db.scalar(
+        insert(Workout)
+        .values(user_id=user_id, name=name, date=workout_date, duration=duration, notes=notes)
+        .returning(Workout.id)
+    )
+    if sets:
+        # Cada fila del editor es una serie
+        db.execute(insert(WorkoutExercise).values([
+            {"workout_id": workout_id, "exercise_id": s.exercise_id, "sets": 1, "reps": s.reps, "weight": s.weight}
+            for s in sets
+        ]))
+    refresh_exercise_stats(db, {(user_id, s.exercise_id, workout_date) for s in sets})
+    return workout_id
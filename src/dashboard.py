@@ -1,10 +1,9 @@
 import streamlit as st
 from datetime import datetime, timedelta
-from database.database import SessionLocal
-from models.bodymetric import BodyMetric
-from models.meallog import MealLog
-from models.food import Food
-from models.workout import Workout
+from database.database import get_session
+from controllers.dashboard_cache import load_dashboard
+from controllers.trends import RATE_DAYS
+from views.charts import line_chart
 import pandas as pd
 
 def check_session():
@@ -24,52 +23,79 @@ def dashboard_page():
     check_session()
     st.title("Dashboard")
     st.markdown("Bienvenido a tu panel de control. Aquí puedes ver tu progreso y KPIs principales.")
-    db = SessionLocal()
     user_id = st.session_state.user_id
+    today = datetime.now().date()
+
+    # Instantánea en caché o, si no hay, todos los widgets cargados a la vez
+    data = load_dashboard(get_session(), user_id, today)
 
     # Peso actual y evolución
-    metric = db.query(BodyMetric).filter(BodyMetric.user_id == user_id).order_by(BodyMetric.date.desc()).first()
-    if metric:
-        st.metric("Peso actual (kg)", f"{metric.weight}", help="Último peso registrado.")
+    metric = data["metric"]
+    if metric.error:
+        widget_unavailable("Peso actual", metric.error)
+    elif metric.value:
+        st.metric("Peso actual (kg)", f"{metric.value.weight}", help="Último peso registrado.")
     else:
         st.info("Registra tu peso para ver el progreso.")
 
     # Calorías consumidas hoy
-    today = datetime.now().date()
-    meals = db.query(MealLog).filter(MealLog.user_id == user_id, MealLog.date >= today).all()
-    foods = {f.id: f for f in db.query(Food).all()}
-    total_cal = 0
-    for meal in meals:
-        food = foods.get(meal.food_id)
-        if food:
-            total_cal += food.calories * meal.quantity / 100
-    st.metric("Calorías consumidas hoy", f"{round(total_cal, 2)} kcal", help="Suma de calorías de todas las comidas de hoy.")
+    totals = data["totals"]
+    if totals.error:
+        widget_unavailable("Calorías de hoy", totals.error)
+    else:
+        total_cal = totals.value.kcal if totals.value else 0
+        st.metric("Calorías consumidas hoy", f"{round(total_cal, 2)} kcal", help="Suma de calorías de todas las comidas de hoy.")
+
+    # Tendencias: suavizan el ruido día a día de la báscula, las comidas y el volumen
+    trends = data["trends"]
+    if trends.error:
+        widget_unavailable("Tendencias", trends.error)
+    elif any(trends.value.values()):
+        show_trends(trends.value)
 
     # Entrenamientos recientes
     st.subheader("Entrenamientos recientes")
-    workouts = db.query(Workout).filter(Workout.user_id == user_id).order_by(Workout.date.desc()).limit(5).all()
-    if workouts:
-        data = [{
+    workouts = data["workouts"]
+    if workouts.error:
+        widget_unavailable("Entrenamientos recientes", workouts.error)
+    elif workouts.value:
+        rows = [{
             "Fecha": w.date.strftime('%Y-%m-%d'),
             "Nombre": w.name,
             "Duración (min)": w.duration
-        } for w in workouts]
-        df = pd.DataFrame(data)
+        } for w in workouts.value]
+        df = pd.DataFrame(rows)
         st.dataframe(df)
     else:
         st.info("No hay entrenamientos registrados aún.")
 
-    # Gráfico de evolución de peso
+    # Gráfico de evolución de peso con su tendencia
     st.subheader("Evolución de Peso")
-    metrics = db.query(BodyMetric).filter(BodyMetric.user_id == user_id).order_by(BodyMetric.date).all()
-    if metrics:
-        data = [{"Fecha": m.date.strftime('%Y-%m-%d'), "Peso": m.weight} for m in metrics]
-        df = pd.DataFrame(data)
-        st.line_chart(df.set_index("Fecha"))
+    weights = data["weights"]
+    if weights.error:
+        widget_unavailable("Evolución de peso", weights.error)
+    elif not weights.value.empty:
+        df = weights.value
+        line_chart(df[["Peso (kg)", "Tendencia"]].rename(columns={"Peso (kg)": "Peso"}), key="dashboard_weight")
     else:
         st.info("No hay datos de peso para graficar.")
 
-    db.close()
+def show_trends(trends):
+    weight, kcal, volume = trends["weight"], trends["kcal"], trends["volume"]
+    col1, col2, col3 = st.columns(3)
+    if weight:
+        col1.metric(
+            "Peso de tendencia (kg)", f"{weight.trend}",
+            delta=f"{weight.weekly_rate:+} kg/semana" if weight.weekly_rate is not None else None,
+            delta_color="off", help=f"Media exponencial del peso; el cambio semanal sale de los últimos {RATE_DAYS} días.",
+        )
+    if kcal:
+        col2.metric("Calorías, media 7 días", f"{kcal.mean_7d} kcal", help=f"Media de los 7 días hasta el {kcal.day}.")
+    if volume:
+        col3.metric("Volumen, media 7 días", f"{volume.mean_7d}", help=f"Volumen medio por día entrenado hasta el {volume.day}.")
+
+def widget_unavailable(title: str, error: str):
+    st.warning(f"{title}: no disponible por ahora ({error}).")
 
 if __name__ == "__main__":
     dashboard_page() 
\ No newline at end of file
@@ -1,35 +1,130 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 import os
+import threading
+import time
+import streamlit as st
 from models.base_model import BaseModel
+from database.instrumentation import instrument
+from database.routing import ReplicaPool, RoutingSession
 
 # Cargar variables de entorno (útil en local, inofensivo en producción)
 load_dotenv()
 
+def get_setting(name: str, default=None):
+    # Las variables de entorno tienen prioridad sobre .streamlit/secrets.toml
+    value = os.getenv(name)
+    if value is not None:
+        return value
+    if st.secrets.load_if_toml_exists():
+        return st.secrets.get(name, default)
+    return default
+
 # Configuración de la base de datos
-DB_USER = os.getenv("DB_USER", "postgres")
-DB_PASSWORD = os.getenv("DB_PASSWORD", "")
-DB_HOST = os.getenv("DB_HOST", "localhost")
-DB_PORT = os.getenv("DB_PORT", "5432")
-DB_NAME = os.getenv("DB_NAME", "fitness_tracker")
+DB_USER = get_setting("DB_USER", "postgres")
+DB_PASSWORD = get_setting("DB_PASSWORD", "")
+DB_HOST = get_setting("DB_HOST", "localhost")
+DB_PORT = get_setting("DB_PORT", "5432")
+DB_NAME = get_setting("DB_NAME", "fitness_tracker")
+
+# URL de conexión (DATABASE_URL permite usar otra base, p. ej. SQLite en local)
+SQLALCHEMY_DATABASE_URL = get_setting(
+    "DATABASE_URL",
+    f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+)
+
+# Configuración del pool de conexiones
+DB_POOL_SIZE = int(get_setting("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(get_setting("DB_MAX_OVERFLOW", 5))
+DB_POOL_PRE_PING = str(get_setting("DB_POOL_PRE_PING", "true")).lower() in ("1", "true", "yes")
+DB_POOL_RECYCLE = int(get_setting("DB_POOL_RECYCLE", 1800))  # segundos
+DB_STATEMENT_TIMEOUT = int(get_setting("DB_STATEMENT_TIMEOUT", 30000))  # milisegundos, 0 = sin límite
+
+# Réplicas de solo lectura para historiales y gráficos (URLs separadas por comas)
+REPLICA_DATABASE_URLS = [url.strip() for url in str(get_setting("REPLICA_DATABASE_URLS", "")).split(",") if url.strip()]
+REPLICA_MAX_LAG_SECONDS = float(get_setting("REPLICA_MAX_LAG_SECONDS", 5))
+REPLICA_CHECK_SECONDS = float(get_setting("REPLICA_CHECK_SECONDS", 10))
+REPLICA_CONNECT_TIMEOUT = int(get_setting("REPLICA_CONNECT_TIMEOUT", 2))  # segundos
+
+# Instrumentación de SQL
+SLOW_QUERY_MS = int(get_setting("SLOW_QUERY_MS", 500))  # milisegundos, 0 = sin registro
+SQL_DEBUG_PANEL = str(get_setting("SQL_DEBUG_PANEL", "false")).lower() in ("1", "true", "yes")
 
-# URL de conexión
-SQLALCHEMY_DATABASE_URL = f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+def engine_options(url: str) -> dict:
+    backend = make_url(url).get_backend_name()
+    options = {"pool_pre_ping": DB_POOL_PRE_PING}
+    if backend == "sqlite":
+        return options
+    options.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    if backend == "postgresql" and DB_STATEMENT_TIMEOUT:
+        options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT}"}
+    return options
 
-# Crear el motor de base de datos
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# Un único motor (y pool) por proceso, compartido por todas las sesiones de Streamlit.
+# Sin spinner: se crea al importar, antes de st.set_page_config()
+@st.cache_resource(show_spinner=False)
+def get_engine():
+    engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL))
+    instrument(engine, SLOW_QUERY_MS)
+    return engine
 
-# Crear la sesión
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+@st.cache_resource(show_spinner=False)
+def get_replica_pool():
+    if not REPLICA_DATABASE_URLS:
+        return None
+    engines = []
+    for url in REPLICA_DATABASE_URLS:
+        options = engine_options(url)
+        if make_url(url).get_backend_name() == "postgresql":
+            # Una réplica inalcanzable no debe bloquear el rerun
+            options.setdefault("connect_args", {})["connect_timeout"] = REPLICA_CONNECT_TIMEOUT
+        replica = create_engine(url, **options)
+        instrument(replica, SLOW_QUERY_MS)
+        engines.append(replica)
+    return ReplicaPool(engines, REPLICA_MAX_LAG_SECONDS, REPLICA_CHECK_SECONDS)
+
+engine = get_engine()
+
+# Crear la sesión (las lecturas marcadas con @replica_read pueden ir a una réplica)
+SessionLocal = sessionmaker(
+    class_=RoutingSession, autocommit=False, autoflush=False, bind=engine, replicas=get_replica_pool()
+)
 
 # Base para los modelos (importada de base_model)
 Base = BaseModel
 
+# Sesión compartida durante un rerun de Streamlit (cada rerun corre en su propio hilo)
+_request = threading.local()
+
+def get_session():
+    db = getattr(_request, "session", None)
+    if db is None:
+        db = SessionLocal()
+        if db.replicas is not None:
+            # Tras escribir, los reruns siguientes leen del primario mientras
+            # una réplica dentro del retraso tolerado aún podría no tener el cambio
+            db.primary_until = st.session_state.get("_primary_until", 0.0)
+        _request.session = db
+    return db
+
+def close_session():
+    db = getattr(_request, "session", None)
+    if db is not None:
+        _request.session = None
+        if db.replicas is not None and db.wrote:
+            st.session_state["_primary_until"] = time.time() + REPLICA_MAX_LAG_SECONDS
+        db.close()
+
 # Función para obtener la sesión de base de datos
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
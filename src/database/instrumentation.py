@@ -0,0 +1,118 @@
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event
+
+# Métricas de SQL por página y por rerun a partir de los eventos del motor.
+# Cada rerun de Streamlit corre en su propio hilo, así que las estadísticas del
+# rerun actual viven en un threading.local (igual que la sesión compartida).
+
+logger = logging.getLogger("fit_tracking.sql")
+
+class RerunStats:
+    __slots__ = ("page", "count", "total_ms", "statements", "lock")
+
+    def __init__(self, page: str):
+        self.page = page
+        self.count = 0
+        self.total_ms = 0.0
+        # Sentencia normalizada -> [ejecuciones, ms]
+        self.statements: Dict[str, list] = {}
+        # Los hilos auxiliares del rerun (ver rerun_context) registran a la vez
+        self.lock = threading.Lock()
+
+    def record(self, statement: str, elapsed_ms: float):
+        with self.lock:
+            self.count += 1
+            self.total_ms += elapsed_ms
+            entry = self.statements.setdefault(statement, [0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed_ms
+
+    def top(self, limit: int = 10) -> List[Tuple[str, int, float]]:
+        # Las sentencias repetidas (N+1) aparecen primero
+        rows = [(s, count, ms) for s, (count, ms) in self.statements.items()]
+        return sorted(rows, key=lambda r: (r[1], r[2]), reverse=True)[:limit]
+
+_current = threading.local()
+_lock = threading.Lock()
+# Página -> [reruns, sentencias, ms]
+_totals: Dict[str, list] = {}
+
+def begin_rerun(page: str) -> RerunStats:
+    stats = RerunStats(page)
+    _current.stats = stats
+    return stats
+
+def current_stats() -> Optional[RerunStats]:
+    return getattr(_current, "stats", None)
+
+@contextmanager
+def rerun_context(stats: Optional[RerunStats]):
+    # Atribuye al rerun las consultas de un hilo auxiliar (p. ej. del dashboard)
+    previous = current_stats()
+    _current.stats = stats
+    try:
+        yield
+    finally:
+        _current.stats = previous
+
+def end_rerun():
+    stats = current_stats()
+    if stats is None:
+        return
+    _current.stats = None
+    with _lock:
+        totals = _totals.setdefault(stats.page, [0, 0, 0.0])
+        totals[0] += 1
+        totals[1] += stats.count
+        totals[2] += stats.total_ms
+
+def page_totals() -> Dict[str, Tuple[int, int, float]]:
+    with _lock:
+        return {page: tuple(values) for page, values in _totals.items()}
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*(?:\?|%\(\w+\)s|%s|:\w+|__\[POSTCOMPILE_\w+\])\s*,?)+\)", re.IGNORECASE)
+_SPACES = re.compile(r"\s+")
+
+def normalize_statement(statement: str) -> str:
+    # Literales y listas IN de cualquier longitud cuentan como la misma sentencia
+    statement = _STRING.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    statement = _IN_LIST.sub("IN (...)", statement)
+    return _SPACES.sub(" ", statement).strip()
+
+def redact(parameters) -> str:
+    # Solo el tipo de cada parámetro: los valores pueden ser datos personales
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: <{type(v).__name__}>" for k, v in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return f"[{len(parameters)} filas] {redact(parameters[0])}"
+        return "(" + ", ".join(f"<{type(v).__name__}>" for v in parameters) + ")"
+    return f"<{type(parameters).__name__}>"
+
+def instrument(engine, slow_query_ms: int):
+    # El inicio se guarda en el contexto de ejecución de la sentencia, no en una
+    # pila de la conexión: si la sentencia falla, after_cursor_execute no se
+    # llama y no queda un inicio huérfano que desplace las mediciones siguientes
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context.query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - context.query_start) * 1000
+        stats = current_stats()
+        if stats is not None:
+            stats.record(normalize_statement(statement), elapsed_ms)
+        if slow_query_ms and elapsed_ms >= slow_query_ms:
+            logger.warning(
+                "Consulta lenta (%.0f ms, página %s): %s parámetros=%s",
+                elapsed_ms, stats.page if stats else "-", normalize_statement(statement), redact(parameters),
+            )
@@ -0,0 +1,123 @@
+import functools
+import itertools
+import logging
+import threading
+import time
+from typing import List, Optional
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.orm import Session
+
+# Réplicas de solo lectura. La sesión del rerun escribe y lee en el primario;
+# los métodos de repositorio marcados con @replica_read se ejecutan en una
+# sesión aparte contra una réplica sana. Es seguro porque los repositorios
+# devuelven DTOs y DataFrames, no objetos ORM ligados a la sesión.
+
+logger = logging.getLogger("fit_tracking.replicas")
+
+# Segundos de retraso de una réplica PostgreSQL (0 si ya aplicó todo lo recibido)
+_PG_LAG = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+def replication_lag(conn) -> Optional[float]:
+    # Otros motores (p. ej. dos ficheros SQLite en local) no informan retraso
+    if conn.dialect.name != "postgresql":
+        return None
+    lag = conn.scalar(_PG_LAG)
+    return float(lag) if lag is not None else None
+
+class ReplicaPool:
+    def __init__(self, engines: List, max_lag: float, check_seconds: float):
+        self.engines = list(engines)
+        self.max_lag = max_lag
+        self.check_seconds = check_seconds
+        self._order = itertools.cycle(self.engines)
+        # Motor -> (momento de la comprobación, sana)
+        self._health = {}
+        self._lock = threading.Lock()
+
+    def choose(self):
+        # Reparto circular entre las réplicas sanas; None = leer del primario
+        for _ in range(len(self.engines)):
+            with self._lock:
+                engine = next(self._order)
+            if self.healthy(engine):
+                return engine
+        return None
+
+    def healthy(self, engine) -> bool:
+        with self._lock:
+            checked = self._health.get(engine)
+        if checked and time.monotonic() - checked[0] < self.check_seconds:
+            return checked[1]
+        healthy = self._probe(engine)
+        with self._lock:
+            self._health[engine] = (time.monotonic(), healthy)
+        return healthy
+
+    def _probe(self, engine) -> bool:
+        try:
+            with engine.connect() as conn:
+                lag = replication_lag(conn)
+        except DBAPIError as e:
+            logger.warning("Réplica %s no disponible: %s", engine.url.render_as_string(), e.orig)
+            return False
+        if lag is not None and lag > self.max_lag:
+            logger.warning("Réplica %s con %.1f s de retraso", engine.url.render_as_string(), lag)
+            return False
+        return True
+
+    def mark_down(self, engine, error):
+        # Fuera de rotación hasta la próxima comprobación
+        logger.warning("Réplica %s falló en una lectura: %s", engine.url.render_as_string(), error)
+        with self._lock:
+            self._health[engine] = (time.monotonic(), False)
+
+class RoutingSession(Session):
+    def __init__(self, *args, replicas: Optional[ReplicaPool] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        # Read-your-writes: tras escribir, todo se lee del primario. primary_until
+        # lo fija get_session() para los reruns siguientes a una escritura.
+        self.wrote = False
+        self.primary_until = 0.0
+
+    def replica_bind(self):
+        if self.replicas is None or self.wrote or time.time() < self.primary_until:
+            return None
+        return self.replicas.choose()
+
+@event.listens_for(RoutingSession, "after_flush")
+def _after_flush(session, flush_context):
+    session.wrote = True
+
+@event.listens_for(RoutingSession, "after_commit")
+def _after_commit(session):
+    session.wrote = True
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _do_orm_execute(state):
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.wrote = True
+
+def replica_read(method):
+    # Para métodos de repositorio de solo lectura (self.db es la sesión)
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        db = self.db
+        replica = db.replica_bind() if isinstance(db, RoutingSession) else None
+        if replica is None:
+            return method(self, *args, **kwargs)
+        try:
+            with Session(replica) as self.db:
+                return method(self, *args, **kwargs)
+        except OperationalError as e:
+            db.replicas.mark_down(replica, e.orig)
+        finally:
+            self.db = db
+        # Réplica caída o cortada a mitad de la lectura: repetir en el primario
+        return method(self, *args, **kwargs)
+
+    return wrapper
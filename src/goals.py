@@ -1,9 +1,12 @@
 import streamlit as st
 from datetime import date, datetime, timedelta
-from database.database import SessionLocal
-from models.goal import Goal
+from database.database import get_session
+from controllers.dashboard_cache import load_trends
+from controllers.repositories import GoalRepository, MealRepository, WorkoutRepository
 import pandas as pd
 
+CATEGORIES = ["weight", "nutrition", "exercise"]
+
 def check_session():
     if "user_id" not in st.session_state or st.session_state.user_id is None:
         st.error("Sesión no válida. Por favor, inicia sesión nuevamente.")
@@ -20,19 +23,20 @@ def check_session():
 def goals_page():
     check_session()
     st.title("Metas y Objetivos")
-    db = SessionLocal()
+    db = get_session()
     user_id = st.session_state.user_id
+    goals_repo = GoalRepository(db)
 
     # Formulario para crear/editar meta
     if "edit_goal_id" not in st.session_state:
         st.session_state.edit_goal_id = None
     st.header("Crear Nueva Meta")
     with st.form("goal_form"):
-        if st.session_state.edit_goal_id:
-            goal = db.query(Goal).filter(Goal.id == st.session_state.edit_goal_id).first()
+        goal = goals_repo.get(user_id, st.session_state.edit_goal_id) if st.session_state.edit_goal_id else None
+        if goal:
             title = st.text_input("Título de la meta", value=goal.title)
             description = st.text_area("Descripción", value=goal.description or "")
-            category = st.selectbox("Categoría", ["weight", "nutrition", "exercise"], index=["weight", "nutrition", "exercise"].index(goal.category))
+            category = st.selectbox("Categoría", CATEGORIES, index=CATEGORIES.index(goal.category))
             target_value = st.number_input("Valor objetivo", value=goal.target_value or 0.0)
             target_unit = st.text_input("Unidad objetivo", value=goal.target_unit or "kg")
             start_date = st.date_input("Fecha de inicio", value=goal.start_date)
@@ -40,13 +44,16 @@ def goals_page():
             submit = st.form_submit_button("Actualizar Meta")
             cancel = st.form_submit_button("Cancelar")
             if submit:
-                goal.title = title
-                goal.description = description
-                goal.category = category
-                goal.target_value = target_value
-                goal.target_unit = target_unit
-                goal.start_date = start_date
-                goal.target_date = target_date
+                goals_repo.update(
+                    user_id, goal.id,
+                    title=title,
+                    description=description,
+                    category=category,
+                    target_value=target_value,
+                    target_unit=target_unit,
+                    start_date=start_date,
+                    target_date=target_date
+                )
                 db.commit()
                 st.success("Meta actualizada exitosamente!")
                 st.session_state.edit_goal_id = None
@@ -55,31 +62,39 @@ def goals_page():
         else:
             title = st.text_input("Título de la meta")
             description = st.text_area("Descripción")
-            category = st.selectbox("Categoría", ["weight", "nutrition", "exercise"])
+            category = st.selectbox("Categoría", CATEGORIES)
             target_value = st.number_input("Valor objetivo", value=0.0)
             target_unit = st.text_input("Unidad objetivo", value="kg")
             start_date = st.date_input("Fecha de inicio", value=date.today())
             target_date = st.date_input("Fecha objetivo", value=date.today())
             submit = st.form_submit_button("Crear Meta")
             if submit:
-                new_goal = Goal(
-                    user_id=user_id,
+                goals_repo.create(
+                    user_id,
                     title=title,
                     description=description,
                     category=category,
                     target_value=target_value,
                     target_unit=target_unit,
                     start_date=start_date,
-                    target_date=target_date,
-                    completed=False
+                    target_date=target_date
                 )
-                db.add(new_goal)
                 db.commit()
                 st.success("Meta creada exitosamente!")
     # Listado de metas
     st.header("Metas Activas")
-    goals = db.query(Goal).filter(Goal.user_id == user_id, Goal.completed == False).order_by(Goal.target_date).all()
+    goals = goals_repo.active(user_id)
     if goals:
+        # Valores actuales leídos una sola vez por categoría, no una vez por meta
+        categories = {g.category for g in goals}
+        today = date.today()
+        # Peso y calorías salen del resumen de tendencias, compartido con el dashboard
+        trends = load_trends(db, user_id, today) if categories & {"weight", "nutrition"} else {}
+        weight, kcal = trends.get("weight"), trends.get("kcal")
+        # Las calorías de hoy se leen directamente: el último día de la tendencia
+        # puede ser otro (p. ej. una comida registrada con fecha futura)
+        day_totals = MealRepository(db).day_totals(user_id, today) if "nutrition" in categories else None
+        sessions = WorkoutRepository(db).count_since(user_id, today) if "exercise" in categories else 0
         for g in goals:
             col1, col2 = st.columns([4, 1])
             with col1:
@@ -89,38 +104,30 @@ def goals_page():
                 # Visualización de progreso
                 progreso = None
                 if g.category == "weight":
-                    from models.bodymetric import BodyMetric
-                    last_metric = db.query(BodyMetric).filter(BodyMetric.user_id == user_id).order_by(BodyMetric.date.desc()).first()
-                    if last_metric:
-                        actual = last_metric.weight
+                    if weight:
+                        # Peso de tendencia: un día de báscula alta no mueve el progreso
+                        actual = weight.trend
                         progreso = min(100, round(100 * actual / g.target_value, 2)) if g.target_value else 0
                         st.progress(progreso / 100, text=f"{actual} kg de {g.target_value} kg ({progreso}%)")
+                        st.caption(weight_outlook(weight, g.target_value))
                 elif g.category == "nutrition":
-                    from models.meallog import MealLog
-                    from models.food import Food
-                    today = date.today()
-                    meals = db.query(MealLog).filter(MealLog.user_id == user_id, MealLog.date >= today).all()
-                    foods = {f.id: f for f in db.query(Food).all()}
-                    total_cal = sum([foods[m.food_id].calories * m.quantity / 100 for m in meals if m.food_id in foods])
+                    total_cal = day_totals.kcal if day_totals else 0
                     progreso = min(100, round(100 * total_cal / g.target_value, 2)) if g.target_value else 0
                     st.progress(progreso / 100, text=f"{round(total_cal,2)} kcal de {g.target_value} kcal ({progreso}%)")
+                    if kcal:
+                        st.caption(f"Media de 7 días hasta el {kcal.day}: {kcal.mean_7d} kcal.")
                 elif g.category == "exercise":
-                    from models.workout import Workout
-                    today = date.today()
-                    workouts = db.query(Workout).filter(Workout.user_id == user_id, Workout.date >= today).all()
-                    total = len(workouts)
-                    progreso = min(100, round(100 * total / g.target_value, 2)) if g.target_value else 0
-                    st.progress(progreso / 100, text=f"{total} sesiones de {g.target_value} ({progreso}%)")
+                    progreso = min(100, round(100 * sessions / g.target_value, 2)) if g.target_value else 0
+                    st.progress(progreso / 100, text=f"{sessions} sesiones de {g.target_value} ({progreso}%)")
             with col2:
                 if st.button(f"Editar", key=f"edit_goal_{g.id}"):
                     st.session_state.edit_goal_id = g.id
                 if st.button(f"Completar", key=f"complete_goal_{g.id}"):
-                    g.completed = True
-                    g.completed_date = date.today()
+                    goals_repo.complete(user_id, g.id, today)
                     db.commit()
                     st.success("Meta marcada como completada!")
                 if st.button(f"Eliminar", key=f"delete_goal_{g.id}"):
-                    db.delete(g)
+                    goals_repo.delete(user_id, g.id)
                     db.commit()
                     st.success("Meta eliminada!")
         # Tabla resumen
@@ -137,7 +144,7 @@ def goals_page():
         st.info("No tienes metas activas.")
     # Metas completadas
     st.header("Metas Completadas")
-    completed_goals = db.query(Goal).filter(Goal.user_id == user_id, Goal.completed == True).order_by(Goal.completed_date.desc()).all()
+    completed_goals = goals_repo.completed(user_id)
     if completed_goals:
         data = [{
             "Título": g.title,
@@ -150,7 +157,17 @@ def goals_page():
         st.dataframe(df)
     else:
         st.info("No tienes metas completadas aún.")
-    db.close()
+
+def weight_outlook(weight, target: float) -> str:
+    text = f"Último registro: {weight.value} kg ({weight.day})."
+    rate = weight.weekly_rate
+    if rate is None:
+        return text
+    text += f" Ritmo: {rate:+} kg/semana"
+    if target and rate and (target - weight.trend) * rate > 0:
+        weeks = (target - weight.trend) / rate
+        return text + f"; a este ritmo, objetivo en unas {weeks:.0f} semanas ({weight.day + timedelta(weeks=weeks)})."
+    return text + "."
 
 if __name__ == "__main__":
     goals_page() 
\ No newline at end of file
@@ -1,7 +1,8 @@
 import streamlit as st
-from database.database import SessionLocal
+from database.database import get_session
 from models.user import User
-from utils.password import verify_password, hash_password
+from utils.password import verify_password, hash_password, needs_rehash
+from typing import Optional
 import re
 
 def is_valid_email(email: str) -> bool:
@@ -18,12 +19,14 @@ def login_page():
         if submit:
             if not username or not password:
                 st.error("Debes ingresar usuario y contraseña.")
-            elif authenticate_user(username, password):
-                st.success("¡Inicio de sesión exitoso!")
-                st.session_state.user_id = get_user_id(username)
-                st.rerun()
             else:
-                st.error("Usuario o contraseña incorrectos. Intenta de nuevo.")
+                user = authenticate_user(username, password)
+                if user:
+                    st.success("¡Inicio de sesión exitoso!")
+                    st.session_state.user_id = user.id
+                    st.rerun()
+                else:
+                    st.error("Usuario o contraseña incorrectos. Intenta de nuevo.")
     # Enlace para registro y recuperación
     st.info("¿No tienes una cuenta?")
     if st.button("Registrarse"):
@@ -34,23 +37,20 @@ def login_page():
         st.session_state.page = "recover_password"
         st.rerun()
 
-def authenticate_user(username: str, password: str) -> bool:
-    db = SessionLocal()
-    try:
-        user = db.query(User).filter(User.username == username).first()
-        if user and verify_password(password, user.hashed_password):
-            return True
-        return False
-    finally:
-        db.close()
-
-def get_user_id(username: str) -> int:
-    db = SessionLocal()
-    try:
-        user = db.query(User).filter(User.username == username).first()
-        return user.id if user else None
-    finally:
-        db.close()
+def authenticate_user(username: str, password: str) -> Optional[User]:
+    # Una sola consulta: devuelve el usuario autenticado o None
+    db = get_session()
+    user = db.query(User).filter(User.username == username).first()
+    if not user or not verify_password(password, user.hashed_password):
+        return None
+    if needs_rehash(user.hashed_password):
+        # Actualizar el hash al coste configurado; si falla, el login sigue siendo válido
+        try:
+            user.hashed_password = hash_password(password)
+            db.commit()
+        except Exception:
+            db.rollback()
+    return user
 
 def recover_password_page():
     st.title("Recuperar Contraseña")
@@ -62,7 +62,7 @@ def recover_password_page():
             if not is_valid_email(email):
                 st.error("El correo electrónico no tiene un formato válido.")
             else:
-                db = SessionLocal()
+                db = get_session()
                 user = db.query(User).filter(User.email == email).first()
                 if user:
                     st.success("Se ha enviado un enlace de restablecimiento (simulado) a tu correo.")
@@ -84,7 +84,6 @@ def recover_password_page():
                                 st.rerun()
                 else:
                     st.error("No se encontró un usuario con ese correo electrónico.")
-                db.close()
 
 if __name__ == "__main__":
     login_page() 
\ No newline at end of file
@@ -1,9 +1,17 @@
 import streamlit as st
 from datetime import datetime, timedelta
-from database.database import SessionLocal
+from sqlalchemy import delete, update
+from database.database import get_session
 from models.bodymetric import BodyMetric
+from controllers.dashboard_cache import invalidate_dashboard
+from controllers.repositories import MetricRepository, TrendRepository
+from utils.frame_diff import diff_frames
+from utils.pagination import current_cursor, page_controls
+from views.charts import line_chart
 import pandas as pd
 
+EDITABLE_COLUMNS = ["Fecha", "Peso (kg)", "Altura (cm)"]
+
 def check_session():
     if "user_id" not in st.session_state or st.session_state.user_id is None:
         st.error("Sesión no válida. Por favor, inicia sesión nuevamente.")
@@ -20,9 +28,7 @@ def check_session():
 def metrics_page():
     check_session()
     st.title("Métricas Corporales")
-    # Estado para edición
-    if "edit_metric_id" not in st.session_state:
-        st.session_state.edit_metric_id = None
+    db = get_session()
     # Formulario para registrar nueva métrica
     st.header("Registrar Nueva Métrica Corporal")
     st.markdown("Registra tu peso y altura para calcular el IMC y llevar tu progreso.")
@@ -37,7 +43,6 @@ def metrics_page():
             else:
                 bmi = round(weight / ((height / 100) ** 2), 2)
                 try:
-                    db = SessionLocal()
                     new_metric = BodyMetric(
                         user_id=st.session_state.user_id,
                         date=date,
@@ -47,12 +52,11 @@ def metrics_page():
                     )
                     db.add(new_metric)
                     db.commit()
+                    invalidate_dashboard(st.session_state.user_id)
                     st.success(f"Métrica registrada exitosamente. IMC: {bmi}")
                 except Exception as e:
                     db.rollback()
                     st.error(f"Error al guardar la métrica: {str(e)}")
-                finally:
-                    db.close()
     # Mostrar historial de métricas
     st.header("Historial de Métricas Corporales")
     # Filtros
@@ -62,69 +66,94 @@ def metrics_page():
             start_date = st.date_input("Fecha inicio", value=None, key="start_metric_date")
         with col2:
             end_date = st.date_input("Fecha fin", value=None, key="end_metric_date")
-    db = SessionLocal()
-    try:
-        query = db.query(BodyMetric).filter(BodyMetric.user_id == st.session_state.user_id)
-        if start_date:
-            query = query.filter(BodyMetric.date >= start_date)
-        if end_date:
-            query = query.filter(BodyMetric.date <= end_date)
-        metrics = query.order_by(BodyMetric.date.desc()).all()
-        if metrics:
-            for m in metrics:
-                col1, col2 = st.columns([4, 1])
-                with col1:
-                    st.write(f"{m.date.strftime('%Y-%m-%d')} | Peso: {m.weight} kg | Altura: {m.height} cm | IMC: {m.bmi}")
-                with col2:
-                    if st.button(f"Editar", key=f"edit_metric_{m.id}"):
-                        st.session_state.edit_metric_id = m.id
-                    if st.button(f"Eliminar", key=f"delete_metric_{m.id}"):
-                        try:
-                            db.delete(m)
-                            db.commit()
-                            st.success("Métrica eliminada exitosamente!")
-                        except Exception as e:
-                            db.rollback()
-                            st.error(f"Error al eliminar la métrica: {str(e)}")
-            # Formulario de edición
-            if st.session_state.edit_metric_id:
-                metric = db.query(BodyMetric).filter(BodyMetric.id == st.session_state.edit_metric_id).first()
-                if metric:
-                    with st.form("edit_metric_form"):
-                        date = st.date_input("Fecha", value=metric.date)
-                        weight = st.number_input("Peso (kg)", min_value=1.0, value=metric.weight, step=0.1)
-                        height = st.number_input("Altura (cm)", min_value=50.0, value=metric.height, step=0.1)
-                        submit = st.form_submit_button("Actualizar Métrica")
-                        cancel = st.form_submit_button("Cancelar")
-                        if submit:
-                            try:
-                                metric.date = date
-                                metric.weight = weight
-                                metric.height = height
-                                metric.bmi = round(weight / ((height / 100) ** 2), 2)
-                                db.commit()
-                                st.success("Métrica actualizada exitosamente!")
-                                st.session_state.edit_metric_id = None
-                            except Exception as e:
-                                db.rollback()
-                                st.error(f"Error al actualizar la métrica: {str(e)}")
-                        if cancel:
-                            st.session_state.edit_metric_id = None
-            # Tabla y gráfico
-            data = [{
-                "Fecha": m.date.strftime('%Y-%m-%d'),
-                "Peso (kg)": m.weight,
-                "Altura (cm)": m.height,
-                "IMC": m.bmi
-            } for m in metrics]
-            df = pd.DataFrame(data)
-            st.dataframe(df)
-            st.subheader("Evolución de Peso e IMC")
-            st.line_chart(df.set_index("Fecha")[ ["Peso (kg)", "IMC"] ])
-        else:
-            st.info("No hay métricas registradas para los filtros seleccionados.")
-    finally:
-        db.close()
+    user_id = st.session_state.user_id
+    if "metrics_notice" in st.session_state:
+        st.success(st.session_state.pop("metrics_notice"))
+    cursor = current_cursor("metrics", (start_date, end_date))
+    repository = MetricRepository(db)
+    metrics, next_cursor = repository.history(user_id, start_date, end_date, cursor)
+    if metrics:
+        show_metrics_editor(db, user_id, metrics, cursor)
+        page_controls("metrics", next_cursor)
+        # Peso diario con su media de 7 días y tendencia en lugar de la serie cruda
+        df = TrendRepository(db).series(user_id, "weight", start_date, end_date)
+        if not df.empty:
+            st.subheader("Tendencia de Peso")
+            line_chart(df[["Peso (kg)", "Media 7 días", "Tendencia"]], key="metrics_chart")
+            rate = df["Cambio semanal"].iloc[-1]
+            if not pd.isna(rate):
+                st.caption(f"Cambio semanal según la tendencia: {rate:+} kg/semana.")
+        # IMC de cada registro, en su propio gráfico (otra escala que el peso)
+        bmi = repository.weight_series(user_id, start_date, end_date)
+        if not bmi.empty:
+            st.subheader("Evolución del IMC")
+            line_chart(bmi.set_index("Fecha")[["IMC"]], key="metrics_bmi_chart")
+    else:
+        st.info("No hay métricas registradas para los filtros seleccionados.")
+
+def show_metrics_editor(db, user_id: int, metrics, cursor):
+    # Una sola tabla editable por página en lugar de botones por fila
+    original = pd.DataFrame({
+        "id": [m.id for m in metrics],
+        "Fecha": [m.date.date() for m in metrics],
+        "Peso (kg)": [m.weight for m in metrics],
+        "Altura (cm)": [m.height for m in metrics],
+        "IMC": [m.bmi for m in metrics],
+        "Eliminar": False,
+    })
+    # La clave cambia con la página y tras guardar, así no se arrastran ediciones
+    version = st.session_state.setdefault("metrics_editor_version", 0)
+    with st.form("metrics_editor_form"):
+        edited = st.data_editor(
+            original,
+            column_config={
+                "id": None,
+                "Fecha": st.column_config.DateColumn("Fecha", required=True),
+                "Peso (kg)": st.column_config.NumberColumn("Peso (kg)", min_value=1.0, step=0.1, required=True),
+                "Altura (cm)": st.column_config.NumberColumn("Altura (cm)", min_value=50.0, step=0.1, required=True),
+                "IMC": st.column_config.NumberColumn("IMC", disabled=True),
+                "Eliminar": st.column_config.CheckboxColumn("Eliminar"),
+            },
+            hide_index=True,
+            use_container_width=True,
+            key=f"metrics_editor_{cursor}_{version}",
+        )
+        submit = st.form_submit_button("Guardar cambios")
+    if submit:
+        changes = diff_frames(original, edited[~edited["Eliminar"]], columns=EDITABLE_COLUMNS)
+        if not changes:
+            st.info("No hay cambios para guardar.")
+            return
+        try:
+            updated, deleted = save_metric_changes(db, user_id, changes)
+        except Exception as e:
+            db.rollback()
+            st.error(f"Error al guardar los cambios: {str(e)}")
+            return
+        st.session_state.metrics_editor_version = version + 1
+        st.session_state.metrics_notice = f"Cambios guardados: {updated} métricas actualizadas, {deleted} eliminadas."
+        st.rerun()
+
+def save_metric_changes(db, user_id: int, changes) -> tuple:
+    # Un UPDATE por lotes (executemany por clave primaria) y un DELETE ... IN,
+    # ambos limitados al usuario: un id ajeno no modifica nada
+    rows = changes.updated
+    if not rows.empty:
+        bmi = (rows["Peso (kg)"] / (rows["Altura (cm)"] / 100) ** 2).round(2)
+        # synchronize_session=None: el ORM no admite sincronizar un UPDATE por clave
+        # con criterios extra; el commit de abajo expira los objetos igualmente
+        stmt = update(BodyMetric).where(BodyMetric.user_id == user_id).execution_options(synchronize_session=None)
+        db.execute(stmt, [
+            {"id": int(id), "date": date, "weight": float(weight), "height": float(height), "bmi": float(b)}
+            for id, date, weight, height, b in zip(rows.index, rows["Fecha"], rows["Peso (kg)"], rows["Altura (cm)"], bmi)
+        ])
+    if changes.deleted:
+        db.execute(
+            delete(BodyMetric).where(BodyMetric.user_id == user_id, BodyMetric.id.in_(changes.deleted))
+        )
+    db.commit()
+    invalidate_dashboard(user_id)
+    return len(rows), len(changes.deleted)
 
 if __name__ == "__main__":
     metrics_page() 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from database.database import Base
 
@@ -10,4 +10,9 @@ class BodyMetric(Base):
     date = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     weight = Column(Float, nullable=False)  # kg
     height = Column(Float, nullable=False)  # cm
-    bmi = Column(Float, nullable=True) 
\ No newline at end of file
+    bmi = Column(Float, nullable=True)
+
+    __table_args__ = (
+        # Último peso y evolución de peso por usuario
+        Index("ix_body_metrics_user_id_date", "user_id", "date", postgresql_include=["weight"]),
+    ) 
\ No newline at end of file
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, Float, Date, ForeignKey
+from database.database import Base
+
+# Totales diarios de nutrición por usuario, mantenidos al escribir comidas
+# (ver controllers/nutrition_totals.py)
+class DailyNutritionTotal(Base):
+    __tablename__ = "daily_nutrition_totals"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    kcal = Column(Float, nullable=False, default=0)
+    protein = Column(Float, nullable=False, default=0)  # g
+    carbs = Column(Float, nullable=False, default=0)  # g
+    fat = Column(Float, nullable=False, default=0)  # g
+    meal_count = Column(Integer, nullable=False, default=0)
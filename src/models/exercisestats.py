@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, Float, Date, ForeignKey
+from database.database import Base
+
+# Agregados de entrenamiento mantenidos al escribir entrenamientos
+# (ver controllers/training_stats.py)
+class ExerciseStats(Base):
+    __tablename__ = "exercise_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    exercise_id = Column(Integer, ForeignKey("exercises.id"), primary_key=True)
+    pr_weight = Column(Float, nullable=False, default=0)  # kg
+    best_set_volume = Column(Float, nullable=False, default=0)  # peso x reps
+    last_performed = Column(Date, nullable=False)
+    lifetime_volume = Column(Float, nullable=False, default=0)  # peso x reps x series
+
+class ExerciseDailyVolume(Base):
+    __tablename__ = "exercise_daily_volume"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    exercise_id = Column(Integer, ForeignKey("exercises.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    volume = Column(Float, nullable=False, default=0)
+    max_weight = Column(Float, nullable=False, default=0)
+    best_set_volume = Column(Float, nullable=False, default=0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float
+from sqlalchemy import Column, Integer, String, Float, DDL, event
 from database.database import Base
 
 class Food(Base):
@@ -9,4 +9,24 @@ class Food(Base):
     calories = Column(Float, nullable=False)
     protein = Column(Float, nullable=True)
     carbs = Column(Float, nullable=True)
-    fat = Column(Float, nullable=True) 
\ No newline at end of file
+    fat = Column(Float, nullable=True)
+
+# Índice de texto completo para búsquedas en SQLite (en PostgreSQL se usa
+# pg_trgm, creado por la migración). Los triggers lo mantienen sincronizado.
+# La migración d94e2b7a6c10 guarda una copia congelada: cambiar esto exige
+# una migración nueva.
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS foods_fts USING fts5("
+    "name, content='foods', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS foods_fts_ai AFTER INSERT ON foods BEGIN "
+    "INSERT INTO foods_fts(rowid, name) VALUES (new.id, new.name); END",
+    "CREATE TRIGGER IF NOT EXISTS foods_fts_ad AFTER DELETE ON foods BEGIN "
+    "INSERT INTO foods_fts(foods_fts, rowid, name) VALUES ('delete', old.id, old.name); END",
+    "CREATE TRIGGER IF NOT EXISTS foods_fts_au AFTER UPDATE OF name ON foods BEGIN "
+    "INSERT INTO foods_fts(foods_fts, rowid, name) VALUES ('delete', old.id, old.name); "
+    "INSERT INTO foods_fts(rowid, name) VALUES (new.id, new.name); END",
+]
+
+for statement in SQLITE_FTS_DDL:
+    event.listen(Food.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(Food.__table__, "before_drop", DDL("DROP TABLE IF EXISTS foods_fts").execute_if(dialect="sqlite"))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Date, Boolean, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, Date, Boolean, ForeignKey, Text, Index
 from database.database import Base
 
 class Goal(Base):
@@ -14,4 +14,10 @@ class Goal(Base):
     start_date = Column(Date, nullable=False)
     target_date = Column(Date)
     completed = Column(Boolean, default=False)
-    completed_date = Column(Date) 
\ No newline at end of file
+    completed_date = Column(Date)
+
+    __table_args__ = (
+        # Metas activas ordenadas por fecha objetivo y completadas por fecha de cierre
+        Index("ix_goals_user_id_completed_target_date", "user_id", "completed", "target_date"),
+        Index("ix_goals_user_id_completed_completed_date", "user_id", "completed", "completed_date"),
+    ) 
\ No newline at end of file
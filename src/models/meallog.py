@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from database.database import Base
 
@@ -9,4 +9,9 @@ class MealLog(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     food_id = Column(Integer, ForeignKey("foods.id"), nullable=False)
     date = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    quantity = Column(Float, nullable=False)  # en gramos 
\ No newline at end of file
+    quantity = Column(Float, nullable=False)  # en gramos
+
+    __table_args__ = (
+        # Historial y calorías del día: filtrar por usuario y ordenar/filtrar por fecha
+        Index("ix_meal_logs_user_id_date", "user_id", "date", postgresql_include=["food_id", "quantity"]),
+    ) 
\ No newline at end of file
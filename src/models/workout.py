@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database.database import Base
@@ -14,9 +14,14 @@ class Workout(Base):
     duration = Column(Integer)  # en minutos
 
     # Relaciones
-    exercises = relationship("WorkoutExercise", back_populates="workout")
+    exercises = relationship("WorkoutExercise", back_populates="workout", cascade="all, delete-orphan")
     user = relationship("User", backref="workouts")
 
+    __table_args__ = (
+        # Historial y entrenamientos recientes por usuario
+        Index("ix_workouts_user_id_date", "user_id", "date", postgresql_include=["name", "duration"]),
+    )
+
 class WorkoutExercise(Base):
     __tablename__ = "workout_exercises"
 
@@ -30,4 +35,9 @@ class WorkoutExercise(Base):
 
     # Relaciones
     workout = relationship("Workout", back_populates="exercises")
-    exercise = relationship("Exercise") 
\ No newline at end of file
+    exercise = relationship("Exercise")
+
+    __table_args__ = (
+        # Índice de la clave foránea usada para cargar los ejercicios de cada entrenamiento
+        Index("ix_workout_exercises_workout_id", "workout_id"),
+    ) 
\ No newline at end of file
@@ -1,10 +1,18 @@
 import streamlit as st
 from datetime import datetime, timedelta
-from database.database import SessionLocal
+from sqlalchemy import delete, insert, select, update
+from database.database import get_session
 from models.food import Food
 from models.meallog import MealLog
+from controllers.catalog import bump_food_catalog_version
+from controllers.dashboard_cache import invalidate_dashboard
+from controllers.repositories import CatalogRepository, MealRepository
+from controllers.nutrition_totals import refresh_daily_totals, refresh_food_totals
+from controllers.food_search import search_foods, SEARCH_LIMIT
+from utils.frame_diff import diff_frames
 import pandas as pd
-import plotly.express as px
+
+MACROS = ["Proteína", "Carbohidratos", "Grasas"]
 
 def check_session():
     if "user_id" not in st.session_state or st.session_state.user_id is None:
@@ -35,18 +43,28 @@ def nutrition_page():
 def register_meal():
     st.header("Registrar Nueva Comida")
     st.markdown("Registra lo que has comido para llevar el control de tus calorías.")
-    db = SessionLocal()
-    foods = db.query(Food).all()
-    db.close()
+    db = get_session()
+    catalog = CatalogRepository(db).foods()
+    foods = catalog.items
     if not foods:
         st.warning("No hay alimentos registrados. Agrega algunos en la pestaña 'Alimentos'.")
         return
+    # Búsqueda fuera del formulario: el selector solo recibe los resultados
+    search = st.text_input("Buscar alimento", key="meal_food_search", help="Escribe parte del nombre, p. ej. Plátano.")
+    if search:
+        options = search_foods(db, search)
+        if not options:
+            st.info("Ningún alimento coincide con la búsqueda.")
+    else:
+        options = foods[:SEARCH_LIMIT]
+        st.caption(f"Mostrando {len(options)} de {len(foods)} alimentos. Escribe para buscar.")
+    labels = {f.id: catalog.labels.get(f.id, f.name) for f in options}
     with st.form("meal_form"):
         date = st.date_input("Fecha", datetime.now())
         food_id = st.selectbox(
             "Alimento",
-            options=[f.id for f in foods],
-            format_func=lambda x: next((f.name for f in foods if f.id == x), ""),
+            options=list(labels),
+            format_func=labels.__getitem__,
             help="Selecciona el alimento consumido."
         )
         quantity = st.number_input("Cantidad (gramos)", min_value=1.0, value=100.0, step=1.0, help="Cantidad en gramos.")
@@ -56,7 +74,6 @@ def register_meal():
                 st.error("Debes seleccionar un alimento y la cantidad.")
             else:
                 try:
-                    db = SessionLocal()
                     new_meal = MealLog(
                         user_id=st.session_state.user_id,
                         food_id=food_id,
@@ -64,13 +81,13 @@ def register_meal():
                         quantity=quantity
                     )
                     db.add(new_meal)
+                    refresh_daily_totals(db, [(new_meal.user_id, date)])
                     db.commit()
+                    invalidate_dashboard(st.session_state.user_id)
                     st.success("Comida registrada exitosamente!")
                 except Exception as e:
                     db.rollback()
                     st.error(f"Error al registrar la comida: {str(e)}")
-                finally:
-                    db.close()
 
 def show_meal_history():
     st.header("Historial de Comidas")
@@ -84,167 +101,127 @@ def show_meal_history():
         with col2:
             end_date = st.date_input("Fecha fin", value=None, key="end_meal_date")
         search_food = st.text_input("Buscar por alimento", help="Ejemplo: Pollo, Manzana...")
-    db = SessionLocal()
-    try:
-        meals_query = db.query(MealLog).filter(MealLog.user_id == st.session_state.user_id)
-        foods = {f.id: f for f in db.query(Food).all()}
-        if start_date:
-            meals_query = meals_query.filter(MealLog.date >= start_date)
-        if end_date:
-            meals_query = meals_query.filter(MealLog.date <= end_date)
-        if search_food:
-            food_ids = [fid for fid, f in foods.items() if search_food.lower() in f.name.lower()]
-            meals_query = meals_query.filter(MealLog.food_id.in_(food_ids))
-        meals = meals_query.order_by(MealLog.date.desc()).all()
-        if not meals:
-            st.info("No hay comidas registradas para los filtros seleccionados.")
-            return
-        data = []
-        for meal in meals:
-            food = foods.get(meal.food_id)
-            if food:
-                cal = round(food.calories * meal.quantity / 100, 2)
-                prot = round((food.protein or 0) * meal.quantity / 100, 2)
-                carb = round((food.carbs or 0) * meal.quantity / 100, 2)
-                fat = round((food.fat or 0) * meal.quantity / 100, 2)
-                data.append({
-                    "Fecha": meal.date.strftime('%Y-%m-%d'),
-                    "Alimento": food.name,
-                    "Cantidad (g)": meal.quantity,
-                    "Calorías": cal,
-                    "Proteína": prot,
-                    "Carbohidratos": carb,
-                    "Grasas": fat
-                })
-        df = pd.DataFrame(data)
-        st.dataframe(df)
-        st.subheader("Calorías totales por día")
-        if not df.empty:
-            resumen = df.groupby("Fecha")["Calorías"].sum().reset_index()
-            st.bar_chart(resumen.set_index("Fecha"))
-            # Gráficos de macronutrientes
-            st.subheader("Distribución de Macronutrientes por Día")
-            macro = df.groupby("Fecha")[["Proteína", "Carbohidratos", "Grasas"]].sum()
-            st.bar_chart(macro)
-            st.subheader("Distribución porcentual de macronutrientes (último día registrado)")
-            last_day = df["Fecha"].max()
-            macro_last = df[df["Fecha"] == last_day][["Proteína", "Carbohidratos", "Grasas"]].sum()
-            st.write(f"Fecha: {last_day}")
-            st.plotly_chart(
-                px.pie(
-                    names=["Proteína", "Carbohidratos", "Grasas"],
-                    values=macro_last.values,
-                    title="Distribución porcentual de macronutrientes"
-                ),
-                use_container_width=True
-            )
-    finally:
-        db.close()
+    db = get_session()
+    search_food = search_food.strip()
+    df = MealRepository(db).history(st.session_state.user_id, start_date, end_date, search_food or None)
+    if df.empty:
+        st.info("No hay comidas registradas para los filtros seleccionados.")
+        return
+    st.dataframe(df)
+    st.subheader("Calorías totales por día")
+    if not search_food:
+        # Sin filtro por alimento los totales diarios ya están precalculados
+        daily = MealRepository(db).daily_totals(st.session_state.user_id, start_date, end_date)
+    else:
+        # Sumas diarias vectorizadas sobre las columnas del resultado
+        daily = df.groupby("Fecha")[["Calorías", "Proteína", "Carbohidratos", "Grasas"]].sum()
+    st.bar_chart(daily[["Calorías"]])
+    # Gráficos de macronutrientes
+    st.subheader("Distribución de Macronutrientes por Día")
+    macro = daily[MACROS]
+    st.bar_chart(macro)
+    st.subheader("Distribución porcentual de macronutrientes (último día registrado)")
+    last_day = macro.index.max()
+    macro_last = macro.loc[last_day]
+    st.write(f"Fecha: {last_day}")
+    # plotly solo se importa cuando hay un gráfico que dibujar
+    import plotly.express as px
+    st.plotly_chart(
+        px.pie(
+            names=MACROS,
+            values=macro_last.values,
+            title="Distribución porcentual de macronutrientes"
+        ),
+        use_container_width=True
+    )
 
 def manage_foods():
     st.header("Gestión de Alimentos")
-    st.markdown("Agrega, edita o elimina alimentos para llevar un control preciso de tu dieta.")
-    # Estado para edición
-    if "edit_food_id" not in st.session_state:
-        st.session_state.edit_food_id = None
-    db = SessionLocal()
-    foods = db.query(Food).all()
-    db.close()
-    # Formulario para agregar o editar alimento
-    with st.form("food_form"):
-        if st.session_state.edit_food_id:
-            db = SessionLocal()
-            food = db.query(Food).filter(Food.id == st.session_state.edit_food_id).first()
-            db.close()
-            name = st.text_input("Nombre del Alimento", value=food.name)
-            calories = st.number_input("Calorías por 100g", min_value=0.0, value=food.calories, step=1.0)
-            protein = st.number_input("Proteína (g/100g)", min_value=0.0, value=food.protein or 0.0, step=0.1)
-            carbs = st.number_input("Carbohidratos (g/100g)", min_value=0.0, value=food.carbs or 0.0, step=0.1)
-            fat = st.number_input("Grasas (g/100g)", min_value=0.0, value=food.fat or 0.0, step=0.1)
-            submit = st.form_submit_button("Actualizar Alimento")
-            cancel = st.form_submit_button("Cancelar")
-            if submit:
-                try:
-                    db = SessionLocal()
-                    food.name = name
-                    food.calories = calories
-                    food.protein = protein
-                    food.carbs = carbs
-                    food.fat = fat
-                    db.commit()
-                    st.success("Alimento actualizado exitosamente!")
-                    st.session_state.edit_food_id = None
-                except Exception as e:
-                    db.rollback()
-                    st.error(f"Error al actualizar el alimento: {str(e)}")
-                finally:
-                    db.close()
-            if cancel:
-                st.session_state.edit_food_id = None
-        else:
-            name = st.text_input("Nombre del Alimento")
-            calories = st.number_input("Calorías por 100g", min_value=0.0, value=100.0, step=1.0)
-            protein = st.number_input("Proteína (g/100g)", min_value=0.0, value=0.0, step=0.1)
-            carbs = st.number_input("Carbohidratos (g/100g)", min_value=0.0, value=0.0, step=0.1)
-            fat = st.number_input("Grasas (g/100g)", min_value=0.0, value=0.0, step=0.1)
-            submit = st.form_submit_button("Agregar Alimento")
-            if submit:
-                if not name:
-                    st.error("El nombre es obligatorio")
-                else:
-                    try:
-                        db = SessionLocal()
-                        new_food = Food(
-                            name=name,
-                            calories=calories,
-                            protein=protein,
-                            carbs=carbs,
-                            fat=fat
-                        )
-                        db.add(new_food)
-                        db.commit()
-                        st.success("Alimento agregado exitosamente!")
-                    except Exception as e:
-                        db.rollback()
-                        st.error(f"Error al agregar el alimento: {str(e)}")
-                    finally:
-                        db.close()
-    # Mostrar alimentos existentes con opciones de editar/eliminar
-    db = SessionLocal()
-    foods = db.query(Food).all()
-    db.close()
-    if foods:
-        data = []
-        for f in foods:
-            col1, col2 = st.columns([4, 1])
-            with col1:
-                st.write(f"**{f.name}** | Calorías: {f.calories} | Prot: {f.protein} | Carb: {f.carbs} | Grasa: {f.fat}")
-            with col2:
-                if st.button(f"Editar", key=f"edit_{f.id}"):
-                    st.session_state.edit_food_id = f.id
-                if st.button(f"Eliminar", key=f"delete_{f.id}"):
-                    try:
-                        db = SessionLocal()
-                        db.delete(db.query(Food).filter(Food.id == f.id).first())
-                        db.commit()
-                        st.success("Alimento eliminado exitosamente!")
-                    except Exception as e:
-                        db.rollback()
-                        st.error(f"Error al eliminar el alimento: {str(e)}")
-                    finally:
-                        db.close()
-        # Mostrar tabla resumen
-        data = [{
-            "Nombre": f.name,
-            "Calorías": f.calories,
-            "Proteína": f.protein,
-            "Carbohidratos": f.carbs,
-            "Grasas": f.fat
-        } for f in foods]
-        df = pd.DataFrame(data)
-        st.dataframe(df)
-    else:
-        st.info("No hay alimentos registrados aún.")
+    st.markdown("Agrega, edita o elimina alimentos directamente en la tabla y guarda todos los cambios a la vez.")
+    db = get_session()
+    if "foods_notice" in st.session_state:
+        st.success(st.session_state.pop("foods_notice"))
+    foods = CatalogRepository(db).foods().items
+    original = pd.DataFrame(
+        [(f.id, f.name, f.calories, f.protein, f.carbs, f.fat) for f in foods],
+        columns=["id", "Nombre", "Calorías"] + MACROS,
+    )
+    # La clave cambia tras guardar para descartar las ediciones ya aplicadas
+    version = st.session_state.setdefault("foods_editor_version", 0)
+    with st.form("foods_editor_form"):
+        edited = st.data_editor(
+            original,
+            column_config={
+                "id": None,
+                "Nombre": st.column_config.TextColumn("Nombre", required=True),
+                "Calorías": st.column_config.NumberColumn("Calorías (100g)", min_value=0.0, step=1.0, required=True),
+                "Proteína": st.column_config.NumberColumn("Proteína (g/100g)", min_value=0.0, step=0.1),
+                "Carbohidratos": st.column_config.NumberColumn("Carbohidratos (g/100g)", min_value=0.0, step=0.1),
+                "Grasas": st.column_config.NumberColumn("Grasas (g/100g)", min_value=0.0, step=0.1),
+            },
+            num_rows="dynamic",
+            hide_index=True,
+            use_container_width=True,
+            key=f"foods_editor_{version}",
+        )
+        submit = st.form_submit_button("Guardar cambios")
+    if not foods:
+        st.info("No hay alimentos registrados aún. Agrega filas a la tabla para crearlos.")
+    if submit:
+        changes = diff_frames(original, edited)
+        if not changes:
+            st.info("No hay cambios para guardar.")
+            return
+        if any(
+            rows["Nombre"].fillna("").str.strip().eq("").any() or rows["Calorías"].isna().any()
+            for rows in (changes.inserted, changes.updated)
+        ):
+            st.error("El nombre y las calorías son obligatorios.")
+            return
+        try:
+            inserted, updated, deleted, in_use = save_food_changes(db, changes)
+        except Exception as e:
+            db.rollback()
+            st.error(f"Error al guardar los alimentos: {str(e)}")
+            return
+        bump_food_catalog_version()
+        # Las calorías de las comidas de cualquier usuario pueden haber cambiado
+        invalidate_dashboard()
+        notice = f"Cambios guardados: {inserted} alimentos agregados, {updated} actualizados, {deleted} eliminados."
+        if in_use:
+            notice += f" {in_use} no se eliminaron porque tienen comidas registradas."
+        st.session_state.foods_editor_version = version + 1
+        st.session_state.foods_notice = notice
+        st.rerun()
+
+def _food_values(row) -> dict:
+    return {
+        "name": row["Nombre"].strip(),
+        "calories": float(row["Calorías"]),
+        "protein": None if pd.isna(row["Proteína"]) else float(row["Proteína"]),
+        "carbs": None if pd.isna(row["Carbohidratos"]) else float(row["Carbohidratos"]),
+        "fat": None if pd.isna(row["Grasas"]) else float(row["Grasas"]),
+    }
+
+def save_food_changes(db, changes) -> tuple:
+    # Altas, modificaciones y bajas en una transacción, con una sentencia por tipo
+    if not changes.inserted.empty:
+        db.execute(insert(Food), [_food_values(row) for _, row in changes.inserted.iterrows()])
+    if not changes.updated.empty:
+        db.execute(update(Food), [
+            {"id": int(id), **_food_values(row)} for id, row in changes.updated.iterrows()
+        ])
+        refresh_food_totals(db, [int(id) for id in changes.updated.index])
+    deleted = changes.deleted
+    in_use = []
+    if deleted:
+        # Los alimentos con comidas registradas se conservan
+        in_use = db.scalars(select(MealLog.food_id).where(MealLog.food_id.in_(deleted)).distinct()).all()
+        deleted = [id for id in deleted if id not in set(in_use)]
+        if deleted:
+            db.execute(delete(Food).where(Food.id.in_(deleted)))
+    db.commit()
+    return len(changes.inserted), len(changes.updated), len(deleted), len(in_use)
 
 if __name__ == "__main__":
     nutrition_page() 
\ No newline at end of file
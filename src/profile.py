@@ -1,6 +1,6 @@
 import streamlit as st
-from database.database import SessionLocal
-from models.user import User
+from database.database import get_session
+from controllers.repositories import UserRepository
 from utils.password import hash_password, verify_password
 from datetime import datetime, timedelta
 import re
@@ -24,11 +24,11 @@ def check_session():
 def profile_page():
     check_session()
     st.title("Perfil de Usuario")
-    db = SessionLocal()
-    user = db.query(User).filter(User.id == st.session_state.user_id).first()
+    db = get_session()
+    users = UserRepository(db)
+    user = users.get(st.session_state.user_id)
     if not user:
         st.error("Usuario no encontrado.")
-        db.close()
         return
     st.subheader("Editar información personal")
     with st.form("profile_form"):
@@ -40,12 +40,10 @@ def profile_page():
                 st.error("El correo electrónico no tiene un formato válido.")
             else:
                 # Verificar unicidad de email
-                existing = db.query(User).filter(User.email == email, User.id != user.id).first()
-                if existing:
+                if users.email_taken(email, exclude_user_id=user.id):
                     st.error("El correo electrónico ya está registrado por otro usuario.")
                 else:
-                    user.full_name = full_name
-                    user.email = email
+                    users.update_profile(user.id, full_name, email)
                     db.commit()
                     st.success("Datos actualizados correctamente.")
     st.subheader("Cambiar contraseña")
@@ -55,14 +53,13 @@ def profile_page():
         new_password_confirm = st.text_input("Confirmar nueva contraseña", type="password")
         submit_pass = st.form_submit_button("Actualizar contraseña")
         if submit_pass:
-            if not verify_password(current_password, user.hashed_password):
+            if not verify_password(current_password, users.password_hash(user.id)):
                 st.error("La contraseña actual es incorrecta.")
             elif len(new_password) < 6:
                 st.error("La nueva contraseña debe tener al menos 6 caracteres.")
             elif new_password != new_password_confirm:
                 st.error("Las nuevas contraseñas no coinciden.")
             else:
-                user.hashed_password = hash_password(new_password)
+                users.set_password_hash(user.id, hash_password(new_password))
                 db.commit()
                 st.success("Contraseña actualizada correctamente.")
-    db.close() 
\ No newline at end of file
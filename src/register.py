@@ -1,6 +1,6 @@
 import streamlit as st
 import re
-from database.database import SessionLocal
+from database.database import get_session
 from models.user import User
 from utils.password import hash_password
 
@@ -28,9 +28,8 @@ def register_page():
             elif password != password_confirm:
                 st.error("Las contraseñas no coinciden.")
             else:
-                db = SessionLocal()
+                db = get_session()
                 existing_user = db.query(User).filter((User.username == username) | (User.email == email)).first()
-                db.close()
                 if existing_user:
                     if existing_user.username == username:
                         st.error("El nombre de usuario ya está en uso. Elige otro.")
@@ -50,7 +49,7 @@ def register_page():
         st.rerun()
 
 def register_user(username: str, email: str, full_name: str, password: str) -> bool:
-    db = SessionLocal()
+    db = get_session()
     try:
         hashed_password = hash_password(password)
         new_user = User(
@@ -66,8 +65,6 @@ def register_user(username: str, email: str, full_name: str, password: str) -> b
         db.rollback()
         st.error(f"Error al registrar usuario: {str(e)}")
         return False
-    finally:
-        db.close()
 
 if __name__ == "__main__":
     register_page() 
\ No newline at end of file
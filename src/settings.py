@@ -0,0 +1,111 @@
+import streamlit as st
+from datetime import datetime, timedelta
+import io
+import tempfile
+from database.database import get_session
+from controllers.importer import import_file, detect_format, write_rejects, COLUMNS
+from controllers.exporter import export_user
+from controllers.dashboard_cache import invalidate_dashboard
+import pandas as pd
+
+EXPORT_FORMATS = {
+    "CSV": "csv",
+    "JSON Lines": "jsonl",
+    "Parquet": "parquet",
+}
+
+IMPORT_KINDS = {
+    "Comidas": "meals",
+    "Entrenamientos": "workouts",
+    "Métricas corporales": "metrics",
+}
+
+def check_session():
+    if "user_id" not in st.session_state or st.session_state.user_id is None:
+        st.error("Sesión no válida. Por favor, inicia sesión nuevamente.")
+        st.stop()
+    # Expiración por inactividad (5 minutos)
+    now = datetime.now()
+    if "last_active" in st.session_state:
+        if (now - st.session_state.last_active) > timedelta(minutes=5):
+            st.session_state.clear()
+            st.error("Sesión expirada por inactividad. Por favor, inicia sesión nuevamente.")
+            st.stop()
+    st.session_state.last_active = now
+
+def settings_page():
+    check_session()
+    st.header("Configuración")
+
+    tab1, tab2 = st.tabs(["Importar datos", "Exportar datos"])
+
+    with tab1:
+        import_data()
+    with tab2:
+        export_data()
+
+def import_data():
+    st.subheader("Importar desde otra aplicación")
+    st.markdown("Sube un archivo CSV, JSON o JSONL exportado desde otra aplicación de seguimiento.")
+    label = st.selectbox("Tipo de datos", list(IMPORT_KINDS), key="import_kind")
+    kind = IMPORT_KINDS[label]
+    columns = ", ".join(aliases[0] for aliases in COLUMNS[kind].values())
+    st.caption(f"Columnas esperadas: {columns} (también se aceptan los nombres en español)")
+    with st.form("import_form", clear_on_submit=True):
+        uploaded = st.file_uploader("Archivo", type=["csv", "json", "jsonl", "ndjson"])
+        submit = st.form_submit_button("Importar")
+    if submit:
+        if uploaded is None:
+            st.error("Selecciona un archivo para importar.")
+            return
+        db = get_session()
+        try:
+            stream = io.TextIOWrapper(uploaded, encoding="utf-8-sig", newline="")
+            with st.spinner("Importando..."):
+                result = import_file(db, st.session_state.user_id, kind, stream, detect_format(uploaded.name))
+        except Exception as e:
+            db.rollback()
+            st.error(f"Error al leer el archivo: {str(e)}")
+            return
+        finally:
+            # Los bloques ya confirmados cuentan aunque la importación falle después
+            invalidate_dashboard(st.session_state.user_id)
+        st.success(f"{result.imported} filas importadas.")
+        if result.rejected:
+            st.warning(f"{len(result.rejected)} filas rechazadas.")
+            st.dataframe(
+                pd.DataFrame([(r.line, r.reason) for r in result.rejected], columns=["Línea", "Motivo"]),
+                hide_index=True,
+            )
+            report = io.StringIO()
+            write_rejects(report, result.rejected)
+            st.download_button(
+                "Descargar filas rechazadas",
+                report.getvalue(),
+                file_name="rechazos.csv",
+                mime="text/csv",
+            )
+
+def export_data():
+    st.subheader("Exportar mis datos")
+    st.markdown("Descarga un archivo zip con tu perfil, entrenamientos, comidas, métricas y metas.")
+    label = st.radio("Formato", list(EXPORT_FORMATS), horizontal=True, key="export_format")
+    fmt = EXPORT_FORMATS[label]
+    if st.button("Preparar exportación"):
+        db = get_session()
+        try:
+            # La consulta y la compresión se hacen por lotes sobre un archivo temporal
+            with tempfile.TemporaryFile() as archive:
+                with st.spinner("Exportando..."):
+                    export_user(db, st.session_state.user_id, archive, fmt)
+                archive.seek(0)
+                # Streamlit guarda el archivo de descarga completo en su almacén de medios
+                st.download_button(
+                    "Descargar exportación",
+                    archive.read(),
+                    file_name=f"fit-tracking-{datetime.now():%Y%m%d}-{fmt}.zip",
+                    mime="application/zip",
+                )
+        except Exception as e:
+            db.rollback()
+            st.error(f"Error al exportar los datos: {str(e)}")
@@ -0,0 +1,78 @@
+"""Benchmark de inicio de sesión: logins por segundo a una concurrencia dada.
+
+Se ejecuta desde la carpeta ``src`` contra una base SQLite temporal (o una
+base desechable indicada con ``--database-url``)::
+
+    python -m tests.benchmarks.bench_login --concurrency 8 --logins 200 --rounds 12
+
+``--stale-rounds`` crea los usuarios con otro coste de bcrypt para medir el
+camino de rehash en el primer inicio de sesión.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+PASSWORD = "benchmark-password"
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=8, help="Inicios de sesión simultáneos")
+    parser.add_argument("--logins", type=int, default=100, help="Total de inicios de sesión")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=12, help="BCRYPT_ROUNDS")
+    parser.add_argument("--workers", type=int, help="PASSWORD_HASH_WORKERS (por defecto el configurado)")
+    parser.add_argument("--stale-rounds", type=int, help="Coste de los hashes iniciales")
+    parser.add_argument("--database-url")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    # La configuración se lee al importar los módulos de la app
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/bench_login.sqlite"
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    if args.workers:
+        os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+
+    import bcrypt
+    from sqlalchemy import delete
+    from database.database import SessionLocal, close_session, engine
+    from login import authenticate_user
+    from models.user import User
+    from utils.password import PASSWORD_HASH_WORKERS
+
+    User.__table__.create(engine, checkfirst=True)
+    hashed = bcrypt.hashpw(PASSWORD.encode("utf-8"), bcrypt.gensalt(rounds=args.stale_rounds or args.rounds)).decode("utf-8")
+    usernames = [f"bench_login_{i}" for i in range(args.users)]
+    db = SessionLocal()
+    db.execute(delete(User).where(User.username.in_(usernames)))
+    db.add_all(User(username=name, email=f"{name}@example.com", hashed_password=hashed) for name in usernames)
+    db.commit()
+
+    def login(i):
+        start = time.perf_counter()
+        try:
+            assert authenticate_user(usernames[i % len(usernames)], PASSWORD) is not None
+        finally:
+            close_session()
+        return time.perf_counter() - start
+
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            latencies = sorted(pool.map(login, range(args.logins)))
+        elapsed = time.perf_counter() - start
+    finally:
+        db.execute(delete(User).where(User.username.in_(usernames)))
+        db.commit()
+        db.close()
+
+    print(f"rounds={args.rounds} workers={PASSWORD_HASH_WORKERS} concurrency={args.concurrency} logins={args.logins}")
+    print(f"{args.logins / elapsed:.1f} logins/s en {elapsed:.2f} s")
+    print(f"latencia p50={statistics.median(latencies) * 1000:.0f} ms "
+          f"p95={latencies[int(len(latencies) * 0.95) - 1] * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Benchmark de páginas: tiempo, sentencias SQL y memoria pico por página.
+
+Siembra una base local con datos sintéticos, ejecuta cada página con el
+``AppTest`` de Streamlit y compara el resultado con una línea base JSON. Se
+ejecuta desde la carpeta ``src``::
+
+    python -m tests.benchmarks.bench_pages --users 3 --days 730
+    python -m tests.benchmarks.bench_pages --update-baseline
+
+Sale con código 1 si alguna página supera la línea base: más sentencias SQL
+que las registradas, o tiempo/memoria por encima de la tolerancia. Con
+``--database-url`` se puede usar un PostgreSQL local desechable.
+"""
+import argparse
+import json
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from sqlalchemy import create_engine, event, select
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+PAGES = {
+    "dashboard": ("dashboard", "dashboard_page"),
+    "training": ("training", "training_page"),
+    "nutrition": ("nutrition", "nutrition_page"),
+    "metrics": ("metrics", "metrics_page"),
+    "goals": ("goals", "goals_page"),
+}
+
+SCRIPT = """
+from database.database import close_session
+from {module} import {function}
+try:
+    {function}()
+finally:
+    close_session()
+"""
+
+
+class PageError(RuntimeError):
+    pass
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _count(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._count)
+
+
+def run_page(name: str, user_id: int):
+    from streamlit.testing.v1 import AppTest
+    from controllers.dashboard_cache import invalidate_dashboard
+
+    # Se mide la página en frío, no la instantánea del dashboard en caché
+    invalidate_dashboard()
+    module, function = PAGES[name]
+    at = AppTest.from_string(SCRIPT.format(module=module, function=function), default_timeout=120)
+    at.session_state.user_id = user_id
+    at.run()
+    if at.exception:
+        raise PageError(f"{name}: {at.exception[0].value}")
+    return at
+
+
+def measure_pages(engine, user_id: int, pages=None, repeat: int = 3) -> dict:
+    """Ejecuta cada página con la app apuntando a ``engine`` y devuelve sus métricas."""
+    from controllers.catalog import bump_exercise_catalog_version, bump_food_catalog_version
+    from database.database import SessionLocal
+
+    previous_bind = SessionLocal.kw.get("bind")
+    SessionLocal.configure(bind=engine)
+    # Las instantáneas de catálogo son del proceso: descartar las de otra base
+    bump_food_catalog_version()
+    bump_exercise_catalog_version()
+    results = {}
+    try:
+        for name in pages or PAGES:
+            run_page(name, user_id)  # calentamiento: imports y cachés del proceso
+            times, statements = [], []
+            for _ in range(repeat):
+                with StatementCounter(engine) as counter:
+                    start = time.perf_counter()
+                    run_page(name, user_id)
+                    times.append(time.perf_counter() - start)
+                statements.append(counter.count)
+            # La memoria se mide en una ejecución aparte: tracemalloc ralentiza
+            tracemalloc.start()
+            try:
+                run_page(name, user_id)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+            results[name] = {
+                "wall_ms": round(statistics.median(times) * 1000, 1),
+                "statements": max(statements),
+                "peak_kb": round(peak / 1024),
+            }
+    finally:
+        SessionLocal.configure(bind=previous_bind)
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Regresiones respecto a la línea base, como mensajes legibles."""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if current["statements"] > base["statements"]:
+            regressions.append(f"{name}: {current['statements']} sentencias SQL (base {base['statements']})")
+        for metric in ("wall_ms", "peak_kb"):
+            if current[metric] > base[metric] * (1 + tolerance):
+                regressions.append(f"{name}: {metric}={current[metric]} (base {base[metric]}, tolerancia {tolerance:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="Base desechable; por defecto SQLite temporal")
+    parser.add_argument("--users", type=int, default=3)
+    parser.add_argument("--days", type=int, default=730, help="Días de historial por usuario")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--pages", nargs="+", choices=list(PAGES))
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Margen para tiempo y memoria (0.5 = +50%%)")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    from models.user import User
+    from tests.benchmarks.fixtures import create_schema, seed
+
+    url = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/bench_pages.sqlite"
+    engine = create_engine(url)
+    create_schema(engine)
+    start = time.perf_counter()
+    counts = seed(engine, users=args.users, days=args.days)
+    print(f"Datos sembrados en {time.perf_counter() - start:.1f} s: {sum(c['meals'] for c in counts.values())} comidas, "
+          f"{sum(c['workouts'] for c in counts.values())} entrenamientos")
+    with engine.connect() as conn:
+        user_id = conn.scalar(select(User.id).where(User.username == "bench_0"))
+
+    results = measure_pages(engine, user_id, args.pages, args.repeat)
+    for name, r in results.items():
+        print(f"{name:10} {r['wall_ms']:9.1f} ms {r['statements']:5} sentencias {r['peak_kb']:8} KB pico")
+
+    config = {"users": args.users, "days": args.days, "dialect": engine.dialect.name}
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps({"config": config, "pages": results}, indent=2) + "\n")
+        print(f"Línea base guardada en {args.baseline}")
+        return
+    if not args.baseline.exists():
+        print("No hay línea base; usa --update-baseline para crearla.")
+        return
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get("config") != config:
+        print(f"Aviso: la línea base se generó con {baseline.get('config')}")
+    regressions = compare(results, baseline["pages"], args.tolerance)
+    for message in regressions:
+        print(f"REGRESIÓN {message}")
+    raise SystemExit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Benchmark de arranque: coste de importación de la ruta de login en frío.
+
+Ejecuta ``app.py`` con el ``AppTest`` de Streamlit en un proceso nuevo con
+``python -X importtime`` y descuenta los módulos que ya carga Streamlit por sí
+solo, de modo que queda el coste atribuible a la app. Se ejecuta desde la
+carpeta ``src``::
+
+    python -m tests.benchmarks.bench_startup
+    python -m tests.benchmarks.bench_startup --update-baseline
+
+Sale con código 1 si la ruta carga módulos prohibidos (páginas de la app,
+plotly) o supera la línea base: más módulos importados que los registrados,
+o tiempo por encima de la tolerancia.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[2]
+BASELINE_PATH = Path(__file__).with_name("startup_baseline.json")
+
+# Ruta -> opción del menú de acceso
+ROUTES = {
+    "login": "Iniciar Sesión",
+    "register": "Registrarse",
+}
+
+# Páginas de la app que la pantalla de acceso no debe importar. Se reconocen
+# por su archivo dentro de src, no por el nombre: "profile" también es un
+# módulo de la biblioteca estándar (lo importa cProfile)
+FORBIDDEN_PAGES = ("dashboard", "training", "nutrition", "metrics", "goals", "profile", "settings")
+# Paquetes de terceros prohibidos, por nombre
+FORBIDDEN_PACKAGES = ("plotly",)
+
+# Cada módulo cargado se imprime como "nombre<TAB>archivo"
+LIST_MODULES = """
+for name, module in list(sys.modules.items()):
+    print(name, getattr(module, "__file__", None) or "", sep="\\t")
+"""
+
+# -X importtime no registra importlib.import_module (así carga app.py las
+# páginas), por eso los módulos cargados se toman de sys.modules al terminar
+REFERENCE = """
+import sys
+from streamlit.testing.v1 import AppTest
+AppTest.from_string("import streamlit as st", default_timeout=60).run()
+""" + LIST_MODULES
+
+SCRIPT = """
+import sys
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("app.py", default_timeout=60).run()
+if {option!r} != at.sidebar.radio[0].value:
+    at.sidebar.radio[0].set_value({option!r}).run()
+if at.exception:
+    raise SystemExit(at.exception[0].value)
+""" + LIST_MODULES
+
+
+def parse_importtime(output: str) -> dict:
+    """Módulo -> tiempo propio de importación en microsegundos."""
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(self_us)
+    return modules
+
+
+def import_profile(script: str, database_url: str) -> tuple:
+    """(tiempos de -X importtime, módulo cargado -> archivo, segundos del proceso)."""
+    env = dict(os.environ, DATABASE_URL=database_url)
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        cwd=SRC_DIR, env=env, capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - start
+    if proc.returncode:
+        raise RuntimeError(proc.stderr[-2000:])
+    loaded = dict(line.split("\t", 1) for line in proc.stdout.splitlines() if "\t" in line)
+    return parse_importtime(proc.stderr), loaded, elapsed
+
+
+def _page_of(path: str):
+    # Primer componente de la ruta relativa a src ("goals.py" -> "goals")
+    if not path:
+        return None
+    try:
+        relative = Path(path).resolve().relative_to(SRC_DIR)
+    except ValueError:
+        return None
+    return Path(relative.parts[0]).stem
+
+
+def forbidden_modules(modules: dict) -> list:
+    """Módulos prohibidos entre los cargados (nombre -> archivo)."""
+    return sorted(
+        name for name, path in modules.items()
+        if name.split(".")[0] in FORBIDDEN_PACKAGES or _page_of(path) in FORBIDDEN_PAGES
+    )
+
+
+def measure_startup(database_url: str, routes=None, repeat: int = 3) -> dict:
+    """Importaciones propias de la app en cada ruta, en procesos nuevos."""
+    _, reference, reference_s = import_profile(REFERENCE, database_url)
+    results = {}
+    for route in routes or ROUTES:
+        times, walls = [], []
+        for _ in range(repeat):
+            timings, loaded, elapsed = import_profile(SCRIPT.format(option=ROUTES[route]), database_url)
+            own = {name: us for name, us in timings.items() if name not in reference}
+            times.append(sum(own.values()) / 1000)
+            walls.append(elapsed)
+        loaded = {name: path for name, path in loaded.items() if name not in reference}
+        results[route] = {
+            "import_ms": round(statistics.median(times), 1),
+            "modules": len(loaded),
+            "cold_start_ms": round(statistics.median(walls) * 1000, 1),
+            "forbidden": forbidden_modules(loaded),
+            "top": sorted(own, key=own.get, reverse=True)[:10],
+        }
+    results["_streamlit_ms"] = round(reference_s * 1000, 1)
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Regresiones respecto a la línea base, como mensajes legibles."""
+    regressions = []
+    for route, current in results.items():
+        if route.startswith("_"):
+            continue
+        if current["forbidden"]:
+            regressions.append(f"{route}: importa {', '.join(current['forbidden'])}")
+        base = baseline.get(route)
+        if base is None:
+            continue
+        if current["modules"] > base["modules"]:
+            regressions.append(f"{route}: {current['modules']} módulos importados (base {base['modules']})")
+        if current["import_ms"] > base["import_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{route}: import_ms={current['import_ms']} (base {base['import_ms']}, tolerancia {tolerance:.0%})"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="La ruta de acceso no consulta la base; por defecto SQLite temporal")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--routes", nargs="+", choices=list(ROUTES))
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Margen para el tiempo (0.5 = +50%%)")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/bench_startup.sqlite"
+    results = measure_startup(url, args.routes, args.repeat)
+    print(f"Streamlit + AppTest en frío: {results['_streamlit_ms']:.1f} ms")
+    for route, r in results.items():
+        if route.startswith("_"):
+            continue
+        print(f"{route:10} {r['import_ms']:8.1f} ms en imports propios {r['modules']:5} módulos "
+              f"{r['cold_start_ms']:9.1f} ms de proceso")
+        print(f"           más lentos: {', '.join(r['top'][:5])}")
+
+    pages = {route: {k: r[k] for k in ("import_ms", "modules", "cold_start_ms")}
+             for route, r in results.items() if not route.startswith("_")}
+    if args.update_baseline:
+        config = {"python": sys.version.split()[0]}
+        args.baseline.write_text(json.dumps({"config": config, "routes": pages}, indent=2) + "\n")
+        print(f"Línea base guardada en {args.baseline}")
+        return
+    baseline = json.loads(args.baseline.read_text())["routes"] if args.baseline.exists() else {}
+    regressions = compare(results, baseline, args.tolerance)
+    for message in regressions:
+        print(f"REGRESIÓN {message}")
+    raise SystemExit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
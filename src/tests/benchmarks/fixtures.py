@@ -0,0 +1,122 @@
+"""Datos sintéticos para los benchmarks: N usuarios con años de historial.
+
+Se insertan con sentencias por lotes (executemany) para que sembrar varios
+años de datos tarde segundos, y al final se reconstruyen los agregados.
+"""
+from datetime import date, datetime, timedelta
+
+import bcrypt
+import numpy as np
+from sqlalchemy import insert
+
+from database.database import Base
+from models.bodymetric import BodyMetric
+from models.exercise import Exercise, MuscleGroup
+from models.food import Food
+from models.goal import Goal
+from models.meallog import MealLog
+from models.user import User
+from models.workout import Workout, WorkoutExercise
+import models.dailynutrition  # noqa: F401 (tablas de agregados)
+import models.exercisestats  # noqa: F401
+
+PASSWORD = "benchmark"
+MEAL_HOURS = (8, 13, 17, 21)
+SETS_PER_WORKOUT = 5
+WORKOUT_PROBABILITY = 3 / 7
+
+
+def create_schema(engine):
+    Base.metadata.create_all(engine)
+
+
+def seed(engine, users: int = 3, days: int = 730, foods: int = 200, exercises: int = 40,
+         seed: int = 42, end: date = None) -> dict:
+    """Crea el catálogo y ``users`` usuarios con ``days`` días de historial."""
+    from sqlalchemy.orm import Session
+    from controllers.nutrition_totals import rebuild_daily_totals
+    from controllers.training_stats import rebuild_exercise_stats
+
+    rng = np.random.default_rng(seed)
+    end = end or date.today()
+    start = datetime.combine(end - timedelta(days=days - 1), datetime.min.time())
+    hashed = bcrypt.hashpw(PASSWORD.encode("utf-8"), bcrypt.gensalt(rounds=4)).decode("utf-8")
+    groups = list(MuscleGroup)
+    counts = {}
+
+    with Session(engine) as db:
+        food_ids = db.scalars(insert(Food).returning(Food.id, sort_by_parameter_order=True), [
+            {
+                "name": f"Alimento {i}",
+                "calories": float(rng.uniform(20, 600)),
+                "protein": float(rng.uniform(0, 40)),
+                "carbs": float(rng.uniform(0, 80)),
+                "fat": float(rng.uniform(0, 40)),
+            }
+            for i in range(foods)
+        ]).all()
+        exercise_ids = db.scalars(insert(Exercise).returning(Exercise.id, sort_by_parameter_order=True), [
+            {"name": f"Ejercicio {i}", "muscle_group": groups[i % len(groups)]} for i in range(exercises)
+        ]).all()
+        user_ids = db.scalars(insert(User).returning(User.id, sort_by_parameter_order=True), [
+            {"username": f"bench_{i}", "email": f"bench_{i}@example.com", "hashed_password": hashed,
+             "height": 175.0, "initial_weight": 80.0}
+            for i in range(users)
+        ]).all()
+        day_starts = [start + timedelta(days=d) for d in range(days)]
+
+        for user_id in user_ids:
+            meals = [
+                {"user_id": user_id, "food_id": int(food), "date": day + timedelta(hours=hour), "quantity": float(qty)}
+                for day in day_starts
+                for hour, food, qty in zip(
+                    MEAL_HOURS, rng.choice(food_ids, len(MEAL_HOURS)), rng.uniform(50, 300, len(MEAL_HOURS))
+                )
+            ]
+            db.execute(insert(MealLog), meals)
+
+            weights = 85 + np.cumsum(rng.normal(-0.01, 0.2, days))
+            db.execute(insert(BodyMetric), [
+                {"user_id": user_id, "date": day + timedelta(hours=7), "weight": round(float(w), 1),
+                 "height": 175.0, "bmi": round(float(w) / 1.75 ** 2, 2)}
+                for day, w in zip(day_starts, weights)
+            ])
+
+            workout_days = [day for day, train in zip(day_starts, rng.random(days) < WORKOUT_PROBABILITY) if train]
+            workout_ids = db.scalars(insert(Workout).returning(Workout.id, sort_by_parameter_order=True), [
+                {"user_id": user_id, "date": day + timedelta(hours=18), "name": f"Sesión {i}",
+                 "duration": int(rng.integers(30, 90))}
+                for i, day in enumerate(workout_days)
+            ]).all() if workout_days else []
+            if workout_ids:
+                db.execute(insert(WorkoutExercise), [
+                    {"workout_id": workout_id, "exercise_id": int(exercise), "sets": 1,
+                     "reps": int(reps), "weight": float(weight)}
+                    for workout_id in workout_ids
+                    for exercise, reps, weight in zip(
+                        rng.choice(exercise_ids, SETS_PER_WORKOUT),
+                        rng.integers(5, 15, SETS_PER_WORKOUT),
+                        rng.uniform(10, 120, SETS_PER_WORKOUT).round(1),
+                    )
+                ])
+
+            db.execute(insert(Goal), [
+                {"user_id": user_id, "title": "Bajar de peso", "category": "weight", "target_value": 78.0,
+                 "target_unit": "kg", "start_date": start.date(), "target_date": end + timedelta(days=90),
+                 "completed": False},
+                {"user_id": user_id, "title": "Calorías diarias", "category": "nutrition", "target_value": 2200.0,
+                 "target_unit": "kcal", "start_date": start.date(), "target_date": end + timedelta(days=30),
+                 "completed": False},
+                {"user_id": user_id, "title": "Entrenar", "category": "exercise", "target_value": 1.0,
+                 "target_unit": "sesiones", "start_date": start.date(), "target_date": end,
+                 "completed": True, "completed_date": end - timedelta(days=1)},
+            ])
+            counts[user_id] = {
+                "meals": len(meals), "metrics": days, "workouts": len(workout_ids),
+                "sets": len(workout_ids) * SETS_PER_WORKOUT,
+            }
+
+        rebuild_daily_totals(db)
+        rebuild_exercise_stats(db)
+        db.commit()
+    return counts
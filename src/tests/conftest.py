@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# Agregar el directorio src al path (igual que hace app.py)
+src_dir = Path(__file__).resolve().parent.parent
+if str(src_dir) not in sys.path:
+    sys.path.append(str(src_dir))
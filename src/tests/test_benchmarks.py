@@ -0,0 +1,75 @@
+"""Prueba de humo del benchmark de páginas con un conjunto de datos pequeño.
+
+Comprueba que las páginas principales se ejecutan sin excepciones sobre los
+datos sintéticos y que el número de sentencias SQL por página no depende del
+tamaño del historial. También que la pantalla de login arranca sin importar
+las páginas de la app ni plotly.
+"""
+import sysconfig
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, select
+
+from models.user import User
+from tests.benchmarks.bench_pages import PAGES, compare, measure_pages
+from tests.benchmarks.bench_startup import SRC_DIR, forbidden_modules, measure_startup
+from tests.benchmarks.fixtures import create_schema, seed
+
+
+def seeded_engine(tmp_path, name, days):
+    engine = create_engine(f"sqlite:///{tmp_path / name}")
+    create_schema(engine)
+    seed(engine, users=1, days=days, foods=20, exercises=8)
+    with engine.connect() as conn:
+        user_id = conn.scalar(select(User.id))
+    return engine, user_id
+
+
+@pytest.fixture(scope="module")
+def small(tmp_path_factory):
+    engine, user_id = seeded_engine(tmp_path_factory.mktemp("bench"), "small.sqlite", days=30)
+    yield measure_pages(engine, user_id, repeat=1)
+    engine.dispose()
+
+
+def test_pages_run(small):
+    assert set(small) == set(PAGES)
+    for name, result in small.items():
+        assert result["statements"] > 0, name
+        assert result["wall_ms"] > 0, name
+
+
+def test_statements_do_not_grow_with_history(small, tmp_path):
+    engine, user_id = seeded_engine(tmp_path, "large.sqlite", days=180)
+    try:
+        large = measure_pages(engine, user_id, repeat=1)
+    finally:
+        engine.dispose()
+    for name in PAGES:
+        assert large[name]["statements"] == small[name]["statements"], name
+
+
+def test_compare_reports_regressions():
+    baseline = {"dashboard": {"wall_ms": 100.0, "statements": 4, "peak_kb": 1000}}
+    assert compare({"dashboard": {"wall_ms": 140.0, "statements": 4, "peak_kb": 1000}}, baseline, 0.5) == []
+    regressions = compare({"dashboard": {"wall_ms": 200.0, "statements": 5, "peak_kb": 1000}}, baseline, 0.5)
+    assert len(regressions) == 2
+
+
+def test_login_route_skips_app_pages(tmp_path):
+    results = measure_startup(f"sqlite:///{tmp_path / 'startup.sqlite'}", routes=["login"], repeat=1)
+    assert results["login"]["forbidden"] == []
+    # Las páginas se reconocen por su archivo en src: el "profile" de la
+    # biblioteca estándar no cuenta
+    modules = {
+        "login": str(SRC_DIR / "login.py"),
+        "nutrition": str(SRC_DIR / "nutrition.py"),
+        "plotly.express": "/venv/site-packages/plotly/express/__init__.py",
+        "profile": str(Path(sysconfig.get_paths()["stdlib"]) / "profile.py"),
+        "builtins": "",
+    }
+    assert forbidden_modules(modules) == ["nutrition", "plotly.express"]
+    assert forbidden_modules({**modules, "profile": str(SRC_DIR / "profile.py")}) == [
+        "nutrition", "plotly.express", "profile",
+    ]
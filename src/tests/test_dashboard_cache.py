@@ -0,0 +1,132 @@
+"""Instantáneas del dashboard por usuario: TTL, LRU e invalidación al escribir.
+
+Volver al dashboard sin cambios no debe ejecutar ninguna consulta; registrar
+una métrica desde su página debe invalidar la instantánea del usuario.
+"""
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import create_engine, select
+from streamlit.testing.v1 import AppTest
+
+from controllers import dashboard_cache
+from controllers.dashboard_cache import DashboardCache, invalidate_dashboard, load_dashboard
+from controllers.widget_loader import WidgetResult
+from database.database import SessionLocal
+from database.routing import RoutingSession
+from models.user import User
+from tests.benchmarks.bench_pages import StatementCounter
+from tests.benchmarks.fixtures import create_schema, seed
+
+TODAY = date.today()
+WIDGETS = {"metric": WidgetResult(1)}
+
+SCRIPT = """
+from database.database import close_session
+from {module} import {function}
+try:
+    {function}()
+finally:
+    close_session()
+"""
+
+
+@pytest.fixture(scope="module")
+def engine(tmp_path_factory):
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('dashboard') / 'dashboard.sqlite'}")
+    create_schema(engine)
+    seed(engine, users=2, days=30, foods=10, exercises=5)
+    previous_bind = SessionLocal.kw.get("bind")
+    SessionLocal.configure(bind=engine)
+    yield engine
+    SessionLocal.configure(bind=previous_bind)
+    engine.dispose()
+
+
+@pytest.fixture
+def user_id(engine):
+    invalidate_dashboard()
+    with engine.connect() as conn:
+        return conn.scalar(select(User.id).order_by(User.id))
+
+
+def run_page(module, function, user_id):
+    at = AppTest.from_string(SCRIPT.format(module=module, function=function), default_timeout=60)
+    at.session_state.user_id = user_id
+    return at.run()
+
+
+def test_lru_evicts_least_recently_used():
+    cache = DashboardCache(max_entries=2, ttl=60)
+    for user in (1, 2):
+        cache.put(user, TODAY, WIDGETS, cache.epoch())
+    assert cache.get(1, TODAY)
+    cache.put(3, TODAY, WIDGETS, cache.epoch())
+    assert cache.get(2, TODAY) is None
+    assert cache.get(1, TODAY) and cache.get(3, TODAY)
+    assert len(cache) == 2
+
+
+def test_snapshot_expires(monkeypatch):
+    cache = DashboardCache(max_entries=10, ttl=60)
+    cache.put(1, TODAY, WIDGETS, cache.epoch())
+    now = dashboard_cache.time.monotonic()
+    monkeypatch.setattr(dashboard_cache.time, "monotonic", lambda: now + 61)
+    assert cache.get(1, TODAY) is None
+
+
+def test_snapshot_is_per_day():
+    cache = DashboardCache(max_entries=10, ttl=60)
+    cache.put(1, TODAY, WIDGETS, cache.epoch())
+    assert cache.get(1, TODAY + timedelta(days=1)) is None
+
+
+def test_load_started_before_invalidation_is_not_stored():
+    cache = DashboardCache(max_entries=10, ttl=60)
+    epoch = cache.epoch()
+    cache.invalidate(2)
+    assert not cache.put(1, TODAY, WIDGETS, epoch)
+    assert cache.put(1, TODAY, WIDGETS, cache.epoch())
+    cache.invalidate()
+    assert cache.get(1, TODAY) is None
+
+
+def test_repeat_loads_make_no_queries(engine, user_id):
+    with RoutingSession(bind=engine) as db:
+        with StatementCounter(engine) as counter:
+            first = load_dashboard(db, user_id, TODAY)
+        assert counter.count == 5
+        with StatementCounter(engine) as counter:
+            assert load_dashboard(db, user_id, TODAY) == first
+        assert counter.count == 0
+        invalidate_dashboard(user_id)
+        with StatementCounter(engine) as counter:
+            load_dashboard(db, user_id, TODAY)
+        assert counter.count == 5
+
+
+def test_degraded_widgets_are_not_cached(engine, user_id, monkeypatch):
+    monkeypatch.setattr(dashboard_cache, "load_widgets", lambda db, loaders: {"metric": WidgetResult(None, "error")})
+    with RoutingSession(bind=engine) as db:
+        load_dashboard(db, user_id, TODAY)
+    assert dashboard_cache._cache.get(user_id, TODAY) is None
+
+
+def test_metric_write_invalidates_dashboard(engine, user_id):
+    run_page("dashboard", "dashboard_page", user_id)
+    with StatementCounter(engine) as counter:
+        at = run_page("dashboard", "dashboard_page", user_id)
+    assert counter.count == 0
+    assert not at.exception
+
+    at = run_page("metrics", "metrics_page", user_id)
+    # Mañana, para que sea la métrica más reciente
+    at.date_input[0].set_value(TODAY + timedelta(days=1))
+    at.number_input[0].set_value(123.4)
+    [b for b in at.button if b.label == "Guardar Métrica"][0].click().run()
+    assert not at.exception
+
+    with StatementCounter(engine) as counter:
+        at = run_page("dashboard", "dashboard_page", user_id)
+    assert counter.count > 0
+    assert at.metric[0].value == "123.4"
@@ -0,0 +1,70 @@
+"""Reducción de series para gráficos: tope de puntos y forma de la curva.
+
+El número de puntos enviados al navegador no debe crecer con el historial,
+los extremos de la serie se conservan y al acotar el rango de fechas se
+vuelve a la resolución completa.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from utils.downsample import downsample, lttb_indices, minmax_indices
+
+
+def series(days, spike_at=None):
+    index = pd.date_range("1990-01-01", periods=days, freq="D").strftime("%Y-%m-%d")
+    values = 80 + np.sin(np.arange(days) / 30) + np.random.default_rng(0).normal(0, 0.1, days)
+    if spike_at is not None:
+        values[spike_at] = 120
+    return pd.DataFrame({"Peso (kg)": values, "IMC": values / 3.24}, index=index)
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_points_are_capped_regardless_of_history(method):
+    sizes = {len(downsample(series(days), 300, method)) for days in (1_000, 10_000, 40_000)}
+    assert max(sizes) <= 300
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_shape_is_kept(method):
+    df = series(10_000, spike_at=4321)
+    reduced = downsample(df, 200, method)
+    assert reduced.index[0] == df.index[0] and reduced.index[-1] == df.index[-1]
+    assert reduced["Peso (kg)"].max() == 120
+    assert reduced.index.is_monotonic_increasing
+
+
+def test_short_series_is_untouched():
+    df = series(100)
+    assert downsample(df, 500) is df
+
+
+def test_missing_values_are_skipped():
+    df = series(5_000)
+    df.iloc[::2, 1] = np.nan
+    reduced = downsample(df, 100)
+    assert len(reduced) <= 100
+    assert reduced["IMC"].notna().any()
+
+
+def test_index_helpers():
+    x = np.arange(10.0)
+    assert list(lttb_indices(x, x, 5)) == [0, 1, 3, 6, 9]
+    assert list(lttb_indices(x, x, 20)) == list(range(10))
+    assert list(minmax_indices(x, 6)) == [0, 4, 5, 9]
+
+
+def test_chart_zoom_restores_full_resolution():
+    at = AppTest.from_string("""
+import numpy as np
+import pandas as pd
+from views.charts import line_chart
+index = pd.date_range("2000-01-01", periods=3000, freq="D").strftime("%Y-%m-%d")
+line_chart(pd.DataFrame({"Peso": np.arange(3000.0)}, index=index), key="peso", max_points=200)
+""")
+    at.run()
+    assert at.caption[0].value.startswith("Mostrando 200 de 3000 puntos")
+    start, _ = at.slider[0].value
+    at.slider[0].set_value((start, start + pd.Timedelta(days=99).to_pytimedelta())).run()
+    assert not at.caption
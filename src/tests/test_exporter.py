@@ -0,0 +1,114 @@
+"""Exportación de los datos de un usuario en CSV, JSONL y Parquet.
+
+El zip se vuelve a leer (o a importar) y se compara con la base: cada tabla
+contiene exactamente las filas del usuario, aunque se escriba en varios lotes.
+"""
+import csv
+import io
+import json
+import zipfile
+from datetime import timezone
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from controllers.catalog import bump_food_catalog_version
+from controllers.exporter import FORMATS, _user_tables, export_user
+from controllers.importer import import_file
+from models.meallog import MealLog
+from models.user import User
+from tests.benchmarks.fixtures import create_schema, seed
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'export.sqlite'}")
+    create_schema(engine)
+    seed(engine, users=3, days=15, foods=5, exercises=4)
+    bump_food_catalog_version()
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+@pytest.fixture
+def user_ids(db):
+    return db.scalars(select(User.id).order_by(User.id)).all()
+
+
+def export(db, user_id, fmt):
+    buffer = io.BytesIO()
+    # Lotes pequeños para que cada tabla se escriba en varios
+    export_user(db, user_id, buffer, fmt, batch_size=7)
+    buffer.seek(0)
+    return zipfile.ZipFile(buffer)
+
+
+def read_member(archive, name, fmt):
+    with archive.open(f"{name}.{fmt}") as member:
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+            return pq.read_table(member).to_pylist()
+        text = io.TextIOWrapper(member, encoding="utf-8")
+        if fmt == "csv":
+            return list(csv.DictReader(text))
+        return [json.loads(line) for line in text]
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_round_trip(db, user_ids, fmt):
+    user_id = user_ids[1]
+    archive = export(db, user_id, fmt)
+    tables = _user_tables(user_id)
+    assert sorted(archive.namelist()) == sorted(f"{name}.{fmt}" for name, _ in tables)
+    for name, stmt in tables:
+        expected = db.execute(stmt).mappings().all()
+        rows = read_member(archive, name, fmt)
+        assert rows, name
+        assert list(rows[0]) == [c.name for c in stmt.selected_columns], name
+        assert [str(row["id"]) for row in rows] == [str(row["id"]) for row in expected], name
+    # Parquet conserva los tipos; CSV y JSONL guardan las fechas como texto
+    meals = read_member(archive, "meal_logs", fmt)
+    expected = db.execute(dict(tables)["meal_logs"]).all()
+    for row, (_, when, food, quantity) in zip(meals, expected):
+        assert row["food"] == food
+        assert float(row["quantity"]) == pytest.approx(quantity)
+        if fmt == "parquet":
+            # Columna con zona horaria: SQLite la devuelve sin ella, Parquet en UTC
+            assert row["date"] == when.replace(tzinfo=when.tzinfo or timezone.utc)
+        else:
+            assert row["date"] == str(when)
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_only_the_requesting_user_is_exported(db, user_ids, fmt):
+    user_id = user_ids[1]
+    archive = export(db, user_id, fmt)
+    (user,) = read_member(archive, "user", fmt)
+    assert str(user["id"]) == str(user_id)
+    assert "hashed_password" not in user
+    exported = {str(row["id"]) for row in read_member(archive, "meal_logs", fmt)}
+    own = {str(i) for i in db.scalars(select(MealLog.id).where(MealLog.user_id == user_id))}
+    others = {str(i) for i in db.scalars(select(MealLog.id).where(MealLog.user_id != user_id))}
+    assert exported == own
+    assert not exported & others
+
+
+def test_csv_export_can_be_imported(db, user_ids):
+    # Las comidas exportadas se importan en otro usuario sin rechazos
+    source, target = user_ids[0], user_ids[2]
+    archive = export(db, source, "csv")
+    before = db.scalar(select(func.count()).select_from(MealLog).where(MealLog.user_id == target))
+    with archive.open("meal_logs.csv") as member:
+        result = import_file(db, target, "meals", io.TextIOWrapper(member, encoding="utf-8"), "csv")
+    assert result.rejected == []
+
+    def meals(user_id):
+        return sorted(db.execute(
+            select(MealLog.date, MealLog.food_id, MealLog.quantity).where(MealLog.user_id == user_id)
+        ).all())
+
+    assert result.imported == len(meals(source))
+    assert len(meals(target)) == before + result.imported
+    assert set(meals(source)) <= set(meals(target))
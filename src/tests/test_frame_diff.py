@@ -0,0 +1,60 @@
+"""Diferencias entre el DataFrame de st.data_editor y el editado."""
+import numpy as np
+import pandas as pd
+
+from utils.frame_diff import diff_frames
+
+COLUMNS = ["Fecha", "Peso (kg)", "Notas"]
+
+
+def original():
+    return pd.DataFrame({
+        "id": [1, 2, 3],
+        "Fecha": pd.to_datetime(["2100-01-01", "2100-01-02", "2100-01-03"]),
+        "Peso (kg)": [80.0, 79.5, np.nan],
+        "Notas": ["a", None, np.nan],
+        "IMC": [24.7, 24.5, 24.3],
+    })
+
+
+def test_unchanged_frame():
+    changes = diff_frames(original(), original(), columns=COLUMNS)
+    assert not changes
+    assert changes.inserted.empty and changes.updated.empty and changes.deleted == []
+
+
+def test_nan_and_none_are_equal():
+    edited = original()
+    # El editor devuelve NaN donde había None y al revés
+    edited.loc[1, "Notas"] = np.nan
+    edited.loc[2, "Notas"] = None
+    edited["Peso (kg)"] = edited["Peso (kg)"].astype(object).where(edited["Peso (kg)"].notna(), None)
+    assert not diff_frames(original(), edited, columns=COLUMNS)
+
+
+def test_inserted_updated_and_deleted_rows():
+    edited = original().drop(index=0)
+    edited.loc[2, "Peso (kg)"] = 78.0
+    edited.loc[1, "IMC"] = 0.0  # columna no editable: se ignora
+    new = pd.DataFrame({"id": [np.nan], "Fecha": pd.to_datetime(["2100-01-04"]), "Peso (kg)": [77.0],
+                        "Notas": ["nueva"], "IMC": [np.nan]})
+    # Al añadir filas sin clave, el editor convierte la columna id a float
+    edited = pd.concat([edited, new], ignore_index=True)
+
+    changes = diff_frames(original(), edited, columns=COLUMNS)
+    assert changes
+    assert changes.deleted == [1]
+    assert list(changes.updated.index) == [3]
+    assert changes.updated.loc[3, "Peso (kg)"] == 78.0
+    assert list(changes.updated.columns) == COLUMNS
+    assert changes.inserted.to_dict("records") == [
+        {"Fecha": pd.Timestamp("2100-01-04"), "Peso (kg)": 77.0, "Notas": "nueva"},
+    ]
+
+
+def test_default_columns_exclude_the_key():
+    edited = original()
+    edited.loc[0, "IMC"] = 30.0
+    changes = diff_frames(original(), edited)
+    assert list(changes.updated.index) == [1]
+    assert list(changes.updated.columns) == ["Fecha", "Peso (kg)", "Notas", "IMC"]
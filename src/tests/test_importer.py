@@ -0,0 +1,162 @@
+"""Importación masiva desde CSV/JSON: lectura, rechazos y carga por bloques.
+
+Cada bloque es una transacción: si uno falla, sus filas se rechazan y el resto
+se conserva. Los agregados se recalculan una sola vez al final.
+"""
+import io
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from controllers import importer
+from controllers.catalog import bump_exercise_catalog_version, bump_food_catalog_version
+from controllers.importer import detect_format, import_file, import_records, read_records
+from controllers.nutrition_totals import check_daily_totals
+from controllers.training_stats import check_exercise_stats
+from models.bodymetric import BodyMetric
+from models.meallog import MealLog
+from models.user import User
+from models.workout import Workout, WorkoutExercise
+from tests.benchmarks.fixtures import create_schema, seed
+
+MEALS_CSV = """Fecha,Alimento,Cantidad
+2100-01-01 08:00,alimento 0,100
+2100-01-01 13:00,ALIMENTO 1,"150,5"
+02/01/2100,Alimento 2,80
+ayer,Alimento 0,100
+2100-01-03,No existe,100
+2100-01-03,Alimento 1,0
+"""
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'import.sqlite'}")
+    create_schema(engine)
+    seed(engine, users=1, days=3, foods=3, exercises=3)
+    bump_food_catalog_version()
+    bump_exercise_catalog_version()
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+@pytest.fixture
+def user_id(db):
+    return db.scalar(select(User.id))
+
+
+def count(db, model, user_id):
+    return db.scalar(select(func.count()).select_from(model).where(model.user_id == user_id))
+
+
+def future_meals(db, user_id):
+    return db.scalars(
+        select(MealLog).where(MealLog.user_id == user_id, MealLog.date >= datetime(2100, 1, 1)).order_by(MealLog.date)
+    ).all()
+
+
+def test_read_records_formats():
+    rows = [{"fecha": "2100-01-01", "peso": "80"}, {"fecha": "2100-01-02", "peso": "79.5"}]
+    as_csv = "fecha,peso\n2100-01-01,80\n2100-01-02,79.5\n"
+    as_jsonl = "\n".join(json.dumps(r) for r in rows) + "\n\n"
+    assert list(read_records(io.StringIO(as_csv), "csv")) == rows
+    assert list(read_records(io.StringIO(json.dumps(rows)), "json")) == rows
+    assert list(read_records(io.StringIO(as_jsonl), "jsonl")) == rows
+    with pytest.raises(ValueError):
+        list(read_records(io.StringIO(""), "xml"))
+    assert [detect_format(n) for n in ("a.CSV", "b.json", "c.ndjson", "d.txt")] == ["csv", "json", "jsonl", "csv"]
+
+
+def test_csv_rows_are_imported_or_rejected_with_their_line(db, user_id):
+    result = import_file(db, user_id, "meals", io.StringIO(MEALS_CSV), "csv")
+    assert result.imported == 3
+    assert [(r.line, r.reason) for r in result.rejected] == [
+        (5, "Fecha inválida: 'ayer'"),
+        (6, "Alimento desconocido: 'No existe'"),
+        (7, "Cantidad debe ser mayor que cero"),
+    ]
+    meals = future_meals(db, user_id)
+    assert [m.quantity for m in meals] == [100.0, 150.5, 80.0]
+    assert meals[2].date == datetime(2100, 1, 2)
+
+
+def test_json_metrics(db, user_id):
+    before = count(db, BodyMetric, user_id)
+    records = [
+        {"date": "2100-01-01", "weight": 80, "height": 180},
+        {"date": "2100-01-02", "weight": "79,5", "height": 180},
+        {"date": "2100-01-03", "height": 180},
+    ]
+    result = import_file(db, user_id, "metrics", io.StringIO(json.dumps(records)), "json")
+    assert result.imported == 2
+    assert [r.reason for r in result.rejected] == ["Falta peso"]
+    assert count(db, BodyMetric, user_id) == before + 2
+    bmi = db.scalar(select(BodyMetric.bmi).where(BodyMetric.date == datetime(2100, 1, 1)))
+    assert bmi == round(80 / 1.8 ** 2, 2)
+
+
+def test_failing_chunk_rolls_back_only_itself(db, user_id, monkeypatch):
+    bulk_insert = importer._bulk_insert
+
+    def failing(db, model, rows):
+        if any(row["quantity"] == 13 for row in rows):
+            raise RuntimeError("disco lleno")
+        bulk_insert(db, model, rows)
+
+    monkeypatch.setattr(importer, "_bulk_insert", failing)
+    records = [{"fecha": f"2100-01-0{i + 1}", "alimento": "Alimento 0", "cantidad": q}
+               for i, q in enumerate([10, 11, 12, 13, 14])]
+    result = import_records(db, user_id, "meals", records, chunk_size=2)
+    assert result.imported == 3
+    assert [(r.line, r.reason) for r in result.rejected] == [
+        (4, "Error al guardar el bloque: disco lleno"),
+        (5, "Error al guardar el bloque: disco lleno"),
+    ]
+    assert [m.quantity for m in future_meals(db, user_id)] == [10.0, 11.0, 14.0]
+    assert check_daily_totals(db, user_id) == []
+
+
+def test_workouts_are_grouped_by_date_and_name_within_a_chunk(db, user_id):
+    before = count(db, Workout, user_id)
+    sets = [
+        ("2100-01-01 18:00", "Pierna", "Ejercicio 0", 60),
+        ("2100-01-01 18:00", "Pierna", "Ejercicio 1", 70),
+        ("2100-01-01 18:00", "Pierna", "Ejercicio 2", 80),
+        ("2100-01-01 18:00", "Torso", "Ejercicio 0", 40),
+        ("2100-01-02 18:00", "Pierna", "Ejercicio 0", 65),
+    ]
+    records = [{"date": d, "name": n, "exercise": e, "sets": 3, "reps": 10, "weight": w, "duration": 45}
+               for d, n, e, w in sets]
+    # Con bloques de 2 el primer entrenamiento (3 series) no se parte
+    result = import_records(db, user_id, "workouts", records, chunk_size=2)
+    assert result == (5, [])
+    assert count(db, Workout, user_id) == before + 3
+    imported = db.execute(
+        select(Workout.name, func.count(WorkoutExercise.id))
+        .join(WorkoutExercise, WorkoutExercise.workout_id == Workout.id)
+        .where(Workout.user_id == user_id, Workout.date >= datetime(2100, 1, 1))
+        .group_by(Workout.id).order_by(Workout.date, Workout.name)
+    ).all()
+    assert imported == [("Pierna", 3), ("Torso", 1), ("Pierna", 1)]
+    assert check_exercise_stats(db, user_id) == []
+
+
+@pytest.mark.parametrize("kind, rebuild, records", [
+    ("meals", "rebuild_daily_totals",
+     [{"fecha": f"2100-01-0{d}", "alimento": "Alimento 1", "cantidad": 100} for d in range(1, 6)]),
+    ("workouts", "rebuild_exercise_stats",
+     [{"fecha": f"2100-01-0{d}", "ejercicio": "Ejercicio 1", "series": 1, "repeticiones": 5, "peso": 50}
+      for d in range(1, 6)]),
+])
+def test_rollups_are_rebuilt_once(db, user_id, monkeypatch, kind, rebuild, records):
+    calls = []
+    original = getattr(importer, rebuild)
+    monkeypatch.setattr(importer, rebuild, lambda db, user: calls.append(user) or original(db, user))
+    result = import_records(db, user_id, kind, records, chunk_size=2)
+    assert result.imported == 5
+    assert calls == [user_id]
+    assert check_daily_totals(db, user_id) == [] and check_exercise_stats(db, user_id) == []
@@ -0,0 +1,104 @@
+"""Métricas de SQL por rerun: normalización, redacción y panel de depuración."""
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from streamlit.testing.v1 import AppTest
+
+from database.instrumentation import (
+    begin_rerun, current_stats, end_rerun, instrument, normalize_statement, page_totals, redact,
+)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    instrument(engine, slow_query_ms=0)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def stats():
+    stats = begin_rerun("Pruebas de instrumentación")
+    yield stats
+    end_rerun()
+
+
+@pytest.mark.parametrize("statement, expected", [
+    ("SELECT * FROM users WHERE email = 'a@b.com' AND id = 42",
+     "SELECT * FROM users WHERE email = ? AND id = ?"),
+    ("SELECT 'it''s', 3.5 FROM t1", "SELECT ?, ? FROM t1"),
+    ("SELECT id FROM foods WHERE id IN (?, ?, ?)", "SELECT id FROM foods WHERE id IN (...)"),
+    ("SELECT id FROM foods WHERE id IN (%(id_1)s, %(id_2)s)", "SELECT id FROM foods WHERE id IN (...)"),
+    ("SELECT id FROM foods WHERE id in (__[POSTCOMPILE_id_1])", "SELECT id FROM foods WHERE id IN (...)"),
+    ("SELECT id\n  FROM   foods\n WHERE id = :id", "SELECT id FROM foods WHERE id = :id"),
+])
+def test_normalize_statement(statement, expected):
+    assert normalize_statement(statement) == expected
+
+
+def test_redact_keeps_only_types():
+    assert redact({"email": "ana@example.com", "id": 7}) == "{email: <str>, id: <int>}"
+    assert redact(("ana@example.com", 80.5)) == "(<str>, <float>)"
+    assert redact([{"w": 80.5}, {"w": 81.0}]) == "[2 filas] {w: <float>}"
+    assert redact(None) == "<NoneType>"
+    assert "ana" not in redact([("ana@example.com",)])
+
+
+def test_statements_are_grouped_per_rerun(engine, stats):
+    with engine.connect() as conn:
+        for i in range(3):
+            conn.execute(text(f"SELECT {i}, 'x{i}'"))
+        conn.execute(text("SELECT 'otra' WHERE 1 = 1"))
+    assert stats.count == 4
+    assert stats.total_ms > 0
+    (statement, count, ms), *rest = stats.top()
+    assert (statement, count) == ("SELECT ?, ?", 3)
+    assert [(s, c) for s, c, _ in rest] == [("SELECT ? WHERE ? = ?", 1)]
+    assert sum(ms for _, _, ms in stats.top()) == pytest.approx(stats.total_ms)
+
+
+def test_failed_statements_leave_no_state(engine, stats):
+    with engine.connect() as conn:
+        info = dict(conn.info)
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM no_existe"))
+        conn.execute(text("SELECT 1"))
+        assert conn.info == info
+    # Solo se registran las sentencias que terminan
+    assert [(s, c) for s, c, _ in stats.top()] == [("SELECT ?", 1)]
+
+
+def test_page_totals_accumulate_reruns(engine):
+    page = "Pruebas de totales"
+    for queries in (2, 4):
+        begin_rerun(page)
+        with engine.connect() as conn:
+            for _ in range(queries):
+                conn.execute(text("SELECT 1"))
+        end_rerun()
+        assert current_stats() is None
+    reruns, statements, ms = page_totals()[page]
+    assert (reruns, statements) == (2, 6)
+    assert ms > 0
+
+
+def debug_panel_app():
+    from database.instrumentation import begin_rerun
+    from views.debug_panel import sql_debug_panel
+
+    stats = begin_rerun("Panel")
+    for statement in ("SELECT ? FROM foods", "SELECT ? FROM foods", "SELECT ? FROM users"):
+        stats.record(statement, 2.5)
+    sql_debug_panel()
+
+
+def test_debug_panel_shows_the_rerun():
+    app = AppTest.from_function(debug_panel_app).run()
+    assert not app.exception
+    assert [m.value for m in app.sidebar.metric] == ["3"]
+    assert "7.5 ms" in app.sidebar.caption[0].value
+    top = app.sidebar.dataframe[0].value
+    assert top.values.tolist() == [["SELECT ? FROM foods", 2, 5.0], ["SELECT ? FROM users", 1, 2.5]]
+    assert "1 sentencias repetidas" in app.sidebar.warning[0].value
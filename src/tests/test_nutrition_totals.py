@@ -0,0 +1,112 @@
+"""Mantenimiento de daily_nutrition_totals al escribir comidas y alimentos.
+
+Tras cada alta, edición o baja de comidas, y tras cambiar los valores de un
+alimento, la tabla debe coincidir con un recálculo desde meal_logs.
+"""
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine, delete, select, update
+from sqlalchemy.orm import Session
+
+from controllers.nutrition_totals import (
+    check_daily_totals, get_day_totals, rebuild_daily_totals, refresh_daily_totals, refresh_food_totals,
+)
+from models.dailynutrition import DailyNutritionTotal
+from models.food import Food
+from models.meallog import MealLog
+from models.user import User
+from tests.benchmarks.fixtures import create_schema, seed
+
+DAY = date(2100, 1, 1)
+OTHER_DAY = date(2100, 1, 2)
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'totals.sqlite'}")
+    create_schema(engine)
+    seed(engine, users=2, days=10, foods=5, exercises=2)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+@pytest.fixture
+def user_id(db):
+    return db.scalar(select(User.id).order_by(User.id))
+
+
+@pytest.fixture
+def food(db):
+    return db.scalars(select(Food).order_by(Food.id)).first()
+
+
+def add_meal(db, user_id, food, when, quantity=150.0):
+    meal = MealLog(user_id=user_id, food_id=food.id, date=when, quantity=quantity)
+    db.add(meal)
+    refresh_daily_totals(db, [(user_id, when)])
+    db.commit()
+    return meal
+
+
+def test_insert_adds_the_day(db, user_id, food):
+    add_meal(db, user_id, food, datetime(2100, 1, 1, 9))
+    add_meal(db, user_id, food, datetime(2100, 1, 1, 20), quantity=50.0)
+    totals = get_day_totals(db, user_id, DAY)
+    assert totals.meal_count == 2
+    assert totals.kcal == pytest.approx(food.calories * 2)
+    assert check_daily_totals(db) == []
+
+
+def test_edit_moves_the_meal_between_days(db, user_id, food):
+    meal = add_meal(db, user_id, food, datetime(2100, 1, 1, 9))
+    keys = [(user_id, meal.date)]
+    meal.date = datetime(2100, 1, 2, 9)
+    meal.quantity = 300.0
+    keys.append((user_id, meal.date))
+    refresh_daily_totals(db, keys)
+    db.commit()
+    # El día que se queda sin comidas desaparece y el nuevo se actualiza en su sitio
+    assert get_day_totals(db, user_id, DAY) is None
+    assert get_day_totals(db, user_id, OTHER_DAY).kcal == pytest.approx(food.calories * 3)
+    assert check_daily_totals(db) == []
+
+
+def test_delete_removes_the_day(db, user_id, food):
+    meal = add_meal(db, user_id, food, datetime(2100, 1, 1, 9))
+    db.delete(meal)
+    refresh_daily_totals(db, [(user_id, DAY)])
+    db.commit()
+    assert get_day_totals(db, user_id, DAY) is None
+    assert check_daily_totals(db) == []
+
+
+def test_refresh_updates_an_existing_row(db, user_id, food):
+    # Fila ya escrita (p. ej. por otra transacción): se actualiza, no choca con la clave
+    add_meal(db, user_id, food, datetime(2100, 1, 1, 9))
+    db.execute(update(DailyNutritionTotal).values(kcal=-1).where(DailyNutritionTotal.day == DAY))
+    refresh_daily_totals(db, [(user_id, DAY)])
+    db.commit()
+    assert get_day_totals(db, user_id, DAY).kcal == pytest.approx(food.calories * 1.5)
+
+
+def test_food_macro_edit_refreshes_every_user(db, food):
+    food.calories += 100
+    food.protein = (food.protein or 0) + 5
+    refresh_food_totals(db, [food.id])
+    db.commit()
+    assert check_daily_totals(db) == []
+
+
+def test_check_and_rebuild(db, user_id):
+    # Totales a cero para un usuario y borrados para el otro
+    db.execute(update(DailyNutritionTotal).values(kcal=0).where(DailyNutritionTotal.user_id == user_id))
+    db.execute(delete(DailyNutritionTotal).where(DailyNutritionTotal.user_id != user_id))
+    assert len({key[0] for key, _, _ in check_daily_totals(db)}) == 2
+    rebuild_daily_totals(db, user_id)
+    assert check_daily_totals(db, user_id) == []
+    assert check_daily_totals(db)
+    rebuild_daily_totals(db)
+    db.commit()
+    assert check_daily_totals(db) == []
@@ -0,0 +1,86 @@
+"""Comprueba que las consultas calientes de las páginas usan índices.
+
+Por defecto se ejecuta contra SQLite en memoria. Para validar contra
+PostgreSQL, apuntar TEST_DATABASE_URL a una base de datos desechable con las
+migraciones aplicadas (``alembic upgrade head``).
+"""
+import os
+import re
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, select, text
+
+from database.database import Base
+from models.user import User
+from models.bodymetric import BodyMetric
+from models.exercise import Exercise
+from models.food import Food
+from models.goal import Goal
+from models.meallog import MealLog
+from models.workout import Workout, WorkoutExercise
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "sqlite://")
+USER_ID = 1
+TODAY = datetime(2026, 1, 1)
+
+# Tablas por usuario que nunca deben recorrerse completas
+PER_USER_TABLES = {"meal_logs", "workouts", "body_metrics", "goals", "workout_exercises"}
+
+HOT_QUERIES = {
+    # dashboard_page
+    "dashboard_latest_metric": select(BodyMetric).where(BodyMetric.user_id == USER_ID).order_by(BodyMetric.date.desc()).limit(1),
+    "dashboard_meals_today": select(MealLog).where(MealLog.user_id == USER_ID, MealLog.date >= TODAY),
+    "dashboard_recent_workouts": select(Workout).where(Workout.user_id == USER_ID).order_by(Workout.date.desc()).limit(5),
+    "dashboard_weight_history": select(BodyMetric).where(BodyMetric.user_id == USER_ID).order_by(BodyMetric.date),
+    # show_meal_history
+    "meal_history": select(MealLog).where(MealLog.user_id == USER_ID, MealLog.date >= TODAY).order_by(MealLog.date.desc()),
+    # show_workout_history
+    "workout_history": select(Workout).where(Workout.user_id == USER_ID).order_by(Workout.date.desc()),
+    "workout_history_exercises": select(WorkoutExercise).join(Exercise).where(WorkoutExercise.workout_id == 1),
+    # metrics_page
+    "metrics_history": select(BodyMetric).where(BodyMetric.user_id == USER_ID, BodyMetric.date >= TODAY).order_by(BodyMetric.date.desc()),
+    # goals_page
+    "goals_active": select(Goal).where(Goal.user_id == USER_ID, Goal.completed == False).order_by(Goal.target_date),
+    "goals_completed": select(Goal).where(Goal.user_id == USER_ID, Goal.completed == True).order_by(Goal.completed_date.desc()),
+}
+
+
+@pytest.fixture(scope="module")
+def connection():
+    engine = create_engine(TEST_DATABASE_URL)
+    Base.metadata.create_all(engine)
+    with engine.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            # Con tablas pequeñas el planificador prefiere Seq Scan aunque exista
+            # un índice; desactivarlo deja ver si el índice es utilizable.
+            conn.execute(text("SET enable_seqscan = off"))
+        yield conn
+    engine.dispose()
+
+
+def explain(conn, stmt) -> list:
+    compiled = stmt.compile(dialect=conn.dialect)
+    params = compiled.construct_params()
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    rows = conn.exec_driver_sql(prefix + str(compiled), params).all()
+    # SQLite devuelve (id, parent, notused, detail); PostgreSQL una columna de texto
+    return [str(row[-1]) for row in rows]
+
+
+def full_scans(dialect: str, plan: list) -> list:
+    if dialect == "sqlite":
+        return [
+            line for line in plan
+            if (m := re.match(r"SCAN (\w+)", line)) and m.group(1) in PER_USER_TABLES
+        ]
+    return [line for line in plan if "Seq Scan" in line and any(t in line for t in PER_USER_TABLES)]
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_index(connection, name):
+    plan = explain(connection, HOT_QUERIES[name])
+    scans = full_scans(connection.dialect.name, plan)
+    assert not scans, f"{name} recorre la tabla completa:\n" + "\n".join(plan)
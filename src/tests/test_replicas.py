@@ -0,0 +1,121 @@
+"""Enrutado de lecturas a réplicas con dos ficheros SQLite como primario y réplica.
+
+La réplica es una copia del primario tomada antes de escribir en él, así que
+una lectura servida por la réplica no ve las métricas nuevas: eso permite
+comprobar a dónde fue cada consulta.
+"""
+import shutil
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, select
+
+from controllers.repositories import MetricRepository, UserRepository
+from database import routing
+from database.routing import ReplicaPool, RoutingSession
+from models.bodymetric import BodyMetric
+from models.user import User
+from tests.benchmarks.fixtures import create_schema, seed
+
+NEW_DAY = datetime(2100, 1, 1)
+
+
+@pytest.fixture
+def engines(tmp_path):
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.sqlite'}")
+    create_schema(primary)
+    seed(primary, users=1, days=10, foods=5, exercises=3)
+    primary.dispose()
+    shutil.copy(tmp_path / "primary.sqlite", tmp_path / "replica.sqlite")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.sqlite'}")
+    yield primary, replica
+    primary.dispose()
+    replica.dispose()
+
+
+def make_session(primary, *replicas):
+    return RoutingSession(bind=primary, replicas=ReplicaPool(replicas, max_lag=5, check_seconds=60))
+
+
+def add_metric(db):
+    user_id = db.scalar(select(User.id))
+    db.add(BodyMetric(user_id=user_id, date=NEW_DAY, weight=99.0, height=180.0, bmi=30.6))
+    db.commit()
+    return user_id
+
+
+def latest_date(db, user_id):
+    return MetricRepository(db).weight_series(user_id)["Fecha"].iloc[-1]
+
+
+def write_behind_replica(primary):
+    # Escribe en el primario con otra sesión: la réplica queda desfasada
+    with RoutingSession(bind=primary) as db:
+        return add_metric(db)
+
+
+def test_reads_go_to_replica(engines):
+    primary, replica = engines
+    user_id = write_behind_replica(primary)
+    with make_session(primary, replica) as db:
+        assert latest_date(db, user_id) != "2100-01-01"
+        # Los métodos sin @replica_read siguen en el primario
+        assert UserRepository(db).get(user_id).id == user_id
+
+
+def test_read_your_writes_after_commit(engines):
+    primary, replica = engines
+    with make_session(primary, replica) as db:
+        user_id = add_metric(db)
+        assert db.wrote
+        assert latest_date(db, user_id) == "2100-01-01"
+
+
+def test_primary_until_pins_later_reruns(engines):
+    primary, replica = engines
+    user_id = write_behind_replica(primary)
+    with make_session(primary, replica) as db:
+        db.primary_until = datetime.now().timestamp() + 60
+        assert latest_date(db, user_id) == "2100-01-01"
+
+
+def test_unreachable_replica_falls_back(engines, tmp_path):
+    primary, _ = engines
+    missing = create_engine(f"sqlite:///{tmp_path / 'no-existe' / 'replica.sqlite'}")
+    user_id = write_behind_replica(primary)
+    pool = ReplicaPool([missing], max_lag=5, check_seconds=60)
+    with RoutingSession(bind=primary, replicas=pool) as db:
+        assert latest_date(db, user_id) == "2100-01-01"
+    assert pool.choose() is None
+
+
+def test_replica_failing_mid_read_falls_back(engines, monkeypatch):
+    primary, replica = engines
+    user_id = write_behind_replica(primary)
+    pool = ReplicaPool([replica], max_lag=5, check_seconds=60)
+    assert pool.choose() is replica
+    # La réplica pasa la comprobación y se cae antes de la lectura
+    replica.dispose()
+
+    def connect(*args, **kwargs):
+        raise replica.dialect.loaded_dbapi.OperationalError("réplica caída")
+
+    monkeypatch.setattr(replica.dialect, "connect", connect)
+    with RoutingSession(bind=primary, replicas=pool) as db:
+        assert latest_date(db, user_id) == "2100-01-01"
+    assert pool.choose() is None
+
+
+def test_lagging_replica_is_skipped(engines, monkeypatch):
+    primary, replica = engines
+    user_id = write_behind_replica(primary)
+    monkeypatch.setattr(routing, "replication_lag", lambda conn: 60.0)
+    with make_session(primary, replica) as db:
+        assert latest_date(db, user_id) == "2100-01-01"
+
+
+def test_round_robin_skips_unhealthy(engines, tmp_path):
+    primary, replica = engines
+    missing = create_engine(f"sqlite:///{tmp_path / 'no-existe' / 'replica.sqlite'}")
+    pool = ReplicaPool([missing, replica], max_lag=5, check_seconds=60)
+    assert {pool.choose() for _ in range(4)} == {replica}
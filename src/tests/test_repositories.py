@@ -0,0 +1,163 @@
+"""Presupuestos de consultas de los repositorios.
+
+Cada método público de un repositorio declara con ``@query_budget(n)`` cuántas
+sentencias SQL puede ejecutar. Aquí se llaman todos sobre datos sintéticos con
+los presupuestos activos: si un cambio añade consultas (p. ej. un N+1), la
+prueba falla.
+"""
+import inspect
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from controllers import repositories
+from controllers.catalog import bump_exercise_catalog_version, bump_food_catalog_version
+from controllers.food_search import search_foods
+from controllers.query_budget import QueryBudgetExceeded, enforce_query_budgets, query_budget
+from controllers.repositories import (
+    CatalogRepository, GoalRepository, MealRepository, MetricRepository, Repository,
+    UserRepository, WorkoutRepository,
+)
+from models.goal import Goal
+from models.user import User
+from tests.benchmarks.fixtures import create_schema, seed
+
+TODAY = date.today()
+
+REPOSITORIES = [
+    cls for _, cls in inspect.getmembers(repositories, inspect.isclass)
+    if issubclass(cls, Repository) and cls is not Repository
+]
+
+
+@pytest.fixture(scope="module")
+def engine(tmp_path_factory):
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('repos') / 'repos.sqlite'}")
+    create_schema(engine)
+    seed(engine, users=2, days=60, foods=20, exercises=8)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    # Catálogos del proceso recargados desde esta base
+    bump_food_catalog_version()
+    bump_exercise_catalog_version()
+    with Session(engine) as session:
+        with enforce_query_budgets():
+            yield session
+        session.rollback()
+
+
+@pytest.fixture
+def user_id(db):
+    return db.scalar(select(User.id).order_by(User.id))
+
+
+def public_methods(cls):
+    return [
+        name for name, member in inspect.getmembers(cls, inspect.isfunction)
+        if not name.startswith("_")
+    ]
+
+
+@pytest.mark.parametrize("cls", REPOSITORIES, ids=lambda cls: cls.__name__)
+def test_public_methods_declare_budget(cls):
+    missing = [name for name in public_methods(cls) if not hasattr(getattr(cls, name), "query_budget")]
+    assert not missing, f"{cls.__name__} sin @query_budget: {missing}"
+
+
+def test_user_repository(db, user_id):
+    users = UserRepository(db)
+    user = users.get(user_id)
+    assert user.id == user_id
+    assert not users.email_taken(user.email, exclude_user_id=user_id)
+    assert users.email_taken(user.email)
+    assert users.password_hash(user_id).startswith("$2")
+    users.update_profile(user_id, "Nombre", user.email)
+    users.set_password_hash(user_id, users.password_hash(user_id))
+
+
+def test_metric_repository(db, user_id):
+    metrics = MetricRepository(db)
+    latest = metrics.latest(user_id)
+    series = metrics.weight_series(user_id)
+    assert len(series) == 60
+    assert series["Peso (kg)"].iloc[-1] == latest.weight
+    assert len(metrics.weight_series(user_id, start_date=TODAY - timedelta(days=9))) == 10
+    page, cursor = metrics.history(user_id)
+    assert page[0] == latest
+    assert metrics.history(user_id, cursor=cursor)[0][0].date < page[-1].date
+
+
+def test_meal_repository(db, user_id):
+    meals = MealRepository(db)
+    assert meals.day_totals(user_id, TODAY).meal_count == 4
+    assert len(meals.daily_totals(user_id)) == 60
+    history = meals.history(user_id, start_date=TODAY)
+    assert len(history) == 4
+    assert history["Calorías"].sum() == pytest.approx(meals.day_totals(user_id, TODAY).kcal, abs=0.1)
+
+
+def test_meal_history_food_search_matches_the_picker(db, user_id):
+    meals = MealRepository(db)
+    everything = meals.history(user_id)
+    # Mismos alimentos que el selector, sin tildes ni mayúsculas y sin su límite
+    found = meals.history(user_id, food_search="ALIMENTÓ 1")
+    picked = {food.name for food in search_foods(db, "alimento 1", limit=100)}
+    assert picked == {f"Alimento {i}" for i in [1, *range(10, 20)]}
+    assert len(search_foods(db, "alimento 1", limit=3)) == 3
+    assert len(found) == everything["Alimento"].isin(picked).sum() > 0
+    assert set(found["Alimento"]) == picked & set(everything["Alimento"])
+    # Los comodines de LIKE no son palabras
+    assert meals.history(user_id, food_search="%").empty
+
+
+def test_workout_repository(db, user_id):
+    workouts = WorkoutRepository(db)
+    recent = workouts.recent(user_id, limit=5)
+    assert len(recent) <= 5
+    assert recent == sorted(recent, key=lambda w: w.date, reverse=True)
+    assert workouts.count_since(user_id, TODAY - timedelta(days=60)) >= len(recent)
+    assert not workouts.progress(user_id).empty
+    page, _ = workouts.history(user_id)
+    assert [w.id for w in page[:len(recent)]] == [w.id for w in recent]
+    assert all(w.sets for w in page)
+
+
+def test_goal_repository(db, user_id):
+    goals = GoalRepository(db)
+    active = goals.active(user_id)
+    assert {g.category for g in active} == {"weight", "nutrition"}
+    assert goals.get(user_id, active[0].id) == active[0]
+    goals.create(user_id, title="Nueva", category="exercise", start_date=TODAY)
+    goals.update(user_id, active[0].id, title="Editada")
+    goals.complete(user_id, active[1].id, TODAY)
+    assert len(goals.completed(user_id)) == 2
+    goals.delete(user_id, active[0].id)
+    assert goals.get(user_id, active[0].id) is None
+
+
+def test_goal_repository_is_scoped_to_user(db, user_id):
+    other = db.scalar(select(Goal.id).where(Goal.user_id != user_id).limit(1))
+    assert GoalRepository(db).get(user_id, other) is None
+
+
+def test_catalog_repository(db):
+    catalog = CatalogRepository(db)
+    assert len(catalog.foods()) == 20
+    assert len(catalog.exercises()) == 8
+
+
+def test_budget_exceeded_is_reported(db, user_id):
+    class Leaky(Repository):
+        @query_budget(1)
+        def two_queries(self, user_id):
+            self.db.scalar(select(User.id).where(User.id == user_id))
+            self.db.scalar(select(User.email).where(User.id == user_id))
+
+    with pytest.raises(QueryBudgetExceeded):
+        Leaky(db).two_queries(user_id)
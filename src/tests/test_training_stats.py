@@ -0,0 +1,146 @@
+"""Mantenimiento de exercise_daily_volume y exercise_stats al escribir entrenamientos.
+
+Tras crear, editar o borrar un entrenamiento, el volumen diario, los récords
+y el volumen acumulado deben coincidir con un recálculo desde las series.
+"""
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine, delete, func, select, update
+from sqlalchemy.orm import Session
+
+from controllers.training_stats import (
+    check_exercise_stats, get_exercise_stats, rebuild_exercise_stats, refresh_exercise_stats, workout_keys,
+)
+from controllers.workouts import SetRow, create_workout
+from models.exercise import Exercise
+from models.exercisestats import ExerciseDailyVolume, ExerciseStats
+from models.user import User
+from models.workout import Workout, WorkoutExercise
+from tests.benchmarks.fixtures import create_schema, seed
+
+DAY = datetime(2100, 1, 1, 18)
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'training.sqlite'}")
+    create_schema(engine)
+    seed(engine, users=2, days=20, foods=2, exercises=3)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+@pytest.fixture
+def user_id(db):
+    return db.scalar(select(User.id).order_by(User.id))
+
+
+@pytest.fixture
+def exercise_ids(db):
+    return db.scalars(select(Exercise.id).order_by(Exercise.id)).all()[:2]
+
+
+def expected_stats(db):
+    # Récord, mejor serie y volumen acumulado leídos directamente de las series
+    weight = func.coalesce(WorkoutExercise.weight, 0)
+    rows = db.execute(
+        select(
+            Workout.user_id, WorkoutExercise.exercise_id, func.max(weight), func.max(weight * WorkoutExercise.reps),
+            func.sum(weight * WorkoutExercise.reps * WorkoutExercise.sets),
+        )
+        .join(Workout, WorkoutExercise.workout_id == Workout.id)
+        .group_by(Workout.user_id, WorkoutExercise.exercise_id)
+    ).all()
+    return {(u, e): (pytest.approx(pr), pytest.approx(best), pytest.approx(total)) for u, e, pr, best, total in rows}
+
+
+def stored_stats(db):
+    return {
+        (s.user_id, s.exercise_id): (s.pr_weight, s.best_set_volume, s.lifetime_volume)
+        for s in db.scalars(select(ExerciseStats))
+    }
+
+
+def assert_consistent(db):
+    assert check_exercise_stats(db) == []
+    assert stored_stats(db) == expected_stats(db)
+
+
+def test_create_workout(db, user_id, exercise_ids):
+    first, second = exercise_ids
+    create_workout(db, user_id, "Récord", DAY, 45, None, [SetRow(first, 5, 500.0), SetRow(first, 10, 100.0), SetRow(second, 8, 20.0)])
+    db.commit()
+    assert get_exercise_stats(db, user_id, [first])[first].pr_weight == 500.0
+    daily = db.get(ExerciseDailyVolume, (user_id, first, DAY.date()))
+    assert (daily.volume, daily.max_weight, daily.best_set_volume) == (3500.0, 500.0, 2500.0)
+    assert_consistent(db)
+
+
+def test_edit_workout_moves_volume_between_days(db, user_id, exercise_ids):
+    first, _ = exercise_ids
+    workout_id = create_workout(db, user_id, "Mover", DAY, 45, None, [SetRow(first, 5, 500.0)])
+    db.commit()
+    workout = db.get(Workout, workout_id)
+    keys = workout_keys(workout)
+    workout.date = datetime(2100, 1, 2, 18)
+    workout.exercises[0].weight = 400.0
+    refresh_exercise_stats(db, keys | workout_keys(workout))
+    db.commit()
+    assert db.get(ExerciseDailyVolume, (user_id, first, date(2100, 1, 1))) is None
+    assert db.get(ExerciseDailyVolume, (user_id, first, date(2100, 1, 2))).max_weight == 400.0
+    assert get_exercise_stats(db, user_id, [first])[first].pr_weight == 400.0
+    assert_consistent(db)
+
+
+def test_delete_workout(db, user_id, exercise_ids):
+    first, _ = exercise_ids
+    workout_id = create_workout(db, user_id, "Borrar", DAY, 45, None, [SetRow(first, 5, 500.0)])
+    db.commit()
+    workout = db.get(Workout, workout_id)
+    keys = workout_keys(workout)
+    db.delete(workout)
+    refresh_exercise_stats(db, keys)
+    db.commit()
+    assert db.get(ExerciseDailyVolume, (user_id, first, DAY.date())) is None
+    assert get_exercise_stats(db, user_id, [first])[first].pr_weight < 500.0
+    assert_consistent(db)
+
+
+def test_deleting_the_only_workout_removes_the_stats(db, user_id):
+    exercise_id = db.scalar(select(Exercise.id).order_by(Exercise.id.desc()))
+    db.execute(delete(WorkoutExercise).where(WorkoutExercise.exercise_id == exercise_id))
+    rebuild_exercise_stats(db)
+    workout_id = create_workout(db, user_id, "Único", DAY, 45, None, [SetRow(exercise_id, 5, 50.0)])
+    db.commit()
+    workout = db.get(Workout, workout_id)
+    keys = workout_keys(workout)
+    db.delete(workout)
+    refresh_exercise_stats(db, keys)
+    db.commit()
+    assert get_exercise_stats(db, user_id, [exercise_id]) == {}
+    assert_consistent(db)
+
+
+def test_refresh_updates_existing_rows(db, user_id, exercise_ids):
+    # Filas ya escritas (p. ej. por otra transacción): se actualizan, no chocan con la clave
+    first, _ = exercise_ids
+    create_workout(db, user_id, "Dos veces", DAY, 45, None, [SetRow(first, 5, 500.0)])
+    db.execute(update(ExerciseDailyVolume).values(volume=-1))
+    db.execute(update(ExerciseStats).values(pr_weight=-1))
+    refresh_exercise_stats(db, [(user_id, first, DAY)])
+    db.commit()
+    assert db.get(ExerciseDailyVolume, (user_id, first, DAY.date())).volume == 2500.0
+    assert get_exercise_stats(db, user_id, [first])[first].pr_weight == 500.0
+
+
+def test_check_and_rebuild(db, user_id):
+    db.execute(update(ExerciseDailyVolume).values(volume=0).where(ExerciseDailyVolume.user_id == user_id))
+    db.execute(delete(ExerciseStats))
+    assert check_exercise_stats(db)
+    rebuild_exercise_stats(db, user_id)
+    assert check_exercise_stats(db, user_id) == []
+    rebuild_exercise_stats(db)
+    db.commit()
+    assert_consistent(db)
@@ -0,0 +1,172 @@
+"""Tendencias de peso, calorías y volumen: media 7 días, EWMA y cambio semanal.
+
+El cálculo en SQL con funciones de ventana (el de PostgreSQL) se ejecuta aquí
+sobre SQLite y debe coincidir con el camino pandas; el resumen se lee en una
+consulta y queda en caché hasta la siguiente escritura del usuario.
+"""
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+from streamlit.testing.v1 import AppTest
+
+from controllers.dashboard_cache import invalidate_dashboard, load_trends
+from controllers import trends
+from controllers.trends import TREND_ALPHA, _smooth, latest_trends, trend_series
+from database.database import SessionLocal
+from models.bodymetric import BodyMetric
+from models.goal import Goal
+from models.user import User
+from tests.benchmarks.bench_pages import StatementCounter
+from tests.benchmarks.fixtures import create_schema, seed
+
+TODAY = date.today()
+SERIES = ["weight", "kcal", "volume"]
+
+
+@pytest.fixture(scope="module")
+def engine(tmp_path_factory):
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('trends') / 'trends.sqlite'}")
+    create_schema(engine)
+    seed(engine, users=2, days=120, foods=10, exercises=5)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def user_id(engine):
+    invalidate_dashboard()
+    with engine.connect() as conn:
+        return conn.scalar(select(User.id).order_by(User.id))
+
+
+@pytest.fixture
+def scale_user(engine):
+    # Usuario sin historial con pesajes a mano: huecos y un día con dos pesajes
+    weighings = [(datetime(2024, 1, 1, 8), 80.0), (datetime(2024, 1, 2, 8), 81.0), (datetime(2024, 1, 4, 8), 79.0),
+                 (datetime(2024, 1, 11, 8), 80.0), (datetime(2024, 1, 11, 20), 82.0)]
+    with Session(engine) as db:
+        user = User(username="tendencia", email="tendencia@example.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        db.add_all(BodyMetric(user_id=user.id, date=when, weight=weight, height=180.0) for when, weight in weighings)
+        db.commit()
+        yield user.id
+        db.query(BodyMetric).filter(BodyMetric.user_id == user.id).delete()
+        db.delete(user)
+        db.commit()
+
+
+@pytest.mark.parametrize("series", SERIES)
+def test_sql_and_pandas_agree(engine, user_id, series):
+    with Session(engine) as db:
+        in_sql = trend_series(db, user_id, series, in_database=True)
+        in_pandas = trend_series(db, user_id, series, in_database=False)
+    assert len(in_sql) > 30
+    assert list(in_sql.index) == list(in_pandas.index)
+    np.testing.assert_allclose(in_sql.to_numpy(), in_pandas.to_numpy(), atol=0.011)
+
+
+@pytest.mark.parametrize("in_database", [True, False])
+def test_windows_count_calendar_days(engine, scale_user, in_database):
+    with Session(engine) as db:
+        df = trend_series(db, scale_user, "weight", in_database=in_database)
+    assert list(df.index) == ["2024-01-01", "2024-01-02", "2024-01-04", "2024-01-11"]
+    # Dos pesajes el mismo día cuentan como su media
+    assert df["Peso (kg)"].iloc[-1] == 81.0
+    # El 11 queda a más de 7 días del 4: su media es solo la de ese día
+    assert list(df["Media 7 días"]) == [80.0, 80.5, 80.0, 81.0]
+    # Media exponencial con pesos (1 - alfa)^días hasta el último
+    weights = (1 - TREND_ALPHA) ** np.array([10, 9, 7, 0])
+    assert df["Tendencia"].iloc[-1] == round(np.dot(weights, [80, 81, 79, 81]) / weights.sum(), 2)
+    # Sin dispersión en x no hay pendiente
+    assert np.isnan(df["Cambio semanal"].iloc[0])
+
+
+@pytest.mark.parametrize("in_database", [True, False])
+def test_weekly_rate_of_a_steady_loss(engine, scale_user, in_database):
+    with Session(engine) as db:
+        for day in range(30):
+            db.add(BodyMetric(user_id=scale_user, date=datetime(2024, 3, 1) + timedelta(days=day),
+                              weight=90 - 0.1 * day, height=180.0))
+        db.commit()
+        df = trend_series(db, scale_user, "weight", start_date=date(2024, 3, 20), in_database=in_database)
+    # 0,1 kg al día = -0,7 kg por semana; el rango no recorta las ventanas
+    assert df.index[0] == "2024-03-20"
+    assert (df["Cambio semanal"] == -0.7).all()
+    assert df["Media 7 días"].iloc[0] == round(90 - 0.1 * 16, 2)
+
+
+@pytest.mark.parametrize("alpha", [0.1, 0.5, 0.9])
+def test_long_history_does_not_underflow(engine, scale_user, monkeypatch, alpha):
+    # Con alfa 0,5, (1 - alfa)^días hasta el último día se anula tras ~1075 días
+    monkeypatch.setattr(trends, "TREND_ALPHA", alpha)
+    rng = np.random.default_rng(7)
+    start = datetime(2020, 1, 1, 8)
+    weights = 85 + np.cumsum(rng.normal(0, 0.3, 1200))
+    with Session(engine) as db:
+        db.query(BodyMetric).filter(BodyMetric.user_id == scale_user).delete()
+        db.add_all(BodyMetric(user_id=scale_user, date=start + timedelta(days=day), weight=float(w), height=180.0)
+                   for day, w in enumerate(weights) if day % 11)
+        db.commit()
+        in_sql = trend_series(db, scale_user, "weight", in_database=True)
+        in_pandas = trend_series(db, scale_user, "weight", in_database=False)
+    days = [(start + timedelta(days=day)).date() for day in range(1200) if day % 11]
+    expected = _smooth(pd.DataFrame({"day": days, "value": weights[[day % 11 != 0 for day in range(1200)]]}))
+    assert in_sql["Tendencia"].notna().all()
+    np.testing.assert_allclose(in_sql["Tendencia"], expected["trend"].round(2), atol=0.011)
+    np.testing.assert_allclose(in_sql.to_numpy(), in_pandas.to_numpy(), atol=0.011)
+
+
+@pytest.mark.parametrize("in_database", [True, False])
+def test_latest_is_one_query(engine, user_id, in_database):
+    with Session(engine) as db:
+        with StatementCounter(engine) as counter:
+            latest = latest_trends(db, user_id, in_database=in_database)
+        assert counter.count == 1
+        for series in SERIES:
+            last = trend_series(db, user_id, series).iloc[-1]
+            summary = latest[series]
+            assert str(summary.day) == last.name
+            assert summary.trend == pytest.approx(last["Tendencia"], abs=0.011)
+
+
+def test_summary_is_cached_until_a_write(engine, user_id):
+    with Session(engine) as db:
+        first = load_trends(db, user_id, TODAY)
+        with StatementCounter(engine) as counter:
+            assert load_trends(db, user_id, TODAY) == first
+        assert counter.count == 0
+        invalidate_dashboard(user_id)
+        with StatementCounter(engine) as counter:
+            load_trends(db, user_id, TODAY)
+        assert counter.count == 1
+
+
+def test_goals_use_trend_weight(engine, user_id):
+    with Session(engine) as db:
+        db.add(Goal(user_id=user_id, title="Bajar", category="weight", target_value=70.0,
+                    target_unit="kg", start_date=TODAY))
+        db.commit()
+    previous_bind = SessionLocal.kw.get("bind")
+    SessionLocal.configure(bind=engine)
+    try:
+        at = AppTest.from_string("""
+from database.database import close_session
+from goals import goals_page
+try:
+    goals_page()
+finally:
+    close_session()
+""", default_timeout=60)
+        at.session_state.user_id = user_id
+        at.run()
+    finally:
+        SessionLocal.configure(bind=previous_bind)
+    assert not at.exception
+    with Session(engine) as db:
+        weight = latest_trends(db, user_id)["weight"]
+    assert any(f"{weight.value} kg" in c.value and "kg/semana" in c.value for c in at.caption)
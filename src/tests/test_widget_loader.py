@@ -0,0 +1,149 @@
+"""Carga concurrente de widgets: cada cargador en su hilo y con su sesión.
+
+Un widget lento o que falla solo degrada su propio resultado, y la espera
+total es la del widget más lento, no la suma de todos.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, select
+
+from controllers import widget_loader
+from controllers.repositories import MealRepository, MetricRepository, WorkoutRepository
+from controllers.widget_loader import load_widgets
+from database.database import SessionLocal
+from database.instrumentation import begin_rerun, end_rerun, instrument
+from database.routing import RoutingSession
+from models.user import User
+from tests.benchmarks.fixtures import create_schema, seed
+
+
+@pytest.fixture(scope="module")
+def engine(tmp_path_factory):
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('widgets') / 'widgets.sqlite'}")
+    create_schema(engine)
+    seed(engine, users=1, days=30, foods=10, exercises=5)
+    instrument(engine, slow_query_ms=0)
+    previous_bind = SessionLocal.kw.get("bind")
+    SessionLocal.configure(bind=engine)
+    yield engine
+    SessionLocal.configure(bind=previous_bind)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    with RoutingSession(bind=engine) as session:
+        yield session
+
+
+def sleeper(seconds, value=None):
+    def load(db):
+        time.sleep(seconds)
+        return value
+    return load
+
+
+def test_widgets_match_sequential_reads(db):
+    user_id = db.scalar(select(User.id))
+    today = date.today()
+    data = load_widgets(db, {
+        "metric": lambda s: MetricRepository(s).latest(user_id),
+        "totals": lambda s: MealRepository(s).day_totals(user_id, today),
+        "workouts": lambda s: WorkoutRepository(s).recent(user_id, limit=5),
+    })
+    assert all(result.error is None for result in data.values())
+    assert data["metric"].value == MetricRepository(db).latest(user_id)
+    assert data["totals"].value == MealRepository(db).day_totals(user_id, today)
+    assert data["workouts"].value == WorkoutRepository(db).recent(user_id, limit=5)
+
+
+def test_widgets_run_concurrently(db):
+    start = time.monotonic()
+    data = load_widgets(db, {name: sleeper(0.3, name) for name in "abcd"})
+    assert time.monotonic() - start < 0.6
+    assert {name: result.value for name, result in data.items()} == dict(zip("abcd", "abcd"))
+
+
+def test_slow_widget_degrades_alone(db):
+    start = time.monotonic()
+    data = load_widgets(db, {"fast": sleeper(0, 1), "slow": sleeper(1, 2)}, timeouts={"slow": 0.1})
+    assert time.monotonic() - start < 0.5
+    assert data["fast"] == (1, None)
+    assert data["slow"].value is None
+    assert data["slow"].error == "tiempo de espera agotado"
+
+
+@pytest.fixture
+def two_workers(monkeypatch):
+    pool = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(widget_loader, "_pool", pool)
+    yield pool
+    pool.shutdown(wait=True, cancel_futures=True)
+
+
+def test_queue_time_does_not_count_against_the_deadline(db, two_workers):
+    # Cinco widgets y dos hilos: tres tandas de 0,2 s; el último acaba a los 0,6 s
+    # pero empezó a los 0,4 s, dentro de su plazo de 0,5 s
+    data = load_widgets(db, {name: sleeper(0.2, name) for name in "abcde"}, timeouts=dict.fromkeys("abcde", 0.5))
+    assert data == {name: (name, None) for name in "abcde"}
+
+
+def test_widgets_that_never_start_are_cancelled(db, two_workers):
+    ran = []
+
+    def tracked(db):
+        ran.append(True)
+
+    start = time.monotonic()
+    data = load_widgets(db, {"a": sleeper(1), "b": sleeper(1), "c": tracked}, timeouts=dict.fromkeys("abc", 0.1))
+    assert time.monotonic() - start < 0.5
+    assert data["a"].error == data["b"].error == "tiempo de espera agotado"
+    assert data["c"].error == "sin hilos libres"
+    two_workers.shutdown(wait=True)
+    assert not ran
+
+
+def test_widget_starting_at_its_queue_deadline_gets_its_full_time(db, monkeypatch):
+    # La tarea ya corre (no se puede cancelar) pero anota su inicio tarde: el
+    # plazo de 0,1 s cuenta desde ese inicio, no desde que se encoló
+    run = widget_loader._run
+
+    def late_start(*args):
+        time.sleep(0.2)
+        return run(*args)
+
+    monkeypatch.setattr(widget_loader, "_run", late_start)
+    data = load_widgets(db, {"late": sleeper(0.05, 1)}, timeouts={"late": 0.1})
+    assert data["late"] == (1, None)
+
+
+def test_failing_widget_degrades_alone(db):
+    def broken(db):
+        raise ValueError("sin datos")
+
+    data = load_widgets(db, {"ok": sleeper(0, 1), "broken": broken})
+    assert data["ok"].value == 1
+    assert data["broken"].error == "sin datos"
+
+
+def test_worker_queries_count_for_the_rerun(db):
+    user_id = db.scalar(select(User.id))
+    stats = begin_rerun("dashboard")
+    try:
+        load_widgets(db, {
+            "metric": lambda s: MetricRepository(s).latest(user_id),
+            "workouts": lambda s: WorkoutRepository(s).recent(user_id),
+        })
+    finally:
+        end_rerun()
+    assert stats.count == 2
+
+
+def test_workers_inherit_read_your_writes(db):
+    db.primary_until = 123.0
+    assert load_widgets(db, {"pin": lambda s: s.primary_until})["pin"].value == 123.0
+    db.wrote = True
+    assert load_widgets(db, {"pin": lambda s: s.primary_until})["pin"].value == float("inf")
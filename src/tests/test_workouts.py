@@ -0,0 +1,57 @@
+"""Alta de entrenamientos desde el editor de series.
+
+Una celda de peso vacía en ``st.data_editor`` llega como NaN: debe guardarse
+como 0 kg y no contaminar los récords ni el volumen.
+"""
+import math
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from controllers.training_stats import check_exercise_stats, get_exercise_stats
+from controllers.workouts import create_workout, sets_from_editor
+from models.exercise import Exercise
+from models.exercisestats import ExerciseDailyVolume
+from models.user import User
+from models.workout import WorkoutExercise
+from tests.benchmarks.fixtures import create_schema, seed
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'workouts.sqlite'}")
+    create_schema(engine)
+    seed(engine, users=1, days=5, foods=2, exercises=2)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def test_editor_rows_become_sets():
+    df = pd.DataFrame({
+        "Ejercicio": ["Press", "Remo", None],
+        "Repeticiones": [10, 8.0, 5],
+        "Peso (kg)": [np.nan, 42.5, 20.0],
+    })
+    sets = sets_from_editor(df, {"Press": 1, "Remo": 2})
+    assert [(s.exercise_id, s.reps, s.weight) for s in sets] == [(1, 10, 0.0), (2, 8, 42.5)]
+
+
+def test_set_with_empty_weight_is_saved_as_zero(db):
+    user_id = db.scalar(select(User.id))
+    exercise_id = db.scalar(select(Exercise.id).order_by(Exercise.id))
+    label = db.get(Exercise, exercise_id).name
+    df = pd.DataFrame({"Ejercicio": [label], "Repeticiones": [12], "Peso (kg)": [np.nan]})
+    workout_id = create_workout(db, user_id, "Sin peso", date(2100, 1, 1), 30, None, sets_from_editor(df, {label: exercise_id}))
+    db.commit()
+
+    assert db.scalar(select(WorkoutExercise.weight).where(WorkoutExercise.workout_id == workout_id)) == 0.0
+    stats = get_exercise_stats(db, user_id, [exercise_id])[exercise_id]
+    assert not math.isnan(stats.pr_weight) and not math.isnan(stats.lifetime_volume)
+    daily = db.get(ExerciseDailyVolume, (user_id, exercise_id, date(2100, 1, 1)))
+    assert (daily.volume, daily.max_weight) == (0.0, 0.0)
+    assert check_exercise_stats(db, user_id) == []
@@ -1,8 +1,15 @@
 import streamlit as st
 from datetime import datetime, timedelta
-from database.database import SessionLocal
+from database.database import get_session
 from models.exercise import Exercise, MuscleGroup
-from models.workout import Workout, WorkoutExercise
+from models.workout import Workout
+from controllers.catalog import bump_exercise_catalog_version
+from controllers.dashboard_cache import invalidate_dashboard
+from controllers.repositories import CatalogRepository, WorkoutRepository
+from controllers.training_stats import get_exercise_stats, refresh_exercise_stats, workout_keys
+from controllers.workouts import create_workout, sets_from_editor
+from utils.pagination import current_cursor, page_controls
+from views.charts import date_range_slider, line_chart
 import pandas as pd
 
 def check_session():
@@ -33,40 +40,23 @@ def training_page():
     
     # Gráficos de progreso visual
     st.header("Progreso de Entrenamiento")
-    db = SessionLocal()
+    db = get_session()
     user_id = st.session_state.user_id
-    # Obtener todos los ejercicios realizados por el usuario
-    query = db.query(Workout, WorkoutExercise, Exercise).\
-        join(WorkoutExercise, Workout.id == WorkoutExercise.workout_id).\
-        join(Exercise, WorkoutExercise.exercise_id == Exercise.id).\
-        filter(Workout.user_id == user_id).\
-        order_by(Workout.date)
-    data = []
-    for w, we, ex in query:
-        data.append({
-            "Fecha": w.date.strftime('%Y-%m-%d'),
-            "Ejercicio": ex.name,
-            "Peso": we.weight or 0,
-            "Repeticiones": we.reps or 0,
-            "Series": we.sets or 0,
-            "Volumen": (we.weight or 0) * (we.reps or 0) * (we.sets or 0)
-        })
-    db.close()
-    import pandas as pd
-    if data:
-        df = pd.DataFrame(data)
+    # Volumen y peso máximo por día y ejercicio, agregados en la base de datos
+    df = WorkoutRepository(db).progress(user_id)
+    if not df.empty:
+        # Una fila por día y dos columnas (Volumen, Peso) por ejercicio
+        pivot = df.pivot(index="Fecha", columns="Ejercicio", values=["Volumen", "Peso"])
+        ejercicios = pivot["Volumen"].columns
+        # Un solo rango de fechas para todos los gráficos de progreso
+        pivot = date_range_slider(pivot, "training_progress")
         st.subheader("Evolución de Volumen Total por Ejercicio")
-        ejercicios = df["Ejercicio"].unique()
         for ejercicio in ejercicios:
-            df_ej = df[df["Ejercicio"] == ejercicio]
-            resumen = df_ej.groupby("Fecha")["Volumen"].sum().reset_index()
-            st.line_chart(resumen.set_index("Fecha"), use_container_width=True)
+            line_chart(pivot["Volumen"][ejercicio].dropna().to_frame("Volumen"), use_container_width=True)
             st.caption(f"{ejercicio}: Volumen = Peso x Reps x Series")
         st.subheader("Evolución de Peso Máximo por Ejercicio")
         for ejercicio in ejercicios:
-            df_ej = df[df["Ejercicio"] == ejercicio]
-            resumen = df_ej.groupby("Fecha")["Peso"].max().reset_index()
-            st.line_chart(resumen.set_index("Fecha"), use_container_width=True)
+            line_chart(pivot["Peso"][ejercicio].dropna().to_frame("Peso"), use_container_width=True)
             st.caption(f"{ejercicio}: Peso máximo levantado por sesión")
     else:
         st.info("Aún no hay datos suficientes para mostrar gráficos de progreso.")
@@ -74,72 +64,65 @@ def training_page():
 def register_workout():
     st.header("Registrar Nuevo Entrenamiento")
     st.markdown("Completa los datos para registrar tu sesión de entrenamiento.")
+    db = get_session()
+    catalog = CatalogRepository(db).exercises()
+    # Fuera del formulario para que el filtro actualice la lista al instante
+    muscle_group = st.selectbox(
+        "Grupo Muscular",
+        options=[None] + list(MuscleGroup),
+        format_func=lambda g: "Todos" if g is None else g.value,
+        key="workout_muscle_group",
+        help="Filtra los ejercicios por grupo muscular."
+    )
+    exercise_ids = catalog.ids(muscle_group)
     with st.form("workout_form"):
         workout_name = st.text_input("Nombre del Entrenamiento", help="Ejemplo: Full Body, Piernas, Pecho-Espalda...")
         workout_date = st.date_input("Fecha", datetime.now())
         duration = st.number_input("Duración (minutos)", min_value=1, value=60, help="Duración total del entrenamiento.")
         notes = st.text_area("Notas", help="Observaciones, sensaciones, etc. (opcional)")
-        db = SessionLocal()
-        exercises = db.query(Exercise).all()
-        db.close()
-        if not exercises:
-            st.warning("No hay ejercicios disponibles. Agrega algunos en la pestaña 'Ejercicios'.")
+        if not exercise_ids:
+            if catalog:
+                st.warning("No hay ejercicios para este grupo muscular.")
+            else:
+                st.warning("No hay ejercicios disponibles. Agrega algunos en la pestaña 'Ejercicios'.")
             st.form_submit_button("Guardar Entrenamiento", disabled=True)
             return
-        exercise_containers = []
-        with st.container():
-            col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
-            with col1:
-                exercise_id = st.selectbox(
-                    "Ejercicio",
-                    options=[e.id for e in exercises],
-                    format_func=lambda x: next((e.name for e in exercises if e.id == x), ""),
-                    key=f"exercise_0",
-                    help="Selecciona el ejercicio realizado."
-                )
-            with col2:
-                sets = st.number_input("Series", min_value=1, value=3, key=f"sets_0", help="Número de series.")
-            with col3:
-                reps = st.number_input("Repeticiones", min_value=1, value=12, key=f"reps_0", help="Repeticiones por serie.")
-            with col4:
-                weight = st.number_input("Peso (kg)", min_value=0.0, value=0.0, key=f"weight_0", help="Peso utilizado en kg.")
-            exercise_containers.append({
-                "exercise_id": exercise_id,
-                "sets": sets,
-                "reps": reps,
-                "weight": weight
-            })
+        # Una fila por serie; se pueden añadir y quitar filas libremente
+        labels = [catalog.labels[eid] for eid in exercise_ids]
+        sets_df = st.data_editor(
+            pd.DataFrame({"Ejercicio": [labels[0]], "Repeticiones": [12], "Peso (kg)": [0.0]}),
+            column_config={
+                "Ejercicio": st.column_config.SelectboxColumn("Ejercicio", options=labels, required=True),
+                "Repeticiones": st.column_config.NumberColumn("Repeticiones", min_value=1, step=1, default=12, required=True),
+                "Peso (kg)": st.column_config.NumberColumn("Peso (kg)", min_value=0.0, step=0.5, default=0.0),
+            },
+            num_rows="dynamic",
+            hide_index=True,
+            use_container_width=True,
+            key="workout_sets",
+        )
         if st.form_submit_button("Guardar Entrenamiento"):
             if not workout_name:
                 st.error("Por favor ingresa un nombre para el entrenamiento.")
                 return
+            sets = sets_from_editor(sets_df, catalog.ids_by_label)
+            if not sets:
+                st.error("Agrega al menos una serie.")
+                return
             try:
-                db = SessionLocal()
-                new_workout = Workout(
-                    user_id=st.session_state.user_id,
-                    name=workout_name,
-                    date=workout_date,
-                    duration=duration,
-                    notes=notes
-                )
-                db.add(new_workout)
-                db.flush()
-                for exercise_data in exercise_containers:
-                    workout_exercise = WorkoutExercise(
-                        workout_id=new_workout.id,
-                        exercise_id=exercise_data["exercise_id"],
-                        sets=exercise_data["sets"],
-                        reps=exercise_data["reps"],
-                        weight=exercise_data["weight"]
-                    )
-                    db.add(workout_exercise)
+                user_id = st.session_state.user_id
+                exercise_ids = {s.exercise_id for s in sets}
+                previous_prs = {eid: s.pr_weight for eid, s in get_exercise_stats(db, user_id, exercise_ids).items()}
+                create_workout(db, user_id, workout_name, workout_date, duration, notes, sets)
                 db.commit()
-                st.success("Entrenamiento registrado exitosamente!")
+                invalidate_dashboard(user_id)
+                st.success(f"Entrenamiento registrado exitosamente! ({len(sets)} series)")
+                for eid, stats in get_exercise_stats(db, user_id, exercise_ids).items():
+                    if eid in previous_prs and stats.pr_weight > previous_prs[eid]:
+                        st.success(f"¡Nuevo récord personal en {catalog.labels.get(eid, '')}: {stats.pr_weight} kg!")
             except Exception as e:
                 db.rollback()
                 st.error(f"Error al guardar el entrenamiento: {str(e)}")
-            finally:
-                db.close()
 
 def show_workout_history():
     st.header("Historial de Entrenamientos")
@@ -153,81 +136,82 @@ def show_workout_history():
         with col2:
             end_date = st.date_input("Fecha fin", value=None, key="end_date")
         search_name = st.text_input("Buscar por nombre de entrenamiento", help="Ejemplo: Full Body, Piernas...")
-    db = SessionLocal()
-    try:
-        query = db.query(Workout).filter(Workout.user_id == st.session_state.user_id)
-        if start_date:
-            query = query.filter(Workout.date >= start_date)
-        if end_date:
-            query = query.filter(Workout.date <= end_date)
-        if search_name:
-            query = query.filter(Workout.name.ilike(f"%{search_name}%"))
-        workouts = query.order_by(Workout.date.desc()).all()
-        if not workouts:
-            st.info("No hay entrenamientos registrados para los filtros seleccionados.")
-            return
-        for workout in workouts:
-            with st.expander(f"{workout.date.strftime('%Y-%m-%d')} - {workout.name}"):
-                st.write(f"Duración: {workout.duration} minutos")
-                if workout.notes:
-                    st.write(f"Notas: {workout.notes}")
-                workout_exercises = db.query(WorkoutExercise).filter(
-                    WorkoutExercise.workout_id == workout.id
-                ).join(Exercise).all()
-                if workout_exercises:
-                    data = []
-                    for we in workout_exercises:
-                        data.append({
-                            "Ejercicio": we.exercise.name,
-                            "Series": we.sets,
-                            "Repeticiones": we.reps,
-                            "Peso (kg)": we.weight
-                        })
-                    df = pd.DataFrame(data)
-                    st.dataframe(df)
-                col1, col2 = st.columns(2)
-                with col1:
-                    if st.button(f"Editar", key=f"edit_{workout.id}"):
-                        st.session_state.edit_workout_id = workout.id
-                with col2:
-                    if st.button(f"Eliminar", key=f"delete_{workout.id}"):
-                        try:
-                            db.delete(workout)
-                            db.commit()
-                            st.success("Entrenamiento eliminado exitosamente!")
-                        except Exception as e:
-                            db.rollback()
-                            st.error(f"Error al eliminar el entrenamiento: {str(e)}")
-        # Formulario de edición
-        if st.session_state.edit_workout_id:
-            workout = db.query(Workout).filter(Workout.id == st.session_state.edit_workout_id).first()
-            if workout:
-                with st.form("edit_workout_form"):
-                    name = st.text_input("Nombre del Entrenamiento", value=workout.name)
-                    date = st.date_input("Fecha", value=workout.date)
-                    duration = st.number_input("Duración (minutos)", min_value=1, value=workout.duration or 60)
-                    notes = st.text_area("Notas", value=workout.notes or "")
-                    submit = st.form_submit_button("Actualizar Entrenamiento")
-                    cancel = st.form_submit_button("Cancelar")
-                    if submit:
-                        try:
-                            workout.name = name
-                            workout.date = date
-                            workout.duration = duration
-                            workout.notes = notes
-                            db.commit()
-                            st.success("Entrenamiento actualizado exitosamente!")
-                            st.session_state.edit_workout_id = None
-                        except Exception as e:
-                            db.rollback()
-                            st.error(f"Error al actualizar el entrenamiento: {str(e)}")
-                    if cancel:
+    db = get_session()
+    cursor = current_cursor("workout_history", (start_date, end_date, search_name))
+    workouts, next_cursor = WorkoutRepository(db).history(
+        st.session_state.user_id, start_date, end_date, search_name, cursor
+    )
+    if not workouts:
+        st.info("No hay entrenamientos registrados para los filtros seleccionados.")
+        return
+    for summary in workouts:
+        with st.expander(f"{summary.date.strftime('%Y-%m-%d')} - {summary.name}"):
+            st.write(f"Duración: {summary.duration} minutos")
+            if summary.notes:
+                st.write(f"Notas: {summary.notes}")
+            if summary.sets:
+                data = [{
+                    "Ejercicio": s.exercise,
+                    "Series": s.sets,
+                    "Repeticiones": s.reps,
+                    "Peso (kg)": s.weight
+                } for s in summary.sets]
+                df = pd.DataFrame(data)
+                st.dataframe(df)
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button(f"Editar", key=f"edit_{summary.id}"):
+                    st.session_state.edit_workout_id = summary.id
+            with col2:
+                if st.button(f"Eliminar", key=f"delete_{summary.id}"):
+                    try:
+                        workout = db.get(Workout, summary.id)
+                        if workout is None:
+                            # El historial pudo leerse de una réplica con retraso
+                            raise ValueError("el entrenamiento ya no existe")
+                        keys = workout_keys(workout)
+                        db.delete(workout)
+                        refresh_exercise_stats(db, keys)
+                        db.commit()
+                        invalidate_dashboard(st.session_state.user_id)
+                        st.success("Entrenamiento eliminado exitosamente!")
+                    except Exception as e:
+                        db.rollback()
+                        st.error(f"Error al eliminar el entrenamiento: {str(e)}")
+    page_controls("workout_history", next_cursor)
+    # Formulario de edición
+    if st.session_state.edit_workout_id:
+        workout = db.query(Workout).filter(Workout.id == st.session_state.edit_workout_id).first()
+        if workout:
+            with st.form("edit_workout_form"):
+                name = st.text_input("Nombre del Entrenamiento", value=workout.name)
+                date = st.date_input("Fecha", value=workout.date)
+                duration = st.number_input("Duración (minutos)", min_value=1, value=workout.duration or 60)
+                notes = st.text_area("Notas", value=workout.notes or "")
+                submit = st.form_submit_button("Actualizar Entrenamiento")
+                cancel = st.form_submit_button("Cancelar")
+                if submit:
+                    try:
+                        keys = workout_keys(workout)
+                        workout.name = name
+                        workout.date = date
+                        workout.duration = duration
+                        workout.notes = notes
+                        # Un cambio de fecha mueve el volumen del día anterior al nuevo
+                        refresh_exercise_stats(db, keys | workout_keys(workout))
+                        db.commit()
+                        invalidate_dashboard(st.session_state.user_id)
+                        st.success("Entrenamiento actualizado exitosamente!")
                         st.session_state.edit_workout_id = None
-    finally:
-        db.close()
+                    except Exception as e:
+                        db.rollback()
+                        st.error(f"Error al actualizar el entrenamiento: {str(e)}")
+                if cancel:
+                    st.session_state.edit_workout_id = None
 
 def manage_exercises():
     st.header("Gestión de Ejercicios")
+    db = get_session()
     with st.form("exercise_form"):
         st.subheader("Agregar Nuevo Ejercicio")
         name = st.text_input("Nombre del Ejercicio")
@@ -244,7 +228,6 @@ def manage_exercises():
                 st.error("Por favor completa los campos requeridos")
                 return
             try:
-                db = SessionLocal()
                 new_exercise = Exercise(
                     name=name,
                     muscle_group=muscle_group,
@@ -255,15 +238,12 @@ def manage_exercises():
                 )
                 db.add(new_exercise)
                 db.commit()
+                bump_exercise_catalog_version()
                 st.success("Ejercicio agregado exitosamente!")
             except Exception as e:
                 db.rollback()
                 st.error(f"Error al agregar el ejercicio: {str(e)}")
-            finally:
-                db.close()
-    db = SessionLocal()
-    exercises = db.query(Exercise).all()
-    db.close()
+    exercises = CatalogRepository(db).exercises().items
     if exercises:
         data = []
         for exercise in exercises:
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+from database.database import get_setting
+
+# Reducción de series temporales para los gráficos: como mucho CHART_MAX_POINTS
+# puntos por gráfico, conservando la forma de la curva. Así lo que viaja al
+# navegador no crece con los años de historial.
+
+CHART_MAX_POINTS = int(get_setting("CHART_MAX_POINTS", 500))
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    # Largest-Triangle-Three-Buckets: de cada cubeta se queda el punto que forma
+    # el triángulo más grande con el elegido antes y la media de la siguiente
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    # threshold - 2 cubetas para los puntos interiores; primero y último fijos
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    cx = np.concatenate(([0.0], np.cumsum(x)))
+    cy = np.concatenate(([0.0], np.cumsum(y)))
+    counts = np.diff(edges)
+    avg_x = np.append((cx[edges[1:]] - cx[edges[:-1]]) / counts, x[-1])
+    avg_y = np.append((cy[edges[1:]] - cy[edges[:-1]]) / counts, y[-1])
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Doble del área; el factor 1/2 no cambia el máximo
+        area = np.abs((x[a] - avg_x[i + 1]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y[i + 1] - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+def minmax_indices(y: np.ndarray, max_points: int) -> np.ndarray:
+    # Mínimo y máximo de cada cubeta, sin bucles de Python
+    n = len(y)
+    if max_points >= n or max_points < 4:
+        return np.arange(n)
+    size = -(-n // ((max_points - 2) // 2))
+    buckets = -(-n // size)
+    padded = np.pad(y, (0, buckets * size - n), mode="edge").reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    picked = np.concatenate(([0, n - 1], offsets + padded.argmin(axis=1), offsets + padded.argmax(axis=1)))
+    return np.unique(np.minimum(picked, n - 1))
+
+def _positions(index: pd.Index) -> np.ndarray:
+    # Eje x en segundos si el índice son fechas; si no, la posición
+    try:
+        return pd.to_datetime(index).asi8 / 1e9
+    except (TypeError, ValueError):
+        return np.arange(len(index), dtype=float)
+
+def downsample(df: pd.DataFrame, max_points: int = CHART_MAX_POINTS, method: str = "lttb") -> pd.DataFrame:
+    # Filas a conservar: la unión de las elegidas en cada columna, repartiendo el
+    # presupuesto entre columnas para que el total no pase de max_points
+    if len(df) <= max_points or df.shape[1] == 0:
+        return df
+    budget = max(max_points // df.shape[1], 4)
+    x = _positions(df.index)
+    keep = np.array([], dtype=np.int64)
+    for column in df.columns:
+        values = df[column].to_numpy(dtype=float)
+        valid = np.flatnonzero(~np.isnan(values))
+        if method == "minmax":
+            picked = minmax_indices(values[valid], budget)
+        else:
+            picked = lttb_indices(x[valid], values[valid], budget)
+        keep = np.union1d(keep, valid[picked])
+    return df.iloc[keep]
@@ -0,0 +1,31 @@
+from typing import List, NamedTuple, Optional
+import pandas as pd
+
+# Diferencias entre el DataFrame mostrado en st.data_editor y el editado, para
+# aplicar todos los cambios con sentencias por lotes en lugar de fila a fila.
+
+class FrameDiff(NamedTuple):
+    inserted: pd.DataFrame  # filas nuevas (sin clave)
+    updated: pd.DataFrame   # filas existentes con algún valor distinto, indexadas por clave
+    deleted: List[int]      # claves que ya no están en el DataFrame editado
+
+    def __bool__(self) -> bool:
+        return not (self.inserted.empty and self.updated.empty) or bool(self.deleted)
+
+def diff_frames(original: pd.DataFrame, edited: pd.DataFrame, key: str = "id",
+                columns: Optional[List[str]] = None) -> FrameDiff:
+    columns = columns or [c for c in original.columns if c != key]
+    has_key = edited[key].notna()
+    before = original.set_index(key)[columns]
+    after = edited[has_key].astype({key: original[key].dtype}).set_index(key)[columns]
+
+    deleted = before.index.difference(after.index)
+    common = before.index.intersection(after.index)
+    a, b = before.loc[common], after.loc[common]
+    # NaN == NaN cuenta como igual
+    changed = ((a != b) & ~(a.isna() & b.isna())).any(axis=1)
+    return FrameDiff(
+        inserted=edited.loc[~has_key, columns].reset_index(drop=True),
+        updated=b[changed],
+        deleted=[int(k) for k in deleted],
+    )
@@ -0,0 +1,40 @@
+import streamlit as st
+from sqlalchemy import tuple_
+from database.database import get_setting
+
+# Tamaño de página por defecto para los historiales
+HISTORY_PAGE_SIZE = int(get_setting("HISTORY_PAGE_SIZE", 20))
+
+# Paginación por cursor (fecha, id) en orden descendente: cada página cuesta lo
+# mismo sin importar cuántas filas haya antes, a diferencia de OFFSET.
+
+def keyset_page(query, date_col, id_col, cursor=None, page_size: int = HISTORY_PAGE_SIZE):
+    if cursor is not None:
+        query = query.filter(tuple_(date_col, id_col) < tuple_(*cursor))
+    rows = query.order_by(date_col.desc(), id_col.desc()).limit(page_size + 1).all()
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = (getattr(last, date_col.key), getattr(last, id_col.key))
+    return rows, next_cursor
+
+# Pila de cursores en st.session_state: el último elemento es el inicio de la
+# página actual (None = primera página). Se reinicia si cambian los filtros.
+
+def current_cursor(key: str, filters: tuple):
+    state = st.session_state
+    if state.get(f"{key}_filters") != filters:
+        state[f"{key}_filters"] = filters
+        state[f"{key}_cursors"] = [None]
+    return state[f"{key}_cursors"][-1]
+
+def page_controls(key: str, next_cursor):
+    cursors = st.session_state[f"{key}_cursors"]
+    col1, col2 = st.columns(2)
+    with col1:
+        if len(cursors) > 1:
+            st.button("Más recientes", key=f"{key}_prev", on_click=cursors.pop)
+    with col2:
+        if next_cursor is not None:
+            st.button("Cargar más", key=f"{key}_next", on_click=cursors.append, args=(next_cursor,))
@@ -1,13 +1,38 @@
 import bcrypt
+from concurrent.futures import ThreadPoolExecutor
+from database.database import get_setting
+
+# Coste de bcrypt (log2 de las iteraciones); los hashes con otro coste se
+# actualizan en el siguiente inicio de sesión correcto
+BCRYPT_ROUNDS = int(get_setting("BCRYPT_ROUNDS", 12))
+# Hilos dedicados a bcrypt: limitan cuántos hashes se calculan a la vez para
+# que una ráfaga de inicios de sesión no acapare la CPU del servidor
+PASSWORD_HASH_WORKERS = int(get_setting("PASSWORD_HASH_WORKERS", 2))
+
+_pool = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+
+def _hash(password: str) -> str:
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
+    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+def _check(password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
 
 # Generar hash de contraseña
 
 def hash_password(password: str) -> str:
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-    return hashed.decode('utf-8')
+    return _pool.submit(_hash, password).result()
 
 # Verificar contraseña
 
 def verify_password(password: str, hashed_password: str) -> bool:
-    return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8')) 
\ No newline at end of file
+    return _pool.submit(_check, password, hashed_password).result()
+
+# Comprobar si el hash se generó con un coste distinto al configurado
+
+def needs_rehash(hashed_password: str) -> bool:
+    # Formato: $2b$<coste>$<sal y hash>
+    try:
+        return int(hashed_password.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
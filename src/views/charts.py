@@ -0,0 +1,29 @@
+import streamlit as st
+import pandas as pd
+from utils.downsample import CHART_MAX_POINTS, downsample
+
+def date_range_slider(df: pd.DataFrame, key: str) -> pd.DataFrame:
+    # Filas del rango elegido; el índice son fechas 'YYYY-MM-DD'
+    if len(df) < 2:
+        return df
+    dates = pd.to_datetime(df.index)
+    first, last = dates.min().date(), dates.max().date()
+    if first == last:
+        return df
+    start, end = st.slider(
+        "Rango de fechas",
+        min_value=first,
+        max_value=last,
+        value=(first, last),
+        # Con datos nuevos cambian los límites y el control vuelve al rango completo
+        key=f"{key}_{first}_{last}",
+    )
+    return df[(dates >= pd.Timestamp(start)) & (dates <= pd.Timestamp(end))]
+
+def line_chart(df: pd.DataFrame, key: str = None, max_points: int = CHART_MAX_POINTS, **kwargs):
+    # Con key se muestra un selector de rango: al acotarlo se ve todo el detalle
+    visible = date_range_slider(df, key) if key else df
+    shown = downsample(visible, max_points)
+    st.line_chart(shown, **kwargs)
+    if len(shown) < len(visible):
+        st.caption(f"Mostrando {len(shown)} de {len(visible)} puntos. Acota el rango de fechas para ver todo el detalle.")
@@ -0,0 +1,33 @@
+import streamlit as st
+import pandas as pd
+from database.instrumentation import current_stats, page_totals
+
+def sql_debug_panel():
+    # Panel opcional (SQL_DEBUG_PANEL=true) con el coste en SQL del rerun actual
+    stats = current_stats()
+    if stats is None:
+        return
+    with st.sidebar.expander("Depuración SQL"):
+        st.metric("Consultas en este rerun", stats.count, help=f"Página: {stats.page}")
+        st.caption(f"Tiempo total en la base de datos: {stats.total_ms:.1f} ms")
+        top = stats.top()
+        if top:
+            st.dataframe(
+                pd.DataFrame(top, columns=["Sentencia", "Veces", "ms"]).round({"ms": 1}),
+                hide_index=True,
+                use_container_width=True,
+            )
+            repeated = [s for s, count, _ in top if count > 1]
+            if repeated:
+                st.warning(f"{len(repeated)} sentencias repetidas en el mismo rerun (posible N+1).")
+        totals = page_totals()
+        if totals:
+            st.caption("Promedio por página desde el arranque")
+            st.dataframe(
+                pd.DataFrame(
+                    [(page, reruns, statements / reruns, ms / reruns) for page, (reruns, statements, ms) in totals.items()],
+                    columns=["Página", "Reruns", "Consultas", "ms"],
+                ).round(1),
+                hide_index=True,
+                use_container_width=True,
+            )